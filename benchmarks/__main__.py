@@ -0,0 +1,5 @@
+import sys
+
+from benchmarks.driver_scaling import main
+
+sys.exit(main())
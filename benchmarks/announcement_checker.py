@@ -0,0 +1,61 @@
+"""
+How long clvm_contracts.announcement_checker takes to check a bundle: a ring of
+trivial ACS spends, where indexing and matching the announcements is all the work, and
+a CAT ring of VMP spends, where running the puzzles dominates.
+
+    python -m benchmarks.announcement_checker
+"""
+
+import json
+import time
+
+from typing import Dict, List, Sequence
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+
+from clvm_contracts.announcement_checker import check_announcements
+from clvm_contracts.curried_template import sha256
+
+from benchmarks.scenarios import ACS, ACS_PH, cat_ring
+
+
+def announcement_ring(size: int) -> List[CoinSpend]:
+    # ACS coins that each announce their index and assert the next coin's announcement
+    coins = [Coin(bytes32(i.to_bytes(32, "big")), ACS_PH, 1) for i in range(size)]
+    return [
+        CoinSpend(
+            coin,
+            ACS,
+            Program.to(
+                [
+                    [60, i.to_bytes(4, "big")],
+                    [61, sha256(coins[(i + 1) % size].name(), ((i + 1) % size).to_bytes(4, "big"))],
+                ]
+            ),
+        )
+        for i, coin in enumerate(coins)
+    ]
+
+
+def seconds_to_check(spends: Sequence) -> float:
+    start: float = time.perf_counter()
+    report = check_announcements(spends)
+    elapsed: float = time.perf_counter() - start
+    assert report.ok
+    return elapsed
+
+
+def run(acs_size: int = 5000, cat_size: int = 200) -> Dict[str, float]:
+    cat_spends = cat_ring(cat_size)
+    return {
+        f"{acs_size} ACS spends": round(seconds_to_check(announcement_ring(acs_size)), 3),
+        f"{cat_size} CAT spends": round(seconds_to_check(cat_spends), 3),
+        f"{cat_size} CAT coin spends": round(seconds_to_check([s.to_coin_spend() for s in cat_spends]), 3),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
@@ -0,0 +1,87 @@
+"""
+How long the event loop stalls while a large CAT ring is solved and turned into coin
+spends, calling the driver directly and through clvm_contracts.async_driver on a
+thread pool and on a process pool.
+
+A heartbeat that wakes every millisecond stands in for the other clients of a service:
+the gaps between its wakeups are the extra latency they would see.
+
+    python -m benchmarks.async_driver --spends 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from clvm_contracts.async_driver import AsyncDriver
+from clvm_contracts.strict_fungibility import CATType
+from clvm_contracts.validating_meta_puzzle import VMPSpend
+
+from benchmarks.driver_scaling import cat_types, unsolved_ring
+from benchmarks.load_generator import percentile
+
+
+async def heartbeat(gaps: List[float], done: asyncio.Event, interval: float = 0.001) -> None:
+    last: float = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(interval)
+        now: float = time.perf_counter()
+        gaps.append(now - last - interval)
+        last = now
+
+
+async def build(spends: List[VMPSpend], driver: Optional[AsyncDriver]) -> None:
+    if driver is None:
+        for spend in CATType.solve(spends):
+            spend.to_coin_spend()
+    else:
+        solved = await driver.solve(spends, CATType.solve)
+        await driver.to_coin_spends(solved)
+
+
+async def measure(size: int, driver: Optional[AsyncDriver]) -> Dict[str, float]:
+    # the ring is made before the heartbeat starts, since only the driver's stalls are measured
+    spends = unsolved_ring(size, cat_types(1))
+    gaps: List[float] = []
+    done = asyncio.Event()
+    beat = asyncio.ensure_future(heartbeat(gaps, done))
+    # let the heartbeat start before the work does
+    await asyncio.sleep(0.01)
+    start: float = time.perf_counter()
+    try:
+        await build(spends, driver)
+    finally:
+        seconds: float = time.perf_counter() - start
+        done.set()
+        await beat
+    return {
+        "seconds": round(seconds, 3),
+        "max_stall_ms": round(max(gaps, default=0) * 1000, 2),
+        "p99_stall_ms": round(percentile(gaps, 0.99) * 1000, 2),
+    }
+
+
+async def run(size: int, chunk_size: int, workers: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {"direct": await measure(size, None)}
+    executors: Dict[str, Executor] = {
+        "thread pool": ThreadPoolExecutor(workers),
+        "process pool": ProcessPoolExecutor(workers),
+    }
+    for name, executor in executors.items():
+        with executor:
+            results[name] = await measure(size, AsyncDriver(executor, chunk_size, workers))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spends", type=int, default=1000)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    results = asyncio.get_event_loop().run_until_complete(run(args.spends, args.chunk_size, args.workers))
+    print(json.dumps(results, indent=4))
@@ -0,0 +1,106 @@
+"""
+Cost and size of minting N singletons, one parent coin per singleton against a single
+parent spend that creates every launching coin with `SingletonType.batch_coins`.
+
+Each singleton is still launched by the spend of its own coin, so what a batch saves is
+the N - 1 parent spends. Both ways are measured with the plain block generator and with
+the compressed one from clvm_contracts.bundle_tools.
+
+    python -m benchmarks.batch_singleton_launch
+"""
+
+import json
+
+from typing import Dict, List, Sequence, Tuple
+
+from blspy import G2Element
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.generator_types import BlockGenerator
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.bundle_tools import compressed_solution_generator, vmp_shared_programs
+from clvm_contracts.strict_fungibility import SingletonType
+from clvm_contracts.validating_meta_puzzle import VMP, VMPSpend
+
+from benchmarks.scenarios import ACS, ACS_PH
+
+EMPTY_VMP = VMP(ACS, [])
+
+
+def launch_spend(coin: Coin) -> VMPSpend:
+    basic_type = BasicType.new()
+    typ = SingletonType.new(coin.name(), basic_type.remover_hash, basic_type.environment)
+    spend = VMPSpend(
+        coin,
+        EMPTY_VMP,
+        type_additions=[SingletonType.launch(typ, conditions=Program.to(None), coin_id=coin.name())],
+    )
+    spend.inner_solution = Program.to([[51, ACS_PH, coin.amount], [1, spend.security_hash()]])
+    return SingletonType.solve([spend])[0]
+
+
+def individual_launches(count: int) -> Tuple[SpendBundle, List[VMPSpend]]:
+    # a parent coin for each singleton, each creating one launching coin
+    parent_spends: List[CoinSpend] = []
+    launches: List[VMPSpend] = []
+    for index in range(count):
+        parent = Coin(bytes32(index.to_bytes(32, "big")), ACS_PH, 1)
+        parent_spends.append(CoinSpend(parent, ACS, Program.to(SingletonType.batch_conditions(ACS_PH, 1))))
+        launches.append(launch_spend(SingletonType.batch_coins(parent.name(), ACS_PH, 1)[0]))
+    return SpendBundle(parent_spends + [spend.to_coin_spend() for spend in launches], G2Element()), launches
+
+
+def batch_launch(count: int) -> Tuple[SpendBundle, List[VMPSpend]]:
+    parent = Coin(bytes32([0] * 32), ACS_PH, count * (count + 1) // 2)
+    parent_spend = CoinSpend(parent, ACS, Program.to(SingletonType.batch_conditions(ACS_PH, count)))
+    launches: List[VMPSpend] = [
+        launch_spend(child) for child in SingletonType.batch_coins(parent.name(), ACS_PH, count)
+    ]
+    return SpendBundle([parent_spend] + [spend.to_coin_spend() for spend in launches], G2Element()), launches
+
+
+def generator_cost(generator: BlockGenerator) -> Dict[str, int]:
+    result = get_name_puzzle_conditions(
+        generator,
+        INFINITE_COST,
+        cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE,
+        mempool_mode=True,
+    )
+    assert result.error is None
+    return {"cost": result.cost, "bytes": len(bytes(generator.program))}
+
+
+def measure(bundle: SpendBundle, launches: List[VMPSpend]) -> Dict[str, Dict[str, int]]:
+    return {
+        "plain": generator_cost(simple_solution_generator(bundle)),
+        "compressed": generator_cost(compressed_solution_generator(bundle, vmp_shared_programs(launches))),
+    }
+
+
+def run(counts: Sequence[int] = (1, 10, 100)) -> Dict[str, object]:
+    results: Dict[str, object] = {}
+    for count in counts:
+        individual = measure(*individual_launches(count))
+        batch = measure(*batch_launch(count))
+        results[f"{count} singletons"] = {
+            generator: {
+                "individual": individual[generator],
+                "batch": batch[generator],
+                "cost_saved": f"{1 - batch[generator]['cost'] / individual[generator]['cost']:.1%}",
+                "bytes_saved": individual[generator]["bytes"] - batch[generator]["bytes"],
+            }
+            for generator in ("plain", "compressed")
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
@@ -0,0 +1,87 @@
+import json
+
+from typing import Dict, List, Tuple
+
+from blspy import G2Element
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.cost_estimator import CostModel, condition_cost, spend_features, spend_length
+from clvm_contracts.validating_meta_puzzle import VMPSpend
+
+from benchmarks.scenarios import basic_spend, cat_ring, nft_ring, run_generator
+
+
+def calibration_scenarios() -> List[List[VMPSpend]]:
+    scenarios: List[List[VMPSpend]] = []
+    for type_count in (1, 2, 4, 8):
+        for additions, removals in ((0, 0), (1, 0), (0, 1), (2, 1)):
+            for payments in (1, 3):
+                scenarios.append([basic_spend(type_count, additions, removals, payments)])
+    # type proofs vary on their own, so their cost isn't folded into the fungible types
+    for type_count in (0, 1, 4):
+        for proofs in (1, 2, 5):
+            scenarios.append([basic_spend(type_count, proofs=proofs)])
+    for size in (1, 2, 4):
+        scenarios.append(cat_ring(size))
+        scenarios.append(nft_ring(size))
+    for fungible_types, basic_types, proofs in ((2, 0, 0), (3, 0, 0), (1, 2, 0), (1, 0, 2), (2, 1, 3)):
+        scenarios.append(cat_ring(2, fungible_types, basic_types, proofs))
+        scenarios.append(nft_ring(2, fungible_types, basic_types, proofs))
+    return scenarios
+
+
+def measure(spends: List[VMPSpend]) -> Tuple[Dict[str, int], int, int]:
+    # The summed features of a bundle, its real cost, and the part of it spent executing CLVM
+    bundle = SpendBundle([spend.to_coin_spend() for spend in spends], G2Element())
+    result = run_generator(simple_solution_generator(bundle))
+    features: Dict[str, int] = {}
+    fixed_cost: int = 0
+    for spend in spends:
+        for name, count in spend_features(spend, spend.inner_solution).items():
+            features[name] = features.get(name, 0) + count
+        fixed_cost += spend_length(spend) * DEFAULT_CONSTANTS.COST_PER_BYTE
+        fixed_cost += condition_cost(spend.inner_solution)
+    return features, result.cost, result.cost - fixed_cost
+
+
+def solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    # Gaussian elimination with partial pivoting
+    size = len(vector)
+    rows = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda r: abs(rows[r][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for r in range(size):
+            if r != column and rows[column][column] != 0:
+                factor = rows[r][column] / rows[column][column]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[column])]
+    return [rows[i][size] / rows[i][i] if rows[i][i] != 0 else 0.0 for i in range(size)]
+
+
+def fit(samples: List[Tuple[Dict[str, int], int]]) -> CostModel:
+    # Least squares through the normal equations, weighted so every sample counts relatively
+    names: List[str] = sorted({name for features, _ in samples for name in features})
+    matrix = [[0.0] * len(names) for _ in names]
+    vector = [0.0] * len(names)
+    for features, target in samples:
+        weight = 1 / target ** 2
+        row = [features.get(name, 0) for name in names]
+        for i in range(len(names)):
+            vector[i] += weight * row[i] * target
+            for j in range(len(names)):
+                matrix[i][j] += weight * row[i] * row[j]
+    return CostModel(dict(zip(names, solve(matrix, vector))))
+
+
+if __name__ == "__main__":
+    measurements = [measure(spends) for spends in calibration_scenarios()]
+    model = fit([(features, execution_cost) for features, _, execution_cost in measurements])
+    worst: float = 0
+    for features, cost, execution_cost in measurements:
+        predicted: int = cost - execution_cost + model.execution_cost(features)
+        worst = max(worst, abs(predicted - cost) / cost)
+    print(json.dumps({name: round(value) for name, value in model.coefficients.items()}, indent=4))
+    print(f"largest error over {len(measurements)} scenarios: {worst:.2%}")
@@ -0,0 +1,84 @@
+import copyreg
+import pickle
+import time
+
+from typing import Callable, List
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+
+from clvm_contracts.codec import decode_spends, encode_spends
+from clvm_contracts.validating_meta_puzzle import VMPSpend
+
+from benchmarks.scenarios import cat_ring
+
+# Neither parsed programs nor coins can be pickled directly, so pickle them by value
+copyreg.pickle(Program, lambda program: (Program.from_bytes, (bytes(program),)))
+
+
+def make_coin(parent_coin_info: bytes, puzzle_hash: bytes, amount: int) -> Coin:
+    return Coin(parent_coin_info, puzzle_hash, amount)
+
+
+copyreg.pickle(Coin, lambda coin: (make_coin, (coin.parent_coin_info, coin.puzzle_hash, coin.amount)))
+
+
+def timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def pickle_spends(spends: List[VMPSpend]) -> bytes:
+    # VMPSpend caches are not part of its state, the rest is in the order of its constructor arguments
+    return pickle.dumps(
+        [
+            (
+                spend.coin,
+                spend.puzzle,
+                spend.inner_solution,
+                spend.lineage_proof,
+                spend.type_proofs,
+                spend.unsafe_solutions,
+                spend.type_additions,
+                spend.type_removals,
+                spend.secure_solutions,
+                spend.sparse,
+                spend.environments,
+                spend.remark_index,
+            )
+            for spend in spends
+        ]
+    )
+
+
+def unpickle_spends(data: bytes) -> List[VMPSpend]:
+    return [VMPSpend(*fields) for fields in pickle.loads(data)]
+
+
+def report(description: str, spends: List[VMPSpend]) -> None:
+    encoded = encode_spends(spends)
+    pickled = pickle_spends(spends)
+    assert [bytes(s) for s in decode_spends(memoryview(encoded))] == [bytes(s) for s in spends]
+    assert [bytes(s) for s in unpickle_spends(pickled)] == [bytes(s) for s in spends]
+    print(
+        f"{description}: "
+        f"codec {len(encoded)} bytes, "
+        f"encode {timed(lambda: encode_spends(spends)) * 1000:.1f}ms, "
+        f"decode {timed(lambda: decode_spends(memoryview(encoded))) * 1000:.1f}ms | "
+        f"pickle {len(pickled)} bytes, "
+        f"dump {timed(lambda: pickle_spends(spends)) * 1000:.1f}ms, "
+        f"load {timed(lambda: unpickle_spends(pickled)) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    for size in (10, 100, 500):
+        spends = cat_ring(size)
+        report(f"{size} CAT spends", spends)
+        # Spends that arrived separately share equal programs but not the same objects,
+        # which only interning by content catches
+        report(
+            f"{size} CAT spends decoded one by one",
+            [decode_spends(encode_spends([spend]))[0] for spend in spends],
+        )
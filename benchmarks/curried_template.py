@@ -0,0 +1,24 @@
+import time
+
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.strict_fungibility import SingletonType
+
+
+def p2_singleton_addresses_per_second(count: int, use_template: bool) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        launcher_hash = bytes32(i.to_bytes(32, "big"))
+        if use_template:
+            SingletonType.p2_puzzle_hash(launcher_hash=launcher_hash)
+        else:
+            SingletonType.p2(launcher_hash=launcher_hash).get_tree_hash()
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    curried = p2_singleton_addresses_per_second(1000, False)
+    templated = p2_singleton_addresses_per_second(100000, True)
+    print(f"curry then hash:    {curried:.0f} p2_singleton addresses per second")
+    print(f"curried template:   {templated:.0f} p2_singleton addresses per second")
+    print(f"100k addresses:     {100000 / curried:.1f}s -> {100000 / templated:.1f}s")
@@ -0,0 +1,311 @@
+"""
+Differential fuzzing of the driver against the puzzles it drives.
+
+Every case generates a random spend, has the driver predict what it will do and then
+runs the real puzzle to check the prediction:
+
+    types       random types, additions, removals, secure solutions, type proofs and
+                conditions: the puzzle must accept the driver's solution and wrap every
+                CREATE_COIN with the types hash the driver expects
+    fungible    a random CAT or NFT ring solved by the driver: every spend must pass its
+                validator and the announcement ring must close exactly when the
+                driver's subtotals come back to 0
+
+Case `n` of a run is generated from `--seed` and `n` alone, so a failure can be
+replayed with `--case n`. Cases are split into chunks that run on a process pool.
+
+    python -m benchmarks.differential_fuzzer --cases 1000000 --workers 8
+
+Limitation: a worker only gets through about 10 cases a second, because every case
+builds its spends and runs the puzzles through chia's Program.run. A million cases is
+more than a day of CPU time, so runs of that size need a wide pool or have to be
+split across machines by seed.
+"""
+
+import argparse
+import dataclasses
+import random
+import sys
+import time
+
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.announcement_checker import AnnouncementChecker
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.strict_fungibility import CATType, NFTType
+from clvm_contracts.validating_meta_puzzle import (
+    AssetType,
+    LineageProof,
+    TypeChange,
+    VMP,
+    VMPSpend,
+    vmp_puzzle_hash,
+)
+
+from benchmarks.scenarios import ACS, ACS_PH
+
+BASIC_TYPE = BasicType.new()
+# few enough environments that types collide now and then
+ENVIRONMENTS = 8
+MAX_TYPES = 6
+MAX_RING_SIZE = 6
+
+CREATE_COIN = 51
+ASSERT_MY_PARENT_ID = 71
+REMARK = 1
+CREATE_COIN_ANNOUNCEMENT = 60
+
+
+class Mismatch(Exception):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class Failure:
+    case: int
+    property: str
+    message: str
+
+
+@dataclasses.dataclass(frozen=True)
+class FuzzReport:
+    seed: int
+    cases: int
+    failures: List[Failure]
+    seconds: float
+
+
+def random_hash(rng: random.Random) -> bytes32:
+    return bytes32(rng.getrandbits(256).to_bytes(32, "big"))
+
+
+def random_basic_type(rng: random.Random) -> AssetType:
+    return AssetType(
+        BASIC_TYPE.launcher_hash,
+        Program.to(rng.randrange(ENVIRONMENTS)),
+        BASIC_TYPE.pre_validator,
+        BASIC_TYPE.validator,
+        BASIC_TYPE.remover_hash,
+    )
+
+
+def random_conditions(rng: random.Random, max_count: int = 3) -> List[List]:
+    conditions: List[List] = []
+    for _ in range(rng.randrange(max_count + 1)):
+        kind: int = rng.randrange(3)
+        if kind == 0:
+            conditions.append([CREATE_COIN, random_hash(rng), rng.randrange(1, 1000)])
+        elif kind == 1:
+            conditions.append([REMARK, rng.randbytes(rng.randrange(33))])
+        else:
+            conditions.append([CREATE_COIN_ANNOUNCEMENT, rng.randbytes(rng.randrange(33))])
+    return conditions
+
+
+def vmp_coin(rng: random.Random, puzzle: VMP, amount: int) -> Tuple[Coin, LineageProof]:
+    # a coin whose parent had the same puzzle
+    parent = Coin(random_hash(rng), puzzle.get_tree_hash(), amount)
+    return (
+        Coin(parent.name(), puzzle.get_tree_hash(), amount),
+        LineageProof(parent.parent_coin_info, puzzle.get_types_hash(), ACS_PH, amount),
+    )
+
+
+def run_spend(spend: VMPSpend) -> Program:
+    # the programs of the coin spend, without serializing them
+    _, conditions = spend.puzzle_reveal().run_with_cost(INFINITE_COST, spend.solution())
+    return conditions
+
+
+def check_types(rng: random.Random) -> None:
+    puzzle = VMP(ACS, [random_basic_type(rng) for _ in range(rng.randrange(MAX_TYPES + 1))])
+    coin, lineage_proof = vmp_coin(rng, puzzle, rng.randrange(1, 1000))
+    expected: List[List] = []
+
+    additions: List[TypeChange] = []
+    for _ in range(rng.randrange(3)):
+        conditions = random_conditions(rng)
+        additions.append(BasicType.launch(random_basic_type(rng), conditions=Program.to(conditions)))
+        expected.extend(conditions)
+    spend = VMPSpend(coin, puzzle, lineage_proof=lineage_proof, type_additions=additions, sparse=rng.random() < 0.5)
+
+    removals: List[TypeChange] = []
+    for typ in spend.types:
+        if rng.random() < 0.3 and typ not in [removal.type for removal in removals]:
+            conditions = random_conditions(rng)
+            removals.append(BasicType.remove(typ, conditions=Program.to(conditions)))
+            # every copy of a removed type is removed
+            expected.extend(conditions * spend.types.count(typ))
+    if len(removals) > 0 or rng.random() < 0.5:
+        spend.type_removals = tuple(removals)
+
+    # the basic pre-validator outputs its secure solution as conditions
+    secure_solutions: List[Program] = []
+    for _ in spend.types:
+        conditions = random_conditions(rng) if rng.random() < 0.5 else []
+        secure_solutions.append(Program.to(conditions))
+        expected.extend(conditions)
+    spend.secure_solutions = tuple(secure_solutions)
+
+    for _ in range(rng.randrange(3)):
+        other = VMP(ACS, [random_basic_type(rng) for _ in range(rng.randrange(1, MAX_TYPES + 1))])
+        spend.add_type_proof(other.get_type_proof(rng.sample(other.types, rng.randrange(len(other.types) + 1))))
+
+    inner_conditions = [*random_conditions(rng), [REMARK, spend.security_hash()]]
+    spend.inner_solution = Program.to(inner_conditions)
+    expected.extend(inner_conditions)
+    if len(puzzle.types) > 0:
+        expected.append([ASSERT_MY_PARENT_ID, coin.parent_coin_info])
+
+    # The driver's view of the child: the types left after the spend
+    types_hash: Optional[bytes32] = None
+    if len(spend.types) > 0:
+        types_hash = VMP(ACS, spend.types).get_types_hash()
+        if types_hash != Program.to([typ.as_program() for typ in spend.types]).get_tree_hash():
+            raise Mismatch("the types hash is not the tree hash of the types")
+    predicted: List[bytes] = []
+    for condition in expected:
+        if condition[0] == CREATE_COIN and types_hash is not None:
+            condition = [CREATE_COIN, vmp_puzzle_hash(condition[1], types_hash), *condition[2:]]
+        predicted.append(bytes(Program.to(condition)))
+
+    try:
+        conditions = run_spend(spend)
+    except ValueError as e:
+        raise Mismatch(f"the puzzle rejected the driver's solution: {e}")
+    actual: List[bytes] = [bytes(condition) for condition in conditions.as_iter()]
+    if Counter(actual) != Counter(predicted):
+        raise Mismatch(
+            f"unexpected conditions {sorted((Counter(actual) - Counter(predicted)).elements())}, "
+            f"missing {sorted((Counter(predicted) - Counter(actual)).elements())}"
+        )
+
+
+def check_fungible(rng: random.Random) -> None:
+    nft: bool = rng.random() < 0.5
+    kind = NFTType if nft else CATType
+    fungible_types: List[AssetType] = [
+        kind.new(random_hash(rng), BASIC_TYPE.remover_hash, Program.to(None))
+        for _ in range(rng.randrange(1, 4))
+    ]
+    balanced: bool = rng.random() < 0.5
+    spends: List[VMPSpend] = []
+    for _ in range(rng.randrange(1, MAX_RING_SIZE + 1)):
+        types = rng.sample(fungible_types, rng.randrange(1, len(fungible_types) + 1))
+        if rng.random() < 0.3:
+            types.insert(rng.randrange(len(types) + 1), random_basic_type(rng))
+        puzzle = VMP(ACS, types)
+        coin, lineage_proof = vmp_coin(rng, puzzle, rng.randrange(1, 1000))
+        spends.append(VMPSpend(coin, puzzle, lineage_proof=lineage_proof))
+    # every type has to be in the ring for the driver to find its neighbours
+    for typ in fungible_types:
+        if not any(typ in spend.puzzle.types for spend in spends):
+            spends[0].puzzle = VMP(ACS, [typ, *spends[0].puzzle.types])
+            spends[0].coin, spends[0].lineage_proof = vmp_coin(rng, spends[0].puzzle, spends[0].coin.amount)
+
+    for spend in spends:
+        if nft:
+            outputs = [1] if balanced else [1] * rng.randrange(3)
+        elif balanced:
+            cuts = sorted(rng.sample(range(1, spend.coin.amount), min(spend.coin.amount - 1, rng.randrange(3))))
+            outputs = [b - a for a, b in zip([0, *cuts], [*cuts, spend.coin.amount])]
+        else:
+            outputs = [rng.randrange(1, 1000) for _ in range(rng.randrange(3))]
+        spend.inner_solution = Program.to(
+            [*([CREATE_COIN, random_hash(rng), amount] for amount in outputs), [REMARK, spend.security_hash()]]
+        )
+    kind.solve(spends)
+
+    # The driver's view: the last subtotal of a ring is what its spends add up to
+    closes: bool = True
+    for typ in fungible_types:
+        last = [spend for spend in spends if typ in spend.types][-1]
+        unsafe_solution = last.unsafe_solutions[last.index_of(typ)]
+        closes = closes and Program.from_bytes(bytes(unsafe_solution)).at("rrrrf").as_int() == 0
+    checker = AnnouncementChecker()
+    for spend in spends:
+        try:
+            checker.add_conditions(spend.coin.name(), spend.coin.puzzle_hash, run_spend(spend))
+        except ValueError as e:
+            raise Mismatch(f"a validator rejected the driver's subtotals: {e}")
+    report = checker.report()
+    if closes != (len(report.missing) == 0):
+        raise Mismatch(
+            f"the driver's subtotals {'close' if closes else 'do not close'} the ring "
+            f"but {len(report.missing)} announcements are missing"
+        )
+
+
+PROPERTIES: Dict[str, Callable[[random.Random], None]] = {
+    "types": check_types,
+    "fungible": check_fungible,
+}
+PROPERTY_NAMES: List[str] = list(PROPERTIES)
+
+
+def run_case(seed: int, case: int) -> Optional[Failure]:
+    name: str = PROPERTY_NAMES[case % len(PROPERTY_NAMES)]
+    rng = random.Random(f"{seed}:{case}")
+    try:
+        PROPERTIES[name](rng)
+    except Exception as e:
+        message: str = str(e) if isinstance(e, Mismatch) else f"{type(e).__name__}: {e}"
+        return Failure(case, name, message)
+    return None
+
+
+def run_cases(seed: int, start: int, stop: int) -> List[Failure]:
+    # runs on a worker
+    return [failure for failure in (run_case(seed, case) for case in range(start, stop)) if failure is not None]
+
+
+def fuzz(
+    cases: int,
+    seed: int = 0,
+    executor: Optional[Executor] = None,
+    chunk_size: int = 100,
+    log: Callable[[str], None] = lambda message: None,
+) -> FuzzReport:
+    start: float = time.perf_counter()
+    chunks = [(seed, low, min(cases, low + chunk_size)) for low in range(0, cases, chunk_size)]
+    results = (
+        map(lambda chunk: run_cases(*chunk), chunks)
+        if executor is None
+        else executor.map(run_cases, *zip(*chunks))
+    )
+    failures: List[Failure] = []
+    for (_, _, stop), chunk_failures in zip(chunks, results):
+        failures.extend(chunk_failures)
+        log(f"{stop}/{cases} cases, {len(failures)} failures")
+    return FuzzReport(seed, cases, failures, time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to one per CPU")
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--case", type=int, help="replay a single case")
+    args = parser.parse_args(argv)
+
+    if args.case is not None:
+        failure = run_case(args.seed, args.case)
+        print("ok" if failure is None else f"{failure.property}: {failure.message}")
+        return 0 if failure is None else 1
+    with ProcessPoolExecutor(args.workers) as executor:
+        report = fuzz(args.cases, args.seed, executor, args.chunk_size, print)
+    for failure in report.failures:
+        print(f"FAILURE case {failure.case} ({failure.property}): {failure.message}")
+    print(f"{report.cases} cases in {report.seconds:.1f}s ({report.cases / report.seconds:.0f}/s)")
+    return 1 if len(report.failures) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Wall clock scaling of the Python driver.
+
+Each operation is timed over a sweep of sizes (types per coin, spends per bundle, or
+fungible types per spend) and the results are written as JSON. Given a baseline
+written by an earlier run, every size that got slower than `--tolerance` allows and
+every operation whose log-log scaling exponent grew by more than `--exponent-tolerance`
+is flagged, and the run exits non-zero.
+
+The baseline defaults to driver_scaling_baseline.json next to this file, recorded on a
+single core with the Python version it names. Timings from other machines are only
+comparable in their exponents, so pass `--tolerance` to match or record a new baseline
+with `--output` first.
+
+    python -m benchmarks.driver_scaling
+    python -m benchmarks.driver_scaling --output benchmarks/driver_scaling_baseline.json --no-baseline
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.strict_fungibility import CATType, NFTType
+from clvm_contracts.validating_meta_puzzle import AssetType, LineageProof, VMP, VMPSpend
+
+from benchmarks.scenarios import ACS, ACS_PH, basic_spend
+
+TYPE_SIZES = [1, 10, 100, 1000]
+SPEND_SIZES = [1, 10, 100, 1000, 10000]
+FUNGIBLE_TYPE_SIZES = [1, 2, 4, 8]
+
+BASELINE = os.path.join(os.path.dirname(__file__), "driver_scaling_baseline.json")
+
+# setup(size) returns the operation to time, so that setup is left out of the timing
+Sweep = Tuple[str, List[int], Callable[[int], Callable[[], Any]]]
+
+
+def basic_types(count: int) -> List[AssetType]:
+    basic_type = BasicType.new()
+    return [
+        AssetType(
+            basic_type.launcher_hash,
+            Program.to(i),
+            basic_type.pre_validator,
+            basic_type.validator,
+            basic_type.remover_hash,
+        )
+        for i in range(count)
+    ]
+
+
+def cat_types(count: int) -> List[AssetType]:
+    basic_type = BasicType.new()
+    return [
+        CATType.new(bytes32(i.to_bytes(32, "big")), basic_type.remover_hash, basic_type.environment)
+        for i in range(count)
+    ]
+
+
+def unsolved_ring(size: int, types: List[AssetType]) -> List[VMPSpend]:
+    vmp = VMP(ACS, types)
+    spends: List[VMPSpend] = []
+    for i in range(size):
+        parent = Coin(bytes32(i.to_bytes(32, "big")), vmp.get_tree_hash(), 1)
+        spend = VMPSpend(
+            Coin(parent.name(), vmp.get_tree_hash(), 1),
+            vmp,
+            lineage_proof=LineageProof(parent.parent_coin_info, vmp.get_types_hash(), ACS_PH, 1),
+        )
+        spend.inner_solution = Program.to([[51, ACS_PH, 1], spend.remark()])
+        spends.append(spend)
+    return spends
+
+
+def sweeps(max_types: int = TYPE_SIZES[-1], max_spends: int = SPEND_SIZES[-1]) -> List[Sweep]:
+    type_sizes = [size for size in TYPE_SIZES if size <= max_types]
+    spend_sizes = [size for size in SPEND_SIZES if size <= max_spends]
+    nft_type = NFTType.new(BasicType.new().launcher_hash, BasicType.new().remover_hash, Program.to(None))
+
+    def with_vmp(operation: Callable[[VMP], Any]) -> Callable[[int], Callable[[], Any]]:
+        return lambda size: (lambda vmp: lambda: operation(vmp))(VMP(ACS, basic_types(size)))
+
+    return [
+        ("VMP.construct", type_sizes, with_vmp(lambda vmp: vmp.construct())),
+        ("VMP.get_types_hash", type_sizes, with_vmp(lambda vmp: vmp.get_types_hash())),
+        ("VMP.get_type_proof", type_sizes, with_vmp(lambda vmp: vmp.get_type_proof(vmp.types[:1]))),
+        (
+            "VMPSpend.to_coin_spend",
+            type_sizes,
+            lambda size: basic_spend(size).to_coin_spend,
+        ),
+        (
+            "CATType.solve",
+            spend_sizes,
+            lambda size: (lambda spends: lambda: CATType.solve(spends))(unsolved_ring(size, cat_types(1))),
+        ),
+        (
+            "NFTType.solve",
+            spend_sizes,
+            lambda size: (lambda spends: lambda: NFTType.solve(spends))(unsolved_ring(size, [nft_type])),
+        ),
+        (
+            "CATType.solve per fungible type",
+            FUNGIBLE_TYPE_SIZES,
+            lambda size: (lambda spends: lambda: CATType.solve(spends))(unsolved_ring(10, cat_types(size))),
+        ),
+    ]
+
+
+def time_operation(setup: Callable[[int], Callable[[], Any]], size: int, min_seconds: float) -> float:
+    # Best of at least three runs, each on a fresh setup, until `min_seconds` have been spent timing.
+    # Like timeit, collection is held off while timing.
+    best: float = math.inf
+    spent: float = 0.0
+    runs: int = 0
+    while runs < 3 or spent < min_seconds:
+        operation = setup(size)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            operation()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best
+
+
+def scaling_exponent(timings: Dict[int, float]) -> Optional[float]:
+    # slope of log(time) over log(size), 1.0 is linear
+    points = [(math.log(size), math.log(seconds)) for size, seconds in timings.items() if seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    if variance == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance
+
+
+def run(sweep_list: List[Sweep], min_seconds: float = 0.1, log: Callable[[str], None] = print) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, sizes, setup in sweep_list:
+        timings: Dict[int, float] = {}
+        for size in sizes:
+            timings[size] = time_operation(setup, size, min_seconds)
+            log(f"{name} [{size}]: {timings[size] * 1000:.3f}ms")
+        results[name] = {
+            "seconds": {str(size): seconds for size, seconds in timings.items()},
+            "exponent": scaling_exponent(timings),
+        }
+    return {"python": platform.python_version(), "results": results}
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 1.0,
+    exponent_tolerance: float = 0.25,
+) -> List[str]:
+    regressions: List[str] = []
+    for name, result in results["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for size, seconds in result["seconds"].items():
+            base_seconds = base["seconds"].get(size)
+            if base_seconds is not None and seconds > base_seconds * (1 + tolerance):
+                regressions.append(
+                    f"{name} [{size}]: {seconds * 1000:.3f}ms vs {base_seconds * 1000:.3f}ms"
+                )
+        # fitted over the sizes both runs have, so a cut short sweep compares like for like
+        shared = [size for size in result["seconds"] if size in base["seconds"]]
+        exponent = scaling_exponent({int(size): result["seconds"][size] for size in shared})
+        base_exponent = scaling_exponent({int(size): base["seconds"][size] for size in shared})
+        if exponent is not None and base_exponent is not None and exponent > base_exponent + exponent_tolerance:
+            regressions.append(f"{name}: scales as n^{exponent:.2f} vs n^{base_exponent:.2f}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE, help="compare against results written by an earlier run")
+    parser.add_argument("--no-baseline", action="store_true", help="skip the comparison")
+    parser.add_argument("--max-types", type=int, default=TYPE_SIZES[-1])
+    parser.add_argument("--max-spends", type=int, default=SPEND_SIZES[-1])
+    parser.add_argument("--min-seconds", type=float, default=0.1)
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    parser.add_argument("--exponent-tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = run(sweeps(args.max_types, args.max_spends), args.min_seconds)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.no_baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline["python"] != results["python"]:
+        print(f"Baseline recorded on Python {baseline['python']}, running {results['python']}")
+    regressions = compare(results, baseline, args.tolerance, args.exponent_tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if len(regressions) == 0:
+        print(f"No regressions against {args.baseline}")
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+End to end throughput of the driver stack.
+
+Simulates concurrent wallets with asyncio against a local `SpendSim`. Each wallet
+repeatedly builds, solves and submits one kind of transaction and waits for it to be
+farmed before building the next. Building runs on an executor so the event loop keeps
+farming and submitting for the other wallets meanwhile. A transaction that isn't farmed
+within `--timeout` seconds counts as a failure and stops its wallet:
+
+    cat        a CAT transfer
+    nft        an NFT move
+    singleton  a singleton claiming a p2_singleton coin
+
+    python -m benchmarks.load_generator --cat 8 --nft 8 --singleton 4 --transactions 10
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import math
+import time
+
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Tuple
+
+from blspy import G2Element
+
+from chia.clvm.spend_sim import SimClient, SpendSim
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.mempool_inclusion_status import MempoolInclusionStatus
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.strict_fungibility import CATType, NFTType, SingletonType
+from clvm_contracts.validating_meta_puzzle import (
+    INNER_PUZZLE_PREFIX,
+    NAMESPACE_PREFIX,
+    AssetType,
+    LineageProof,
+    TypeChange,
+    VMP,
+    VMPSpend,
+)
+
+from benchmarks.scenarios import ACS, ACS_PH
+
+KINDS = ("cat", "nft", "singleton")
+SOLVERS = {"cat": CATType.solve, "nft": NFTType.solve, "singleton": SingletonType.solve}
+EMPTY_VMP = VMP(ACS, [])
+
+
+def percentile(values: List[float], q: float) -> float:
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Wallet:
+    """A VMP coin with a single type and an ACS inner puzzle that keeps paying itself."""
+
+    def __init__(self, kind: str, coin: Coin, typ: AssetType, addition: TypeChange) -> None:
+        self.kind = kind
+        self.coin = coin
+        self.puzzle = EMPTY_VMP
+        self.lineage_proof: Optional[LineageProof] = None
+        self.pending: Optional[TypeChange] = addition
+        self.next_puzzle = VMP(ACS, [typ])
+        self.p2_coins: List[Coin] = []
+        self.cpu_seconds = 0.0
+
+    def build(self) -> SpendBundle:
+        cpu_start: float = time.thread_time()
+        spend = VMPSpend(
+            self.coin,
+            self.puzzle,
+            lineage_proof=self.lineage_proof,
+            type_additions=[] if self.pending is None else [self.pending],
+        )
+        conditions: List[Any] = [[51, ACS_PH, self.coin.amount], [1, spend.security_hash()]]
+        extra_spends: List[CoinSpend] = []
+        if self.kind == "singleton" and self.pending is None:
+            p2_coin: Coin = self.p2_coins.pop()
+            conditions.append(
+                [
+                    60,
+                    NAMESPACE_PREFIX
+                    + INNER_PUZZLE_PREFIX
+                    + Program.to((p2_coin.name(), ACS_PH)).get_tree_hash(),
+                ]
+            )
+        spend.inner_solution = Program.to(conditions)
+        solved: VMPSpend = SOLVERS[self.kind]([spend])[0]
+        if self.kind == "singleton" and self.pending is None:
+            extra_spends.append(
+                CoinSpend(
+                    p2_coin,
+                    SingletonType.p2(launcher_hash=self.puzzle.types[0].launcher_hash),
+                    SingletonType.solve_p2(
+                        vmp_spend=solved,
+                        coin=p2_coin,
+                        puzzle=ACS,
+                        solution=Program.to([[51, ACS_PH, p2_coin.amount]]),
+                    ),
+                )
+            )
+        bundle = SpendBundle([solved.to_coin_spend(), *extra_spends], G2Element())
+        self.cpu_seconds += time.thread_time() - cpu_start
+        return bundle
+
+    def advance(self) -> None:
+        # The child can be predicted without looking it up
+        self.lineage_proof = LineageProof(
+            self.coin.parent_coin_info,
+            self.puzzle.get_types_hash(),
+            ACS_PH,
+            self.coin.amount,
+        )
+        self.coin = Coin(self.coin.name(), self.next_puzzle.get_tree_hash(), self.coin.amount)
+        self.puzzle = self.next_puzzle
+        self.pending = None
+
+
+@dataclasses.dataclass
+class LoadReport:
+    wallets: Dict[str, int]
+    transactions: Dict[str, int]
+    failures: int
+    seconds: float
+    transactions_per_second: float
+    latency_seconds: Dict[str, float]
+    blocks: int
+    mean_block_cost: float
+    max_block_cost: int
+    driver_cpu_seconds: float
+
+
+class LoadGenerator:
+    def __init__(
+        self,
+        sim: SpendSim,
+        block_interval: float = 0.05,
+        timeout: float = 60.0,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.sim = sim
+        self.client = SimClient(sim)
+        self.block_interval = block_interval
+        # seconds to wait for a submitted bundle to be farmed
+        self.timeout = timeout
+        # where wallets build their bundles, the event loop's default thread pool if None
+        self.executor = executor
+        # bundle name -> future resolved when a block includes it
+        self.confirmations: Dict[bytes32, "asyncio.Future[None]"] = {}
+        self.block_costs: List[int] = []
+        self.latencies: List[float] = []
+        self.transactions: Dict[str, int] = {kind: 0 for kind in KINDS}
+        self.failures = 0
+        # the simulator's coin store can't be read while a block is being farmed
+        self.sim_lock = asyncio.Lock()
+
+    async def farm(self) -> Tuple[int, int]:
+        # Farm a block and return how many bundles it included and their total cost
+        async with self.sim_lock:
+            before: Dict[bytes32, int] = {
+                name: item.cost for name, item in self.sim.mempool_manager.mempool.spends.items()
+            }
+            await self.sim.farm_block()
+            after = self.sim.mempool_manager.mempool.spends
+        included = [name for name in before if name not in after]
+        for name in included:
+            future = self.confirmations.pop(name, None)
+            if future is not None and not future.done():
+                future.set_result(None)
+        return len(included), sum(before[name] for name in included)
+
+    async def farm_until_empty(self) -> None:
+        while len(self.sim.mempool_manager.mempool.spends) > 0:
+            await self.farm()
+
+    async def build(self, wallet: Wallet) -> SpendBundle:
+        return await asyncio.get_event_loop().run_in_executor(self.executor, wallet.build)
+
+    async def submit(self, bundle: SpendBundle) -> bool:
+        future: "asyncio.Future[None]" = asyncio.get_event_loop().create_future()
+        self.confirmations[bundle.name()] = future
+        async with self.sim_lock:
+            status, error = await self.client.push_tx(bundle)
+        if status != MempoolInclusionStatus.SUCCESS:
+            self.confirmations.pop(bundle.name(), None)
+            return False
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.confirmations.pop(bundle.name(), None)
+            return False
+        return True
+
+    async def create_wallets(self, counts: Dict[str, int], transactions: int) -> List[Wallet]:
+        total: int = sum(counts.values())
+        for _ in range(math.ceil(total / 2)):
+            await self.sim.farm_block(EMPTY_VMP.get_tree_hash())
+        coins: List[Coin] = [
+            record.coin
+            for record in await self.client.get_coin_records_by_puzzle_hash(
+                EMPTY_VMP.get_tree_hash(), include_spent_coins=False
+            )
+        ]
+        basic_type = BasicType.new()
+        types: Dict[str, AssetType] = {
+            "cat": CATType.new(basic_type.launcher_hash, basic_type.remover_hash, basic_type.environment),
+            "nft": NFTType.new(basic_type.launcher_hash, basic_type.remover_hash, basic_type.environment),
+        }
+        wallets: List[Wallet] = []
+        for kind in KINDS:
+            for _ in range(counts.get(kind, 0)):
+                coin: Coin = coins.pop()
+                if kind == "singleton":
+                    typ = SingletonType.new(coin.name(), basic_type.remover_hash, basic_type.environment)
+                    addition = SingletonType.launch(typ, conditions=Program.to(None), coin_id=coin.name())
+                    p2_puzzle_hash = SingletonType.p2_puzzle_hash(launcher_hash=typ.launcher_hash)
+                    for _ in range(math.ceil(transactions / 2)):
+                        await self.sim.farm_block(p2_puzzle_hash)
+                    wallet = Wallet(kind, coin, typ, addition)
+                    wallet.p2_coins = [
+                        record.coin
+                        for record in await self.client.get_coin_records_by_puzzle_hash(
+                            p2_puzzle_hash, include_spent_coins=False
+                        )
+                    ]
+                else:
+                    wallet = Wallet(kind, coin, types[kind], BasicType.launch(types[kind], conditions=Program.to(None)))
+                wallets.append(wallet)
+
+        # Adding the types isn't part of the measurement
+        for wallet in wallets:
+            status, error = await self.client.push_tx(await self.build(wallet))
+            if status != MempoolInclusionStatus.SUCCESS:
+                raise ValueError(f"Could not add the {wallet.kind} type: {error}")
+            wallet.advance()
+            wallet.cpu_seconds = 0.0
+        await self.farm_until_empty()
+        return wallets
+
+    async def run_wallet(self, wallet: Wallet, transactions: int) -> None:
+        for _ in range(transactions):
+            start: float = time.perf_counter()
+            if not await self.submit(await self.build(wallet)):
+                self.failures += 1
+                return
+            self.latencies.append(time.perf_counter() - start)
+            self.transactions[wallet.kind] += 1
+            wallet.advance()
+
+    async def run_farmer(self, done: asyncio.Event) -> None:
+        while not done.is_set():
+            await asyncio.sleep(self.block_interval)
+            count, cost = await self.farm()
+            if count > 0:
+                self.block_costs.append(cost)
+
+    async def run(self, counts: Dict[str, int], transactions: int) -> LoadReport:
+        wallets: List[Wallet] = await self.create_wallets(counts, transactions)
+        done = asyncio.Event()
+        farmer = asyncio.ensure_future(self.run_farmer(done))
+        start: float = time.perf_counter()
+        load = asyncio.ensure_future(
+            asyncio.gather(*(self.run_wallet(wallet, transactions) for wallet in wallets))
+        )
+        try:
+            # if the farmer fails first nothing would ever be confirmed
+            await asyncio.wait([load, farmer], return_when=asyncio.FIRST_COMPLETED)
+            if farmer.done():
+                load.cancel()
+            await load
+        finally:
+            done.set()
+            await farmer
+        seconds: float = time.perf_counter() - start
+        confirmed: int = sum(self.transactions.values())
+        return LoadReport(
+            wallets={kind: counts.get(kind, 0) for kind in KINDS},
+            transactions=dict(self.transactions),
+            failures=self.failures,
+            seconds=seconds,
+            transactions_per_second=confirmed / seconds,
+            latency_seconds={
+                f"p{round(q * 100)}": percentile(self.latencies, q) for q in (0.5, 0.9, 0.99)
+            },
+            blocks=len(self.block_costs),
+            mean_block_cost=sum(self.block_costs) / max(1, len(self.block_costs)),
+            max_block_cost=max(self.block_costs, default=0),
+            driver_cpu_seconds=sum(wallet.cpu_seconds for wallet in wallets),
+        )
+
+
+async def generate_load(
+    counts: Dict[str, int],
+    transactions: int,
+    block_interval: float = 0.05,
+    timeout: float = 60.0,
+    executor: Optional[Executor] = None,
+) -> LoadReport:
+    sim = await SpendSim.create()
+    try:
+        await sim.farm_block()
+        return await LoadGenerator(sim, block_interval, timeout, executor).run(counts, transactions)
+    finally:
+        await sim.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    for kind in KINDS:
+        parser.add_argument(f"--{kind}", type=int, default=2, help=f"number of {kind} wallets")
+    parser.add_argument("--transactions", type=int, default=5, help="transactions per wallet")
+    parser.add_argument("--block-interval", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for a transaction to be farmed")
+    args = parser.parse_args()
+    report = asyncio.get_event_loop().run_until_complete(
+        generate_load(
+            {kind: getattr(args, kind) for kind in KINDS}, args.transactions, args.block_interval, args.timeout
+        )
+    )
+    print(json.dumps(dataclasses.asdict(report), indent=4))
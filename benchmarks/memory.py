@@ -0,0 +1,21 @@
+import tracemalloc
+
+from benchmarks.scenarios import cat_ring
+
+
+def bytes_per_spend(size: int) -> float:
+    # Memory still held by `size` solved CAT spends once they have been built
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        spends = cat_ring(size)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(spends) == size
+    return (after - before) / size
+
+
+if __name__ == "__main__":
+    for size in (100, 1000):
+        print(f"{size} solved CAT spends: {bytes_per_spend(size):.0f} bytes per spend")
@@ -0,0 +1,155 @@
+from typing import Callable, List
+
+from chia.consensus.cost_calculator import NPCResult
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.generator_types import BlockGenerator
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.strict_fungibility import CATType, NFTType
+from clvm_contracts.validating_meta_puzzle import AssetType, LineageProof, TypeProof, VMP, VMPSpend
+
+ACS = Program.to(1)
+ACS_PH = ACS.get_tree_hash()
+
+
+def fungible_ring(
+    size: int,
+    types: List[AssetType],
+    solve: Callable[[List[VMPSpend]], List[VMPSpend]],
+    proofs: int = 0,
+) -> List[VMPSpend]:
+    # A ring of `size` solved spends of the same fungible types, each with a valid lineage proof
+    # and `proofs` type proofs on top of the ones the solver adds
+    vmp = VMP(ACS, types)
+    parents: List[Coin] = [
+        Coin(bytes32([i % 256] * 32), vmp.get_tree_hash(), 1000 + i) for i in range(size)
+    ]
+    spends: List[VMPSpend] = [
+        VMPSpend(
+            Coin(parent.name(), vmp.get_tree_hash(), parent.amount),
+            vmp,
+            lineage_proof=LineageProof(
+                parent.parent_coin_info, vmp.get_types_hash(), ACS_PH, parent.amount
+            ),
+            type_proofs=extra_proofs(types, proofs),
+        )
+        for parent in parents
+    ]
+    for spend in spends:
+        spend.inner_solution = Program.to(
+            [
+                [51, ACS_PH, spend.coin.amount],
+                [1, spend.security_hash()],
+            ]
+        )
+    return solve(spends)
+
+
+def extra_proofs(types: List[AssetType], count: int) -> List[TypeProof]:
+    # proofs of other coins with the same types, which the puzzle checks but nothing needs
+    return [VMP(Program.to(i), types).get_type_proof([]) for i in range(count)]
+
+
+def ring_types(new: Callable[..., AssetType], count: int, basic_types: int) -> List[AssetType]:
+    basic_type = BasicType.new()
+    launcher_hashes: List[bytes32] = [basic_type.launcher_hash] + [
+        bytes32(i.to_bytes(32, "big")) for i in range(1, count)
+    ]
+    return [
+        new(launcher_hash, basic_type.remover_hash, basic_type.environment) for launcher_hash in launcher_hashes
+    ] + [
+        AssetType(
+            basic_type.launcher_hash,
+            Program.to(i),
+            basic_type.pre_validator,
+            basic_type.validator,
+            basic_type.remover_hash,
+        )
+        for i in range(basic_types)
+    ]
+
+
+def cat_ring(size: int, cat_types: int = 1, basic_types: int = 0, proofs: int = 0) -> List[VMPSpend]:
+    return fungible_ring(size, ring_types(CATType.new, cat_types, basic_types), CATType.solve, proofs)
+
+
+def nft_ring(size: int, nft_types: int = 1, basic_types: int = 0, proofs: int = 0) -> List[VMPSpend]:
+    return fungible_ring(size, ring_types(NFTType.new, nft_types, basic_types), NFTType.solve, proofs)
+
+
+def basic_spend(
+    type_count: int, additions: int = 0, removals: int = 0, payments: int = 1, index: int = 0, proofs: int = 0
+) -> VMPSpend:
+    # A coin with `type_count` basic types that adds and removes some of them and carries `proofs` type proofs
+    basic_type = BasicType.new()
+    types = [
+        AssetType(
+            basic_type.launcher_hash,
+            Program.to(i),
+            basic_type.pre_validator,
+            basic_type.validator,
+            basic_type.remover_hash,
+        )
+        for i in range(type_count + additions)
+    ]
+    vmp = VMP(ACS, types[:type_count])
+    amount: int = payments * (payments + 1) // 2
+    parent = Coin(bytes32(index.to_bytes(32, "big")), vmp.get_tree_hash(), amount)
+    spend = VMPSpend(
+        Coin(parent.name(), vmp.get_tree_hash(), amount),
+        vmp,
+        lineage_proof=LineageProof(parent.parent_coin_info, vmp.get_types_hash(), ACS_PH, amount),
+        type_proofs=extra_proofs(types[:type_count], proofs),
+        type_additions=[
+            BasicType.launch(typ, conditions=Program.to(None)) for typ in types[type_count:]
+        ],
+        type_removals=[
+            BasicType.remove(typ, conditions=Program.to(None)) for typ in types[:removals]
+        ],
+    )
+    # the REMARK goes first so the puzzle finds it without walking the payments
+    spend.inner_solution = Program.to([spend.remark()] + [[51, ACS_PH, i + 1] for i in range(payments)])
+    spend.remark_index = 0
+    return spend
+
+
+def wide_spend(type_count: int, sparse: bool, index: int = 0) -> VMPSpend:
+    # A coin with `type_count` types that removes one of them and solves another
+    basic_type = BasicType.new()
+    types = [
+        AssetType(
+            basic_type.launcher_hash,
+            Program.to(i),
+            basic_type.pre_validator,
+            basic_type.validator,
+            basic_type.remover_hash,
+        )
+        for i in range(type_count)
+    ]
+    wide_vmp = VMP(ACS, types)
+    parent = Coin(bytes32(index.to_bytes(32, "big")), wide_vmp.get_tree_hash(), 1)
+    spend = VMPSpend(
+        Coin(parent.name(), wide_vmp.get_tree_hash(), 1),
+        wide_vmp,
+        lineage_proof=LineageProof(parent.parent_coin_info, wide_vmp.get_types_hash(), ACS_PH, 1),
+        type_removals=[BasicType.remove(types[type_count // 2], conditions=Program.to(None))],
+        sparse=sparse,
+    )
+    secure_solutions = [Program.to(None)] * len(spend)
+    secure_solutions[-1] = Program.to([[1, b"secured"]])
+    spend.secure_solutions = secure_solutions
+    spend.set_unsafe_solution(0, Program.to([b"unsafe"]))
+    spend.inner_solution = Program.to([[51, ACS_PH, 1], [1, spend.security_hash()]])
+    return spend
+
+
+def run_generator(generator: BlockGenerator) -> NPCResult:
+    result: NPCResult = get_name_puzzle_conditions(
+        generator, INFINITE_COST, cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE, mempool_mode=True
+    )
+    assert result.error is None
+    return result
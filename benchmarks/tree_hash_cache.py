@@ -0,0 +1,32 @@
+import time
+
+from clvm_contracts.curried_template import TREE_HASH_CACHE, tree_hash
+from clvm_contracts.validating_meta_puzzle import LineageProof, VMP
+
+from benchmarks.scenarios import ACS, cat_ring
+
+
+def solve_and_build(rounds: int, size: int, max_size: int) -> float:
+    # Solve a CAT ring, then predict every child and its lineage proof, over and over
+    TREE_HASH_CACHE.clear()
+    TREE_HASH_CACHE.max_size = max_size
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for spend in cat_ring(size):
+            child = VMP(ACS, spend.types)
+            child.get_tree_hash()
+            LineageProof(
+                spend.coin.parent_coin_info,
+                spend.puzzle.get_types_hash(),
+                tree_hash(spend.puzzle.inner_puzzle),
+                spend.coin.amount,
+            )
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    uncached = solve_and_build(5, 100, 0)
+    cached = solve_and_build(5, 100, 10000)
+    print(f"500 spends solved and built without the cache: {uncached:.2f}s")
+    print(f"500 spends solved and built with the cache:    {cached:.2f}s")
+    print(f"hits: {TREE_HASH_CACHE.hits}, misses: {TREE_HASH_CACHE.misses}")
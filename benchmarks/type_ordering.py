@@ -0,0 +1,110 @@
+"""
+Cost of the type proofs made of a coin, with its types in the order they were added
+and in the order chosen by clvm_contracts.type_ordering.
+
+Every proof in the usage is made for real by a spend that carries it, and its cost
+is what that spend costs over one carrying a proof that reveals no types.
+
+    python -m benchmarks.type_ordering
+"""
+
+import json
+import random
+
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from blspy import G2Element
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.type_ordering import (
+    REVEALED_TYPE_BYTES,
+    TypeUsage,
+    expected_proof_cost,
+    optimal_order,
+)
+from clvm_contracts.validating_meta_puzzle import AssetType, LineageProof, TypeProof, VMP, VMPSpend
+
+from benchmarks.driver_scaling import basic_types
+from benchmarks.scenarios import ACS, ACS_PH
+
+
+def spend_cost(type_proof: TypeProof) -> int:
+    # a one type coin carrying `type_proof`
+    vmp = VMP(ACS, basic_types(1))
+    parent = Coin(bytes32([0] * 32), vmp.get_tree_hash(), 1)
+    spend = VMPSpend(
+        Coin(parent.name(), vmp.get_tree_hash(), 1),
+        vmp,
+        lineage_proof=LineageProof(parent.parent_coin_info, vmp.get_types_hash(), ACS_PH, 1),
+        type_proofs=[type_proof],
+    )
+    spend.inner_solution = Program.to([[51, ACS_PH, 1], [1, spend.security_hash()]])
+    result = get_name_puzzle_conditions(
+        simple_solution_generator(SpendBundle([spend.to_coin_spend()], G2Element())),
+        INFINITE_COST,
+        cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE,
+        mempool_mode=True,
+    )
+    assert result.error is None
+    return result.cost
+
+
+def proof_cost(types: Sequence[AssetType], proved: Sequence[AssetType]) -> int:
+    vmp = VMP(ACS, list(types))
+    return spend_cost(vmp.get_type_proof(list(proved))) - spend_cost(vmp.get_type_proof([]))
+
+
+def measured_proof_cost(types: Sequence[AssetType], usage: TypeUsage) -> float:
+    by_hash: Dict[bytes32, AssetType] = {typ.get_tree_hash(): typ for typ in types}
+    return sum(
+        weight * proof_cost(types, [by_hash[type_hash] for type_hash in proved])
+        for proved, weight in usage.proofs
+    )
+
+
+def revealed_type_execution_cost(count: int = 8) -> float:
+    # what revealing one more type costs beyond its bytes
+    types = basic_types(count)
+    step: float = (proof_cost(types, types[-2:-1]) - proof_cost(types, types[:1])) / (count - 2)
+    return step - REVEALED_TYPE_BYTES * DEFAULT_CONSTANTS.COST_PER_BYTE
+
+
+def skewed_usage(types: Sequence[AssetType], seed: int = 0) -> TypeUsage:
+    # a few types are proved far more often than the rest, and some pairs together
+    rng = random.Random(seed)
+    hashes: List[bytes32] = [typ.get_tree_hash() for typ in types]
+    popular: List[bytes32] = rng.sample(hashes, len(hashes))
+    proofs: List[Tuple[FrozenSet[bytes32], float]] = [
+        (frozenset([type_hash]), 1 / (rank + 1)) for rank, type_hash in enumerate(popular)
+    ]
+    proofs += [(frozenset(rng.sample(hashes, 2)), 0.2) for _ in range(len(hashes) // 3)]
+    return TypeUsage(proofs)
+
+
+def run(type_counts: Sequence[int] = (4, 8, 12)) -> Dict[str, object]:
+    results: Dict[str, object] = {"revealed_type_execution_cost": revealed_type_execution_cost()}
+    for count in type_counts:
+        types = basic_types(count)
+        usage = skewed_usage(types)
+        ordered = optimal_order(types, usage)
+        added: float = measured_proof_cost(types, usage)
+        best: float = measured_proof_cost(ordered, usage)
+        results[f"{count} types"] = {
+            "as_added": round(added),
+            "optimized": round(best),
+            "saved": f"{1 - best / added:.1%}",
+            "predicted_saved": round(expected_proof_cost(types, usage) - expected_proof_cost(ordered, usage)),
+            "measured_saved": round(added - best),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=4))
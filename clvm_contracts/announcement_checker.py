@@ -0,0 +1,171 @@
+import dataclasses
+
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+
+from clvm_contracts.curried_template import sha256
+from clvm_contracts.validating_meta_puzzle import INNER_PUZZLE_PREFIX, NAMESPACE_PREFIX, VMP_MOD, VMPSpend
+
+CREATE_COIN_ANNOUNCEMENT = bytes([60])
+ASSERT_COIN_ANNOUNCEMENT = bytes([61])
+CREATE_PUZZLE_ANNOUNCEMENT = bytes([62])
+ASSERT_PUZZLE_ANNOUNCEMENT = bytes([63])
+CREATES = (CREATE_COIN_ANNOUNCEMENT, CREATE_PUZZLE_ANNOUNCEMENT)
+ASSERTS = (ASSERT_COIN_ANNOUNCEMENT, ASSERT_PUZZLE_ANNOUNCEMENT)
+# matches the check in enforce_namespace
+NAMESPACED_LENGTH = len(NAMESPACE_PREFIX) + 32
+# a curried VMP is revealed as (a (q . VMP_MOD) ...)
+VMP_PREFIX = bytes([0xFF, 0x02, 0xFF, 0xFF, 0x01]) + bytes(VMP_MOD)
+
+
+@dataclasses.dataclass(frozen=True)
+class Announcement:
+    __slots__ = ("coin_id", "opcode", "announcement_id", "message")
+    # the coin that created or asserted the announcement
+    coin_id: bytes32
+    opcode: int
+    announcement_id: bytes32
+    # None for assertions, which only carry the announcement id
+    message: Optional[bytes]
+
+    def namespace(self) -> Optional[bytes32]:
+        if (
+            self.message is None
+            or len(self.message) < NAMESPACED_LENGTH
+            or not self.message.startswith(NAMESPACE_PREFIX)
+        ):
+            return None
+        return bytes32(self.message[len(NAMESPACE_PREFIX) : NAMESPACED_LENGTH])
+
+
+@dataclasses.dataclass(frozen=True)
+class AnnouncementReport:
+    # asserted announcements that no spend creates
+    missing: List[Announcement]
+    # created announcements that nothing asserts, these are allowed but usually a mistake
+    unasserted: List[Announcement]
+    # namespaced announcements from a puzzle that may not use that namespace, which is any
+    # puzzle other than a VMP
+    namespace_violations: List[Announcement]
+    # coin id -> error for spends that could not be run
+    failures: Dict[bytes32, str]
+
+    @property
+    def ok(self) -> bool:
+        return (
+            len(self.missing) == 0
+            and len(self.namespace_violations) == 0
+            and len(self.failures) == 0
+        )
+
+
+def announcements(
+    coin_id: bytes32, puzzle_hash: bytes32, conditions: Program
+) -> Iterable[Announcement]:
+    # walk the raw pairs rather than wrapping every node in a Program
+    node = conditions.pair
+    while node is not None:
+        condition, rest = node
+        node = rest.pair
+        if condition.pair is None:
+            continue
+        opcode: Optional[bytes] = condition.pair[0].atom
+        if opcode not in CREATES and opcode not in ASSERTS:
+            continue
+        args = condition.pair[1].pair
+        value: Optional[bytes] = None if args is None else args[0].atom
+        if value is None:
+            continue
+        if opcode in CREATES:
+            origin: bytes32 = coin_id if opcode == CREATE_COIN_ANNOUNCEMENT else puzzle_hash
+            yield Announcement(coin_id, opcode[0], sha256(origin, value), value)
+        else:
+            yield Announcement(coin_id, opcode[0], bytes32(value), None)
+
+
+def is_vmp(coin_spend: CoinSpend) -> bool:
+    return bytes(coin_spend.puzzle_reveal).startswith(VMP_PREFIX)
+
+
+class AnnouncementChecker:
+    """
+    Runs every spend of a bundle once and matches the announcements it asserts
+    against the ones created across the bundle, so a broken announcement ring shows
+    up before the bundle is pushed. Conditions that were already computed can be
+    added directly with `add_conditions`. Namespaced announcements are reported when
+    a puzzle other than a VMP makes them, or when the inner puzzle of a failing VMP
+    spend does.
+    """
+
+    def __init__(self) -> None:
+        # announcement id -> the announcement that created it
+        self.created: Dict[bytes32, Announcement] = {}
+        self.asserted: List[Announcement] = []
+        self.asserted_ids: Set[bytes32] = set()
+        self.namespace_violations: List[Announcement] = []
+        self.failures: Dict[bytes32, str] = {}
+
+    def add_conditions(
+        self, coin_id: bytes32, puzzle_hash: bytes32, conditions: Program, namespaced: bool = True
+    ) -> None:
+        # `namespaced` is False for puzzles that may not announce into any namespace
+        for announcement in announcements(coin_id, puzzle_hash, conditions):
+            if announcement.message is None:
+                self.asserted.append(announcement)
+                self.asserted_ids.add(announcement.announcement_id)
+            else:
+                self.created[announcement.announcement_id] = announcement
+                if not namespaced and announcement.namespace() is not None:
+                    self.namespace_violations.append(announcement)
+
+    def add_spend(self, spend: Union[VMPSpend, CoinSpend]) -> None:
+        coin_id: bytes32 = spend.coin.name()
+        try:
+            # a VMPSpend whose REMARK can't be found fails before it is run
+            coin_spend: CoinSpend = spend.to_coin_spend() if isinstance(spend, VMPSpend) else spend
+            _, conditions = coin_spend.puzzle_reveal.run_with_cost(INFINITE_COST, coin_spend.solution)
+        except ValueError as e:
+            self.failures[coin_id] = str(e)
+            if isinstance(spend, VMPSpend):
+                self._check_inner_namespace(spend, coin_id)
+            return
+        # a VMP that ran has already kept its inner puzzle and types to their own namespaces
+        self.add_conditions(
+            coin_id,
+            coin_spend.coin.puzzle_hash,
+            conditions,
+            namespaced=isinstance(spend, VMPSpend) or is_vmp(coin_spend),
+        )
+
+    def _check_inner_namespace(self, spend: VMPSpend, coin_id: bytes32) -> None:
+        # The VMP raises on an inner puzzle announcing into another namespace, so run the
+        # inner puzzle alone to say which announcement it was
+        try:
+            conditions: Program = spend.puzzle.inner_puzzle.run(spend.inner_solution)
+        except ValueError:
+            return
+        for announcement in announcements(coin_id, spend.coin.puzzle_hash, conditions):
+            namespace: Optional[bytes32] = announcement.namespace()
+            if namespace is not None and namespace != INNER_PUZZLE_PREFIX:
+                self.namespace_violations.append(announcement)
+
+    def add_spends(self, spends: Iterable[Union[VMPSpend, CoinSpend]]) -> None:
+        for spend in spends:
+            self.add_spend(spend)
+
+    def report(self) -> AnnouncementReport:
+        return AnnouncementReport(
+            [a for a in self.asserted if a.announcement_id not in self.created],
+            [a for a_id, a in self.created.items() if a_id not in self.asserted_ids],
+            list(self.namespace_violations),
+            dict(self.failures),
+        )
+
+
+def check_announcements(spends: Iterable[Union[VMPSpend, CoinSpend]]) -> AnnouncementReport:
+    checker = AnnouncementChecker()
+    checker.add_spends(spends)
+    return checker.report()
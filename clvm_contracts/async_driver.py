@@ -0,0 +1,204 @@
+"""
+Async counterparts of the CPU heavy driver calls, for services running on asyncio.
+
+The work is split into chunks that run on an executor, so the event loop stays free
+to serve other requests while a large bundle is built. Programs that came out of
+running CLVM can't be used from any thread but the one that made them, so every chunk
+is passed through clvm_contracts.codec, whether the executor is a thread or a process
+pool. Encoding and decoding have to happen on the event loop's thread, so they are done
+a chunk at a time with the loop free to run other tasks in between, and results are
+streamed back as each chunk finishes.
+Closing a stream early, or cancelling the task reading it, cancels the chunks that
+haven't started yet.
+"""
+
+import asyncio
+import collections.abc
+
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+
+from clvm_contracts.codec import VMPReader, VMPWriter, decode_spends, decode_vmps, encode_spends, encode_vmps
+from clvm_contracts.load_clvm import load_clvm
+from clvm_contracts.validating_meta_puzzle import VMP, VMPSpend
+
+T = TypeVar("T")
+Call = Tuple[int, Callable[..., T], Tuple[Any, ...]]
+
+Solver = Callable[[List[VMPSpend]], List[VMPSpend]]
+
+
+def _encoded_coin_spends(encoded_spends: bytes) -> List[bytes]:
+    return [bytes(spend.to_coin_spend()) for spend in decode_spends(encoded_spends)]
+
+
+def _encoded_tree_hashes(encoded_vmps: bytes) -> List[bytes32]:
+    return [vmp.get_tree_hash() for vmp in decode_vmps(encoded_vmps)]
+
+
+def _encoded_solve(encoded_spends: bytes, solver: Solver) -> bytes:
+    return encode_spends(solver(decode_spends(encoded_spends)))
+
+
+def _encoded_load_clvm(clvm_filename: str, package_or_requirement: str) -> bytes:
+    return bytes(load_clvm(clvm_filename, package_or_requirement=package_or_requirement))
+
+
+async def _async_calls(calls: Iterator[Call[T]]) -> AsyncIterator[Call[T]]:
+    for call in calls:
+        yield call
+
+
+def chunks(items: Sequence[T], chunk_size: int) -> Iterator[Tuple[int, Sequence[T]]]:
+    # each chunk with the index of its first item
+    for start in range(0, len(items), chunk_size):
+        yield start, items[start : start + chunk_size]
+
+
+class AsyncDriver:
+    """
+    Runs driver calls on `executor`, or on the event loop's default thread pool if
+    it is None. At most `max_concurrency` chunks from this driver are on the executor
+    at once, across every call being awaited, so one large bundle can't queue ahead
+    of everyone else. Solvers passed to a process pool must be picklable, which the
+    `solve` staticmethods of the type classes are.
+    """
+
+    def __init__(
+        self, executor: Optional[Executor] = None, chunk_size: int = 100, max_concurrency: int = 4
+    ) -> None:
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        # a semaphore belongs to the loop it was made on, so one is made for each loop
+        self._semaphore: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_event_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.max_concurrency))
+        return self._semaphore[1]
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        async with self.semaphore():
+            return await asyncio.get_event_loop().run_in_executor(self.executor, func, *args)
+
+    async def stream(
+        self, calls: Union[Iterator[Call[T]], AsyncIterator[Call[T]]]
+    ) -> AsyncIterator[Tuple[int, T]]:
+        """
+        Run each (key, func, args) from `calls`, which may be an async iterator, and
+        yield (key, result) in the order they finish.
+        Only `max_concurrency` calls are scheduled ahead of the one being waited on.
+        The loop gets a turn after each call is taken from `calls` and after each result
+        is yielded, since callers encode and decode chunks on it.
+        """
+        pending: Set["asyncio.Future[Tuple[int, T]]"] = set()
+        if isinstance(calls, collections.abc.Iterator):
+            calls = _async_calls(calls)
+
+        async def keyed(key: int, func: Callable[..., T], args: Tuple[Any, ...]) -> Tuple[int, T]:
+            return key, await self.run(func, *args)
+
+        try:
+            while True:
+                while len(pending) < self.max_concurrency:
+                    try:
+                        key, func, args = await calls.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    pending.add(asyncio.ensure_future(keyed(key, func, args)))
+                    await asyncio.sleep(0)
+                if len(pending) == 0:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    await asyncio.sleep(0)
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def encode_in_chunks(self, spends: Sequence[VMPSpend]) -> bytes:
+        # one stream, so programs shared across the spends are still written once
+        writer = VMPWriter()
+        for _, chunk in chunks(spends, self.chunk_size):
+            for spend in chunk:
+                writer.write_spend(spend)
+            await asyncio.sleep(0)
+        return writer.getvalue()
+
+    async def decode_in_chunks(self, data: bytes) -> List[VMPSpend]:
+        reader = VMPReader(data)
+        spends: List[VMPSpend] = []
+        while not reader.at_end():
+            for _ in range(self.chunk_size):
+                if reader.at_end():
+                    break
+                spends.append(reader.read_spend())
+            await asyncio.sleep(0)
+        return spends
+
+    async def coin_spends(self, spends: Sequence[VMPSpend]) -> AsyncIterator[Tuple[int, List[CoinSpend]]]:
+        # (index of the first spend, its coin spends) for each chunk of `spends`
+        calls = (
+            (start, _encoded_coin_spends, (encode_spends(chunk),))
+            for start, chunk in chunks(spends, self.chunk_size)
+        )
+        async for start, coin_spends in self.stream(calls):
+            yield start, [CoinSpend.from_bytes(coin_spend) for coin_spend in coin_spends]
+
+    async def to_coin_spends(self, spends: Sequence[VMPSpend]) -> List[CoinSpend]:
+        coin_spends: List[Optional[CoinSpend]] = [None] * len(spends)
+        async for start, chunk in self.coin_spends(spends):
+            coin_spends[start : start + len(chunk)] = chunk
+        return coin_spends  # type: ignore
+
+    async def tree_hashes(self, vmps: Sequence[VMP]) -> AsyncIterator[Tuple[int, List[bytes32]]]:
+        # (index of the first VMP, their tree hashes) for each chunk of `vmps`
+        calls = (
+            (start, _encoded_tree_hashes, (encode_vmps(chunk),)) for start, chunk in chunks(vmps, self.chunk_size)
+        )
+        async for start, hashes in self.stream(calls):
+            yield start, hashes
+
+    async def get_tree_hashes(self, vmps: Sequence[VMP]) -> List[bytes32]:
+        hashes: List[bytes32] = [bytes32([0] * 32)] * len(vmps)
+        async for start, chunk in self.tree_hashes(vmps):
+            hashes[start : start + len(chunk)] = chunk
+        return hashes
+
+    async def solve(self, spends: List[VMPSpend], solver: Solver) -> List[VMPSpend]:
+        # a ring is solved as a whole, so only its encoding is split into chunks
+        solved: bytes = await self.run(_encoded_solve, await self.encode_in_chunks(spends), solver)
+        return await self.decode_in_chunks(solved)
+
+    async def solve_rings(
+        self, rings: Sequence[List[VMPSpend]], solver: Solver
+    ) -> AsyncIterator[Tuple[int, List[VMPSpend]]]:
+        # (index of the ring, its solved spends) for each of `rings`
+        async def calls() -> AsyncIterator[Call[bytes]]:
+            for index, ring in enumerate(rings):
+                yield index, _encoded_solve, (await self.encode_in_chunks(ring), solver)
+
+        async for index, solved in self.stream(calls()):
+            yield index, await self.decode_in_chunks(solved)
+
+    async def load_clvm(self, clvm_filename: str, package_or_requirement: str) -> Program:
+        return Program.from_bytes(await self.run(_encoded_load_clvm, clvm_filename, package_or_requirement))
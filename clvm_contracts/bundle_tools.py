@@ -0,0 +1,160 @@
+import hashlib
+import itertools
+
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from blspy import G2Element
+
+from chia.types.blockchain_format.program import Program, SerializedProgram
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.generator_types import BlockGenerator
+from chia.types.spend_bundle import SpendBundle
+from chia.util.ints import uint32
+
+from clvm_contracts.validating_meta_puzzle import SPARSE_EXPANDER, VMP_MOD, VMPSpend
+
+
+def shared_path(index: int) -> int:
+    # the environment path of the item at `index` in a list: r^index then f
+    return 3 * (2 ** index) - 1
+
+
+def vmp_shared_programs(spends: List[VMPSpend]) -> List[Program]:
+    # The programs every VMP spend reveals: the mod itself, the curried TYPES, and the
+    # pre-validators and validators that are revealed in the solution
+    shared: List[Program] = [VMP_MOD]
+    if any(spend.sparse for spend in spends):
+        shared.append(SPARSE_EXPANDER)
+    for spend in spends:
+        shared.append(Program.to([t.as_program() for t in spend.puzzle.types]))
+        for typ in spend.types:
+            shared.append(typ.pre_validator)
+            shared.append(typ.validator)
+    return shared
+
+
+def compress_tree(tree: Program, shared: Dict[bytes32, int]) -> Program:
+    """
+    Return a program that evaluates to `tree` when run in an environment where the
+    entries of `shared` (tree hash -> environment path) can be found. Every subtree
+    matching a shared entry is replaced with its path, subtrees that contain no
+    matches are quoted whole, and everything in between is rebuilt with `c`.
+    """
+    # iterative post-order walk since coin spend lists are far deeper than the recursion limit
+    # each result is (tree_hash, node, expression) where expression is None for a literal subtree
+    results: List[Tuple[bytes32, Program, Optional[Program]]] = []
+    stack: List[Tuple[Program, bool]] = [(tree, False)]
+    while len(stack) > 0:
+        node, visited = stack.pop()
+        if node.pair is None:
+            results.append((bytes32(hashlib.sha256(b"\1" + node.atom).digest()), node, None))
+        elif not visited:
+            stack.append((node, True))
+            stack.append((node.rest(), False))
+            stack.append((node.first(), False))
+        else:
+            right_hash, right, right_expr = results.pop()
+            left_hash, left, left_expr = results.pop()
+            node_hash = bytes32(hashlib.sha256(b"\2" + left_hash + right_hash).digest())
+            if node_hash in shared:
+                results.append((node_hash, node, Program.to(shared[node_hash])))
+            elif left_expr is None and right_expr is None:
+                results.append((node_hash, node, None))
+            else:
+                results.append(
+                    (
+                        node_hash,
+                        node,
+                        Program.to(
+                            [
+                                4,
+                                (1, left) if left_expr is None else left_expr,
+                                (1, right) if right_expr is None else right_expr,
+                            ]
+                        ),
+                    )
+                )
+    _, node, expr = results.pop()
+    return Program.to((1, node)) if expr is None else expr
+
+
+def compressed_solution_generator(
+    bundle: SpendBundle, shared_programs: List[Program]
+) -> BlockGenerator:
+    """
+    Build a block generator that reveals each of `shared_programs` once and
+    back-references it from every coin spend that uses it:
+        (a (q . <compressed coin spend list>) (q . <shared programs>))
+    """
+    shared: Dict[bytes32, int] = {}
+    shared_list: List[Program] = []
+    for program in shared_programs:
+        program_hash: bytes32 = program.get_tree_hash()
+        # atoms are cheaper to quote than to reference
+        if program.pair is not None and program_hash not in shared:
+            shared[program_hash] = shared_path(len(shared_list))
+            shared_list.append(program)
+
+    coin_spend_entries = Program.to(
+        [
+            [
+                [
+                    cs.coin.parent_coin_info,
+                    cs.puzzle_reveal.to_program(),
+                    cs.coin.amount,
+                    cs.solution.to_program(),
+                ]
+                for cs in bundle.coin_spends
+            ]
+        ]
+    )
+    block_program = Program.to(
+        [2, (1, compress_tree(coin_spend_entries, shared)), (1, shared_list)]
+    )
+    return BlockGenerator(SerializedProgram.from_program(block_program), [], [])
+
+
+def stream_coin_spends(
+    spends: Iterable[Union[VMPSpend, CoinSpend]], out: BinaryIO, bundle_hash=None
+) -> int:
+    # Serialize each spend as soon as it is produced so only one is ever held in memory
+    count: int = 0
+    for spend in spends:
+        serialized: bytes = bytes(spend)
+        out.write(serialized)
+        if bundle_hash is not None:
+            bundle_hash.update(serialized)
+        count += 1
+    return count
+
+
+def stream_spend_bundle(
+    spends: Iterable[Union[VMPSpend, CoinSpend]],
+    count: int,
+    aggregated_signature: G2Element,
+    out: BinaryIO,
+) -> bytes32:
+    """
+    Write the serialized form of `SpendBundle(list(spends), aggregated_signature)` to `out`
+    (a file, or `socket.makefile("wb")`) without building the list, and return the bundle name.
+    The spend count prefixes the list so it must be known up front.
+
+    At most `count + 1` spends are read. If there are fewer or more than `count`, a ValueError
+    is raised after the spends read so far have been written, so `out` then holds a truncated
+    or corrupt bundle that must be discarded.
+    """
+    bundle_hash = hashlib.sha256()
+    prefix: bytes = bytes(uint32(count))
+    out.write(prefix)
+    bundle_hash.update(prefix)
+    iterator: Iterator[Union[VMPSpend, CoinSpend]] = iter(spends)
+    written: int = stream_coin_spends(itertools.islice(iterator, count), out, bundle_hash)
+    if written != count:
+        raise ValueError(f"Expected {count} spends but {written} were streamed")
+    if next(iterator, None) is not None:
+        raise ValueError(f"Expected {count} spends but more were given")
+    signature: bytes = bytes(aggregated_signature)
+    out.write(signature)
+    bundle_hash.update(signature)
+    return bytes32(bundle_hash.digest())
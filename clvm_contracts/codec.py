@@ -0,0 +1,280 @@
+"""
+A compact binary format for passing driver objects between processes.
+
+Every program is written once per stream: the first time a program appears it is
+written as its table index followed by its serialized length and bytes, and every
+later appearance is just the index. A stream has to be read back in the order it
+was written with a single `VMPReader`.
+"""
+
+import struct
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program, SerializedProgram
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.util.ints import uint64
+
+from clvm_contracts.validating_meta_puzzle import (
+    AssetType,
+    LineageProof,
+    TypeChange,
+    TypeProof,
+    VMP,
+    VMPSpend,
+)
+
+UINT32 = struct.Struct(">I")
+UINT64 = struct.Struct(">Q")
+
+
+class VMPWriter:
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.program_indexes: Dict[bytes, int] = {}
+        # id(program) -> (program, index) so the same object is only serialized once
+        self.seen: Dict[int, Tuple[Any, int]] = {}
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buffer)
+
+    def write_uint32(self, value: int) -> None:
+        self.buffer += UINT32.pack(value)
+
+    def write_uint64(self, value: int) -> None:
+        self.buffer += UINT64.pack(value)
+
+    def write_bytes32(self, value: bytes) -> None:
+        assert len(value) == 32
+        self.buffer += value
+
+    def write_optional(self, value: Any, write: Callable[[Any], None]) -> None:
+        if value is None:
+            self.buffer.append(0)
+        else:
+            self.buffer.append(1)
+            write(value)
+
+    def write_list(self, values: Sequence[Any], write: Callable[[Any], None]) -> None:
+        self.write_uint32(len(values))
+        for value in values:
+            write(value)
+
+    def write_program(self, program: Union[Program, SerializedProgram, None]) -> None:
+        if id(program) in self.seen:
+            self.write_uint32(self.seen[id(program)][1])
+            return
+        serialized: bytes = bytes(Program.to(program) if program is None else program)
+        index: Optional[int] = self.program_indexes.get(serialized)
+        if index is None:
+            index = len(self.program_indexes)
+            self.program_indexes[serialized] = index
+            self.write_uint32(index)
+            self.write_uint32(len(serialized))
+            self.buffer += serialized
+        else:
+            self.write_uint32(index)
+        self.seen[id(program)] = (program, index)
+
+    def write_coin(self, coin: Coin) -> None:
+        self.write_bytes32(coin.parent_coin_info)
+        self.write_bytes32(coin.puzzle_hash)
+        self.write_uint64(coin.amount)
+
+    def write_asset_type(self, typ: AssetType) -> None:
+        self.write_bytes32(typ.launcher_hash)
+        self.write_program(typ.environment)
+        self.write_program(typ.pre_validator)
+        self.write_program(typ.validator)
+        self.write_bytes32(typ.remover_hash)
+
+    def write_vmp(self, vmp: VMP) -> None:
+        self.write_program(vmp.inner_puzzle)
+        self.write_list(vmp.types, self.write_asset_type)
+
+    def write_lineage_proof(self, lineage_proof: LineageProof) -> None:
+        self.write_bytes32(lineage_proof.parent_id)
+        self.write_bytes32(lineage_proof.types_hash)
+        self.write_bytes32(lineage_proof.inner_puzzle_hash)
+        self.write_uint64(lineage_proof.amount)
+
+    def write_type_proof(self, type_proof: TypeProof) -> None:
+        self.write_bytes32(type_proof.puzzle_hash)
+        self.write_bytes32(type_proof.inner_hash)
+        self.write_program(type_proof.type_hashes)
+
+    def write_type_change(self, type_change: TypeChange) -> None:
+        self.write_asset_type(type_change.type)
+        self.write_program(type_change.puzzle)
+        self.write_program(type_change.solution)
+
+    def write_environment(self, item: Tuple[bytes32, Program]) -> None:
+        self.write_bytes32(item[0])
+        self.write_program(item[1])
+
+    def write_programs(self, programs: Sequence[Union[Program, SerializedProgram]]) -> None:
+        self.write_list(programs, self.write_program)
+
+    def write_spend(self, spend: VMPSpend) -> None:
+        self.write_coin(spend.coin)
+        self.write_vmp(spend.puzzle)
+        self.write_program(spend.inner_solution)
+        self.write_optional(spend.lineage_proof, self.write_lineage_proof)
+        self.write_list(spend.type_proofs, self.write_type_proof)
+        self.write_optional(spend.unsafe_solutions, self.write_programs)
+        self.write_list(spend.type_additions, self.write_type_change)
+        self.write_optional(
+            spend.type_removals,
+            lambda removals: self.write_list(removals, self.write_type_change),
+        )
+        self.write_optional(spend.secure_solutions, self.write_programs)
+        self.buffer.append(1 if spend.sparse else 0)
+        self.write_list(list(spend.environments.items()), self.write_environment)
+        self.write_optional(spend.remark_index, self.write_uint32)
+
+
+class VMPReader:
+    def __init__(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        # everything is read in place, only unique programs are copied out of the buffer
+        self.view = memoryview(data)
+        self.offset = 0
+        self.programs: List[SerializedProgram] = []
+        self.parsed: Dict[int, Program] = {}
+
+    def at_end(self) -> bool:
+        return self.offset >= len(self.view)
+
+    def read_uint32(self) -> int:
+        value: int = UINT32.unpack_from(self.view, self.offset)[0]
+        self.offset += 4
+        return value
+
+    def read_uint64(self) -> uint64:
+        value: int = UINT64.unpack_from(self.view, self.offset)[0]
+        self.offset += 8
+        return uint64(value)
+
+    def read_bytes32(self) -> bytes32:
+        value = bytes32(self.view[self.offset : self.offset + 32])
+        self.offset += 32
+        return value
+
+    def read_optional(self, read: Callable[[], Any]) -> Any:
+        flag: int = self.view[self.offset]
+        self.offset += 1
+        return read() if flag else None
+
+    def read_list(self, read: Callable[[], Any]) -> List[Any]:
+        return [read() for _ in range(self.read_uint32())]
+
+    def read_serialized_program(self) -> SerializedProgram:
+        index: int = self.read_uint32()
+        if index == len(self.programs):
+            length: int = self.read_uint32()
+            self.programs.append(
+                SerializedProgram.from_bytes(bytes(self.view[self.offset : self.offset + length]))
+            )
+            self.offset += length
+        return self.programs[index]
+
+    def read_program(self) -> Program:
+        serialized: SerializedProgram = self.read_serialized_program()
+        # programs that were shared when written are shared again when read
+        if id(serialized) not in self.parsed:
+            self.parsed[id(serialized)] = serialized.to_program()
+        return self.parsed[id(serialized)]
+
+    def read_coin(self) -> Coin:
+        return Coin(self.read_bytes32(), self.read_bytes32(), self.read_uint64())
+
+    def read_asset_type(self) -> AssetType:
+        return AssetType(
+            self.read_bytes32(),
+            self.read_program(),
+            self.read_program(),
+            self.read_program(),
+            self.read_bytes32(),
+        )
+
+    def read_vmp(self) -> VMP:
+        return VMP(self.read_program(), self.read_list(self.read_asset_type))
+
+    def read_lineage_proof(self) -> LineageProof:
+        return LineageProof(
+            self.read_bytes32(), self.read_bytes32(), self.read_bytes32(), self.read_uint64()
+        )
+
+    def read_type_proof(self) -> TypeProof:
+        return TypeProof(self.read_bytes32(), self.read_bytes32(), self.read_program())
+
+    def read_type_change(self) -> TypeChange:
+        return TypeChange(self.read_asset_type(), self.read_program(), self.read_program())
+
+    def read_environment(self) -> Tuple[bytes32, Program]:
+        return self.read_bytes32(), self.read_program()
+
+    def read_solutions(self) -> List[SerializedProgram]:
+        # solutions stay serialized until the spend is built
+        return self.read_list(self.read_serialized_program)
+
+    def read_spend(self) -> VMPSpend:
+        coin: Coin = self.read_coin()
+        puzzle: VMP = self.read_vmp()
+        inner_solution: Program = self.read_program()
+        lineage_proof: Optional[LineageProof] = self.read_optional(self.read_lineage_proof)
+        type_proofs: List[TypeProof] = self.read_list(self.read_type_proof)
+        unsafe_solutions: Optional[List[SerializedProgram]] = self.read_optional(self.read_solutions)
+        type_additions: List[TypeChange] = self.read_list(self.read_type_change)
+        type_removals: Optional[List[TypeChange]] = self.read_optional(
+            lambda: self.read_list(self.read_type_change)
+        )
+        secure_solutions: Optional[List[SerializedProgram]] = self.read_optional(self.read_solutions)
+        sparse: bool = self.view[self.offset] == 1
+        self.offset += 1
+        environments: Dict[bytes32, Program] = dict(self.read_list(self.read_environment))
+        remark_index: Optional[int] = self.read_optional(self.read_uint32)
+        return VMPSpend(
+            coin,
+            puzzle,
+            inner_solution=inner_solution,
+            lineage_proof=lineage_proof,
+            type_proofs=type_proofs,
+            unsafe_solutions=unsafe_solutions,
+            type_additions=type_additions,
+            type_removals=type_removals,
+            secure_solutions=secure_solutions,
+            sparse=sparse,
+            environments=environments,
+            remark_index=remark_index,
+        )
+
+
+def encode_spends(spends: Sequence[VMPSpend]) -> bytes:
+    writer = VMPWriter()
+    for spend in spends:
+        writer.write_spend(spend)
+    return writer.getvalue()
+
+
+def decode_spends(data: Union[bytes, bytearray, memoryview]) -> List[VMPSpend]:
+    reader = VMPReader(data)
+    spends: List[VMPSpend] = []
+    while not reader.at_end():
+        spends.append(reader.read_spend())
+    return spends
+
+
+def encode_vmps(vmps: Sequence[VMP]) -> bytes:
+    writer = VMPWriter()
+    for vmp in vmps:
+        writer.write_vmp(vmp)
+    return writer.getvalue()
+
+
+def decode_vmps(data: Union[bytes, bytearray, memoryview]) -> List[VMP]:
+    reader = VMPReader(data)
+    vmps: List[VMP] = []
+    while not reader.at_end():
+        vmps.append(reader.read_vmp())
+    return vmps
@@ -0,0 +1,132 @@
+import asyncio
+import dataclasses
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+
+from clvm_contracts.curried_template import tree_hash
+from clvm_contracts.validating_meta_puzzle import BundleContext, LineageProof, VMP, VMPSpend
+
+
+@dataclasses.dataclass(frozen=True)
+class TrackedVMP:
+    coin: Coin
+    puzzle: VMP
+    lineage_proof: Optional[LineageProof]
+
+
+class VMPCoinTracker:
+    """
+    Follows VMP coins down their lineage using a coin record source such as a
+    `FullNodeRpcClient` or, in tests, a `SimClient`. The source only needs to
+    implement `get_coin_records_by_puzzle_hashes`.
+
+    Children are predicted from the spends that create them so that a single
+    batched puzzle hash query finds all of them, and each found coin is cached
+    with its `VMP` and lineage proof so it can be spent without further lookups.
+    A child that is already spent when it is found is dropped rather than cached,
+    and one that isn't found within `max_pending_syncs` syncs is given up on.
+    """
+
+    def __init__(self, coin_record_source, max_cached: int = 10000, max_pending_syncs: int = 100) -> None:
+        self.coin_record_source = coin_record_source
+        self.max_cached = max_cached
+        self.max_pending_syncs = max_pending_syncs
+        self.cache: "OrderedDict[bytes32, TrackedVMP]" = OrderedDict()
+        # predicted puzzle hash -> parent id -> (child puzzle, child lineage proof, syncs when it was followed)
+        self.pending: Dict[bytes32, Dict[bytes32, Tuple[VMP, LineageProof, int]]] = {}
+        self.syncs = 0
+
+    def _cache(self, tracked: TrackedVMP) -> None:
+        coin_id: bytes32 = tracked.coin.name()
+        self.cache[coin_id] = tracked
+        self.cache.move_to_end(coin_id)
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+
+    def track(self, coin: Coin, puzzle: VMP, lineage_proof: Optional[LineageProof] = None) -> None:
+        self._cache(TrackedVMP(coin, puzzle, lineage_proof))
+
+    def get(self, coin_id: bytes32) -> Optional[TrackedVMP]:
+        tracked: Optional[TrackedVMP] = self.cache.get(coin_id)
+        if tracked is not None:
+            self.cache.move_to_end(coin_id)
+        return tracked
+
+    def follow(
+        self, spend: VMPSpend, inner_puzzles: List[Program], context: Optional[BundleContext] = None
+    ) -> List[bytes32]:
+        # Predict the children of a spend from the inner puzzles it pays to
+        # If no types survive the spend, the children are not VMPs and there is nothing to follow
+        # `context` is the BundleContext of the bundle the spend is in, if there is one
+        types = spend.types
+        if len(types) == 0:
+            return []
+        lineage_proof = (
+            LineageProof(
+                spend.coin.parent_coin_info,
+                spend.puzzle.get_types_hash(),
+                tree_hash(spend.puzzle.inner_puzzle),
+                spend.coin.amount,
+            )
+            if context is None
+            else context.child_lineage_proof(context.row(spend))
+        )
+        puzzle_hashes: List[bytes32] = []
+        for inner_puzzle in inner_puzzles:
+            child = VMP(inner_puzzle, types)
+            puzzle_hash: bytes32 = child.get_tree_hash()
+            self.pending.setdefault(puzzle_hash, {})[spend.coin.name()] = (child, lineage_proof, self.syncs)
+            puzzle_hashes.append(puzzle_hash)
+        return puzzle_hashes
+
+    async def sync(self) -> List[TrackedVMP]:
+        # Look up every predicted child with a single query
+        if len(self.pending) == 0:
+            return []
+        self.syncs += 1
+        # spent coins are asked for too, so that children spent before a sync stop being queried
+        records: List[CoinRecord] = await self.coin_record_source.get_coin_records_by_puzzle_hashes(
+            list(self.pending.keys()), include_spent_coins=True
+        )
+        found: List[TrackedVMP] = []
+        for record in records:
+            parents = self.pending.get(record.coin.puzzle_hash, {})
+            if record.coin.parent_coin_info not in parents:
+                continue
+            child, lineage_proof, _ = parents.pop(record.coin.parent_coin_info)
+            if len(parents) == 0:
+                self.pending.pop(record.coin.puzzle_hash)
+            if not record.spent:
+                tracked = TrackedVMP(record.coin, child, lineage_proof)
+                self._cache(tracked)
+                found.append(tracked)
+        for puzzle_hash, parents in list(self.pending.items()):
+            for parent_id, (_, _, followed) in list(parents.items()):
+                if self.syncs - followed >= self.max_pending_syncs:
+                    parents.pop(parent_id)
+            if len(parents) == 0:
+                self.pending.pop(puzzle_hash)
+        return found
+
+    async def run(self, poll_interval: float = 1.0) -> None:
+        # Keep syncing until cancelled
+        while True:
+            await self.sync()
+            await asyncio.sleep(poll_interval)
+
+    def spend(self, coin_id: bytes32, **kwargs) -> VMPSpend:
+        tracked: Optional[TrackedVMP] = self.get(coin_id)
+        if tracked is None:
+            raise KeyError(f"Coin {coin_id.hex()} is not being tracked")
+        return VMPSpend(
+            tracked.coin,
+            tracked.puzzle,
+            lineage_proof=tracked.lineage_proof,
+            **kwargs,
+        )
@@ -0,0 +1,246 @@
+"""
+Predicts the cost of a VMP spend from its shape so that fees can be estimated
+without running or serializing it.
+
+Byte size is computed from the lengths of the programs a spend reveals, which are
+measured once per program object, and execution cost is a linear model of the
+spend's shape calibrated by benchmarks/calibrate_cost_model.py. The model covers
+what the VMP adds around the inner puzzle: it is calibrated with an inner puzzle
+that returns its solution, so the cost of running any other inner puzzle has to
+be passed in along with the conditions it outputs.
+"""
+
+import dataclasses
+
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+from chia.consensus.condition_costs import ConditionCost
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.program import Program, SerializedProgram
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.condition_opcodes import ConditionOpcode
+from clvm.casts import int_to_bytes
+
+from clvm_contracts.boilerplate.basic import VALIDATOR
+from clvm_contracts.curried_template import tree_hash
+from clvm_contracts.strict_fungibility import CAT_VALIDATOR, NFT_VALIDATOR
+from clvm_contracts.validating_meta_puzzle import AssetType, VMP_MOD, VMPSpend
+
+# validator hash -> the kind of type it validates
+VALIDATOR_KINDS: Dict[bytes32, str] = {
+    VALIDATOR.get_tree_hash(): "basic",
+    CAT_VALIDATOR.get_tree_hash(): "cat",
+    NFT_VALIDATOR.get_tree_hash(): "nft",
+}
+
+CONDITION_COSTS: Dict[bytes, int] = {
+    bytes(ConditionOpcode.CREATE_COIN): ConditionCost.CREATE_COIN.value,
+    bytes(ConditionOpcode.AGG_SIG_ME): ConditionCost.AGG_SIG.value,
+    bytes(ConditionOpcode.AGG_SIG_UNSAFE): ConditionCost.AGG_SIG.value,
+}
+
+# fitted by benchmarks/calibrate_cost_model.py
+DEFAULT_COEFFICIENTS: Dict[str, float] = {
+    "condition": 34126,
+    "spend": 6411438,
+    "type:basic": 79660,
+    "type:cat": 1653458,
+    "type:nft": 1611597,
+    "type_addition": 21771,
+    "type_proof": 29344,
+    "type_removal": 26801,
+}
+
+
+def atom_length(atom: bytes) -> int:
+    size: int = len(atom)
+    if size == 0 or (size == 1 and atom[0] < 0x80):
+        return 1
+    for prefix, limit in enumerate((0x40, 0x2000, 0x100000, 0x8000000), 1):
+        if size < limit:
+            return prefix + size
+    return 5 + size
+
+
+def list_length(*item_lengths: int) -> int:
+    # one cons byte per item and a terminating nil
+    return sum(item_lengths) + len(item_lengths) + 1
+
+
+class ProgramLengths:
+    """
+    Serialized lengths of programs, remembered per object since the puzzles and
+    validators of a type are the same objects across all of its spends.
+    """
+
+    def __init__(self) -> None:
+        self.lengths: Dict[int, int] = {}
+        # keep the measured programs alive so their ids aren't reused
+        self.programs: Dict[int, object] = {}
+
+    def __call__(self, program: Union[Program, SerializedProgram, None]) -> int:
+        if program is None:
+            return 1
+        key: int = id(program)
+        if key not in self.lengths:
+            self.lengths[key] = len(bytes(program))
+            self.programs[key] = program
+        return self.lengths[key]
+
+
+PROGRAM_LENGTHS = ProgramLengths()
+HASH_LENGTH: int = atom_length(bytes(32))
+VMP_MOD_LENGTH: int = PROGRAM_LENGTHS(VMP_MOD)
+
+
+def type_length(typ: AssetType) -> int:
+    return list_length(
+        HASH_LENGTH, PROGRAM_LENGTHS(typ.environment), HASH_LENGTH, HASH_LENGTH, HASH_LENGTH
+    )
+
+
+def puzzle_length(spend: VMPSpend) -> int:
+    # (a (q . MOD) (c (q . MOD_HASH) (c (q . TYPES) (c (q . INNER_PUZZLE) 1))))
+    def quoted(length: int) -> int:
+        return 2 + length
+
+    def cons_arg(argument: int, rest: int) -> int:
+        return list_length(1, quoted(argument), rest)
+
+    types: int = list_length(*(type_length(typ) for typ in spend.puzzle.types))
+    environment: int = cons_arg(
+        HASH_LENGTH, cons_arg(types, cons_arg(PROGRAM_LENGTHS(spend.puzzle.inner_puzzle), 1))
+    )
+    return list_length(1, quoted(VMP_MOD_LENGTH), environment)
+
+
+def unsafe_solutions_length(spend: VMPSpend) -> int:
+    if spend.sparse or any(typ.reveals_environment() for typ in spend.types):
+        return len(bytes(Program.to(spend.unsafe_solution_list())))
+    if spend.unsafe_solutions is None:
+        return list_length(*([1] * len(spend)))
+    return list_length(
+        *(1 if solution is None else len(bytes(solution)) for solution in spend.unsafe_solutions)
+    )
+
+
+def remark_index(spend: VMPSpend, conditions: Program) -> int:
+    # looked up in the conditions rather than found by running the inner puzzle
+    if spend.remark_index is not None:
+        return spend.remark_index
+    index: Optional[int] = spend.remark_index_in(conditions)
+    return 0 if index is None else index
+
+
+def solution_length(spend: VMPSpend, conditions: Program) -> int:
+    lineage_proof: int = (
+        1
+        if spend.lineage_proof is None
+        else list_length(
+            HASH_LENGTH, HASH_LENGTH, HASH_LENGTH, atom_length(int_to_bytes(spend.lineage_proof.amount))
+        )
+    )
+    type_proofs: int = list_length(
+        *(
+            list_length(HASH_LENGTH, HASH_LENGTH, PROGRAM_LENGTHS(proof.type_hashes))
+            for proof in spend.type_proofs
+        )
+    )
+    types = spend.types
+    return list_length(
+        len(bytes(spend.inner_solution)),
+        lineage_proof,
+        type_proofs,
+        list_length(*(PROGRAM_LENGTHS(typ.pre_validator) for typ in types)),
+        list_length(*(PROGRAM_LENGTHS(typ.validator) for typ in types)),
+        unsafe_solutions_length(spend),
+        len(bytes(spend.secured_information())),
+        atom_length(int_to_bytes(remark_index(spend, conditions))),
+    )
+
+
+def spend_length(spend: VMPSpend, inner_conditions: Optional[Program] = None) -> int:
+    # the spend's entry in a block generator: (parent_id puzzle amount solution)
+    return list_length(
+        HASH_LENGTH,
+        puzzle_length(spend),
+        atom_length(int_to_bytes(spend.coin.amount)),
+        solution_length(spend, spend.inner_solution if inner_conditions is None else inner_conditions),
+    )
+
+
+def spend_features(spend: VMPSpend, conditions: Program) -> Dict[str, int]:
+    features: Dict[str, int] = {
+        "spend": 1,
+        "type_proof": len(spend.type_proofs),
+        "type_addition": len(spend.type_additions),
+        "type_removal": 0 if spend.type_removals is None else len(spend.type_removals),
+        "condition": len(list(conditions.as_iter())),
+    }
+    for typ in spend.types:
+        kind: str = "type:" + VALIDATOR_KINDS.get(tree_hash(typ.validator), "unknown")
+        features[kind] = features.get(kind, 0) + 1
+    return features
+
+
+def condition_cost(conditions: Program) -> int:
+    return sum(CONDITION_COSTS.get(condition.first().atom, 0) for condition in conditions.as_iter())
+
+
+@dataclasses.dataclass(frozen=True)
+class CostEstimate:
+    cost: int
+    size: int
+    execution_cost: int
+
+
+@dataclasses.dataclass(frozen=True)
+class CostModel:
+    coefficients: Dict[str, float]
+
+    def execution_cost(self, features: Dict[str, int]) -> int:
+        # types the model was not calibrated for are priced as the costliest known kind
+        unknown: float = max(
+            (value for name, value in self.coefficients.items() if name.startswith("type:")), default=0
+        )
+        return round(
+            sum(self.coefficients.get(name, unknown if name.startswith("type:") else 0) * count
+                for name, count in features.items())
+        )
+
+    def estimate(
+        self, spend: VMPSpend, inner_conditions: Optional[Program] = None, inner_cost: int = 0
+    ) -> CostEstimate:
+        """
+        `inner_conditions` are the conditions the inner puzzle will output, which
+        default to the inner solution as they are for a delegated puzzle, and
+        `inner_cost` is the CLVM cost of running it, which the model can't know.
+        """
+        conditions: Program = spend.inner_solution if inner_conditions is None else inner_conditions
+        size: int = spend_length(spend, conditions)
+        execution: int = self.execution_cost(spend_features(spend, conditions)) + inner_cost
+        return CostEstimate(
+            execution + size * DEFAULT_CONSTANTS.COST_PER_BYTE + condition_cost(conditions),
+            size,
+            execution,
+        )
+
+    def estimate_bundle(
+        self,
+        spends: Iterable[VMPSpend],
+        inner_conditions: Optional[Sequence[Optional[Program]]] = None,
+        inner_costs: Optional[Sequence[int]] = None,
+    ) -> int:
+        # `inner_conditions` and `inner_costs` are given per spend, as for `estimate`
+        spends = list(spends)
+        conditions = [None] * len(spends) if inner_conditions is None else inner_conditions
+        costs = [0] * len(spends) if inner_costs is None else inner_costs
+        if len(conditions) != len(spends) or len(costs) != len(spends):
+            raise ValueError("Expected inner conditions and costs for every spend")
+        return sum(
+            self.estimate(spend, spend_conditions, cost).cost
+            for spend, spend_conditions, cost in zip(spends, conditions, costs)
+        )
+
+
+DEFAULT_COST_MODEL = CostModel(DEFAULT_COEFFICIENTS)
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+
+from collections import OrderedDict
+from typing import Any, Tuple
+
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+
+def sha256(*args: bytes) -> bytes32:
+    return bytes32(hashlib.sha256(b"".join(args)).digest())
+
+
+ONE = bytes([1])
+TWO = bytes([2])
+NIL_HASH = sha256(ONE)
+ONE_HASH = sha256(ONE, ONE)
+Q_KW_HASH = sha256(ONE, bytes([1]))
+A_KW_HASH = sha256(ONE, bytes([2]))
+C_KW_HASH = sha256(ONE, bytes([4]))
+
+
+def atom_hash(atom: bytes) -> bytes32:
+    return sha256(ONE, atom)
+
+
+class TreeHashCache:
+    """
+    A bounded LRU of tree hashes keyed by the identity of immutable driver objects:
+    programs, and anything else with an `as_program` such as an `AssetType`.
+
+    Each entry holds on to its object so the id can't be reused while it is cached.
+    A `max_size` of 0 turns the cache off.
+    """
+
+    def __init__(self, max_size: int = 10000) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.entries: "OrderedDict[int, Tuple[Any, bytes32]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, value: Any) -> bytes32:
+        key: int = id(value)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+        value_hash: bytes32 = (
+            value.get_tree_hash() if isinstance(value, Program) else value.as_program().get_tree_hash()
+        )
+        if self.max_size > 0:
+            with self.lock:
+                self.entries[key] = (value, value_hash)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+        return value_hash
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+TREE_HASH_CACHE = TreeHashCache()
+
+
+def tree_hash(value: Any) -> bytes32:
+    # Programs and driver objects are hashed through the process wide cache,
+    # plain values are converted and hashed every time
+    if isinstance(value, Program) or hasattr(value, "as_program"):
+        return TREE_HASH_CACHE.get(value)
+    return Program.to(value).get_tree_hash()
+
+
+class CurriedTemplate:
+    """
+    A module that gets curried with different arguments over and over.
+
+    The curried puzzle hash is calculated from the argument hashes the same way
+    puzzle_hash_of_curried_function in curry_and_treehash.clib does it, so the
+    curried program only has to be built when it is going to be revealed.
+    """
+
+    def __init__(self, mod: Program) -> None:
+        self.mod = mod
+        self.mod_hash: bytes32 = mod.get_tree_hash()
+        self.quoted_mod_hash: bytes32 = sha256(TWO, Q_KW_HASH, self.mod_hash)
+
+    def puzzle_hash_of_hashes(self, *argument_hashes: bytes32) -> bytes32:
+        # The environment is hashed from the last argument to the first
+        environment_hash: bytes32 = ONE_HASH
+        for argument_hash in reversed(argument_hashes):
+            environment_hash = sha256(
+                TWO,
+                C_KW_HASH,
+                sha256(
+                    TWO,
+                    sha256(TWO, Q_KW_HASH, argument_hash),
+                    sha256(TWO, environment_hash, NIL_HASH),
+                ),
+            )
+        return sha256(
+            TWO,
+            A_KW_HASH,
+            sha256(TWO, self.quoted_mod_hash, sha256(TWO, environment_hash, NIL_HASH)),
+        )
+
+    def puzzle_hash(self, *args: Any) -> bytes32:
+        return self.puzzle_hash_of_hashes(*(tree_hash(arg) for arg in args))
+
+    def curry(self, *args: Any) -> Program:
+        # Built directly as (a (q . mod) (c (q . arg) ... 1)) instead of by running CLVM,
+        # whose output can't be read from any thread other than the one that ran it
+        environment = Program.to(1)
+        for arg in reversed(args):
+            environment = Program.to([4, (1, arg), environment])
+        return Program.to([2, (1, self.mod), environment])
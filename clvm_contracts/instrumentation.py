@@ -0,0 +1,150 @@
+"""
+Opt-in timing of the driver's hot paths.
+
+Operations wrapped with `instrumented` are only measured while the registry is
+enabled, either with `INSTRUMENTATION.enable()` or by setting VMP_INSTRUMENTATION=1
+before the driver is imported (which also covers the `load_clvm` calls made at
+import time). While disabled a wrapped call costs one attribute check.
+"""
+
+import functools
+import os
+import threading
+import time
+import tracemalloc
+
+from typing import Any, Callable, Dict, List, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# latencies kept per operation for the percentiles
+SAMPLE_SIZE = 1024
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class OperationStats:
+    __slots__ = ("count", "total_seconds", "retained_bytes", "samples", "next_sample")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_seconds = 0.0
+        self.retained_bytes = 0
+        # ring buffer of the most recent latencies
+        self.samples: List[float] = []
+        self.next_sample = 0
+
+    def add(self, seconds: float, retained_bytes: int) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.retained_bytes += retained_bytes
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(seconds)
+        else:
+            self.samples[self.next_sample] = seconds
+            self.next_sample = (self.next_sample + 1) % SAMPLE_SIZE
+
+    def quantile(self, q: float) -> float:
+        if len(self.samples) == 0:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.track_memory = False
+        # whether enable() started tracemalloc, so disable() knows to stop it
+        self.started_tracing = False
+        self.stats: Dict[str, OperationStats] = {}
+        self.lock = threading.Lock()
+
+    def enable(self, track_memory: bool = False) -> None:
+        # Retained bytes come from tracemalloc, which slows everything down while it traces.
+        # They are the memory an operation still holds when it returns, not everything it allocated,
+        # since tracemalloc's peak is shared by nested operations and other threads.
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.track_memory = False
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats = {}
+
+    def record(self, name: str, seconds: float, retained_bytes: int = 0) -> None:
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = OperationStats()
+            stats.add(seconds, retained_bytes)
+
+    def call(self, name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        track_memory: bool = self.track_memory and tracemalloc.is_tracing()
+        before: int = tracemalloc.get_traced_memory()[0] if track_memory else 0
+        start: float = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds: float = time.perf_counter() - start
+            retained: int = max(0, tracemalloc.get_traced_memory()[0] - before) if track_memory else 0
+            self.record(name, seconds, retained)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {
+                name: {
+                    "count": stats.count,
+                    "total_seconds": stats.total_seconds,
+                    "retained_bytes": stats.retained_bytes,
+                    **{f"p{round(q * 100)}_seconds": stats.quantile(q) for q in QUANTILES},
+                }
+                for name, stats in self.stats.items()
+            }
+
+    def prometheus_text(self, prefix: str = "vmp_driver") -> str:
+        lines: List[str] = [
+            f"# HELP {prefix}_latency_seconds Latency of instrumented driver operations.",
+            f"# TYPE {prefix}_latency_seconds summary",
+        ]
+        snapshot = self.snapshot()
+        for name, stats in snapshot.items():
+            label = f'operation="{name}"'
+            for q in QUANTILES:
+                lines.append(
+                    f'{prefix}_latency_seconds{{{label},quantile="{q}"}} '
+                    f'{stats[f"p{round(q * 100)}_seconds"]}'
+                )
+            lines.append(f"{prefix}_latency_seconds_sum{{{label}}} {stats['total_seconds']}")
+            lines.append(f"{prefix}_latency_seconds_count{{{label}}} {stats['count']}")
+        lines.append(
+            f"# HELP {prefix}_retained_bytes_total Bytes still allocated when instrumented driver operations return."
+        )
+        lines.append(f"# TYPE {prefix}_retained_bytes_total counter")
+        for name, stats in snapshot.items():
+            lines.append(f'{prefix}_retained_bytes_total{{operation="{name}"}} {stats["retained_bytes"]}')
+        return "\n".join(lines) + "\n"
+
+
+INSTRUMENTATION = Instrumentation(enabled=os.environ.get("VMP_INSTRUMENTATION", "") not in ("", "0"))
+
+
+def instrumented(name: str) -> Callable[[F], F]:
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not INSTRUMENTATION.enabled:
+                return func(*args, **kwargs)
+            return INSTRUMENTATION.call(name, func, *args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -1,5 +1,6 @@
 import importlib
 import inspect
+import io
 import os
 
 import tempfile
@@ -10,6 +11,8 @@ from chia.types.blockchain_format.program import Program, SerializedProgram
 from chia.util.lock import Lockfile
 from clvm_tools_rs import compile_clvm as compile_clvm_rust
 
+from clvm_contracts.instrumentation import instrumented
+
 
 compile_clvm_py = None
 
@@ -117,11 +120,16 @@ def load_serialized_clvm(
     return SerializedProgram.from_bytes(clvm_blob)
 
 
+@instrumented("load_clvm")
 def load_clvm(clvm_filename, package_or_requirement=__name__) -> Program:
-    return Program.from_bytes(
-        bytes(
-            load_serialized_clvm(
-                clvm_filename, package_or_requirement=package_or_requirement
+    # Parsed in Python rather than by chia_rs, whose nodes can only be read from the
+    # thread that parsed them, so that modules can be used from worker threads
+    return Program.parse(
+        io.BytesIO(
+            bytes(
+                load_serialized_clvm(
+                    clvm_filename, package_or_requirement=package_or_requirement
+                )
             )
         )
     )
@@ -0,0 +1,287 @@
+import dataclasses
+
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from blspy import G2Element
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.codec import decode_spends, encode_spends
+from clvm_contracts.coin_tracker import TrackedVMP
+from clvm_contracts.type_ordering import TypeUsage, order_additions
+from clvm_contracts.validating_meta_puzzle import TypeChange, TypeProof, VMP, VMPSpend
+
+# mempool items may use at most half of a block
+DEFAULT_MAX_BUNDLE_COST = DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM // 2
+
+
+@dataclasses.dataclass(frozen=True)
+class TypeMigration:
+    type_additions: Sequence[TypeChange] = ()
+    type_removals: Sequence[TypeChange] = ()
+    type_proofs: Sequence[TypeProof] = ()
+
+    def applies_to(self, puzzle: VMP) -> bool:
+        # A coin that already has the additions and none of the removals is migrated
+        return all(removal.type in puzzle.types for removal in self.type_removals) and not any(
+            addition.type in puzzle.types for addition in self.type_additions
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class MigrationProgress:
+    total: int
+    built: int
+    skipped: int
+    failed: int
+
+
+@dataclasses.dataclass(frozen=True)
+class MigrationBundle:
+    spend_bundle: SpendBundle
+    cost: int
+
+    def coin_ids(self) -> List[bytes32]:
+        return [cs.coin.name() for cs in self.spend_bundle.coin_spends]
+
+
+class MigrationState:
+    """
+    The coins that have already been migrated. Record each bundle once it has been
+    pushed and save the state so an interrupted migration can pick up where it left off.
+    """
+
+    def __init__(self, completed: Optional[Iterable[bytes32]] = None) -> None:
+        self.completed: Set[bytes32] = set() if completed is None else set(completed)
+
+    def record(self, bundle: MigrationBundle) -> None:
+        self.completed.update(bundle.coin_ids())
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            f.writelines(coin_id.hex() + "\n" for coin_id in sorted(self.completed))
+
+    @classmethod
+    def load(cls, path: str) -> "MigrationState":
+        with open(path) as f:
+            return cls(bytes32.fromhex(line.strip()) for line in f if line.strip() != "")
+
+
+def bundle_cost(coin_spends: List[CoinSpend]) -> Tuple[int, Optional[str]]:
+    result = get_name_puzzle_conditions(
+        simple_solution_generator(SpendBundle(coin_spends, G2Element())),
+        INFINITE_COST,
+        cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE,
+        mempool_mode=True,
+    )
+    return result.cost, None if result.error is None else str(result.error)
+
+
+def build_batch(
+    encoded_spends: bytes,
+    inner_solution: Callable[[VMPSpend], Program],
+    solve: Optional[Callable[[List[VMPSpend]], List[VMPSpend]]] = None,
+) -> List[Tuple[bytes, int, Optional[str]]]:
+    """
+    Runs on a worker: finish each spend and measure what it costs on its own. A batch
+    with `solve` is solved here too, after its inner solutions are set since solvers read
+    their conditions. It asserts announcements across its spends, so it is measured as
+    one bundle and its whole cost is given to its first spend.
+    """
+    spends: List[VMPSpend] = decode_spends(encoded_spends)
+    for spend in spends:
+        spend.inner_solution = inner_solution(spend)
+    if solve is not None:
+        spends = solve(spends)
+    coin_spends: List[CoinSpend] = []
+    build_errors: List[Optional[str]] = []
+    for spend in spends:
+        try:
+            coin_spends.append(spend.to_coin_spend())
+            build_errors.append(None)
+        except ValueError as e:
+            # an inner solution without the REMARK fails its spend, which is still built to be reported
+            spend.remark_index = 0
+            coin_spends.append(spend.to_coin_spend())
+            build_errors.append(str(e))
+    if solve is None:
+        return [
+            (bytes(coin_spend), *bundle_cost([coin_spend]))
+            if build_error is None
+            else (bytes(coin_spend), 0, build_error)
+            for coin_spend, build_error in zip(coin_spends, build_errors)
+        ]
+    cost, error = bundle_cost(coin_spends)
+    errors: List[Optional[str]] = [error] * len(coin_spends)
+    if any(build_error is not None for build_error in build_errors):
+        errors = build_errors
+    elif error is not None:
+        # blame the spends whose puzzles fail on their own if there are any
+        for i, coin_spend in enumerate(coin_spends):
+            try:
+                coin_spend.puzzle_reveal.run_with_cost(INFINITE_COST, coin_spend.solution)
+                errors[i] = None
+            except ValueError as e:
+                errors[i] = str(e)
+        if all(e is None for e in errors):
+            errors = [error] * len(coin_spends)
+    return [
+        (bytes(coin_spend), cost if i == 0 else 0, errors[i]) for i, coin_spend in enumerate(coin_spends)
+    ]
+
+
+class MigrationPlanner:
+    """
+    Applies a `TypeMigration` to many VMP coins at once.
+
+    Coins are split into batches that are turned into spends on `executor` (every
+    batch is passed through the codec, so a process pool works) and the finished
+    spends are packed into bundles of at most `max_cost`. `inner_solution` is called
+    on each spend once its security hash is known and must be picklable when a
+    process pool is used. With `solve`, every batch is solved together on `executor`,
+    like a fungibility ring, and so always ends up in a single bundle, or in none at all
+    if any of its spends fails; the solver has to be picklable too. With `usage`, the
+    additions are ordered so that the proofs made of the migrated coins stay small.
+    """
+
+    def __init__(
+        self,
+        migration: TypeMigration,
+        inner_solution: Callable[[VMPSpend], Program],
+        executor: Optional[Executor] = None,
+        batch_size: int = 100,
+        max_cost: int = DEFAULT_MAX_BUNDLE_COST,
+        solve: Optional[Callable[[List[VMPSpend]], List[VMPSpend]]] = None,
+        sign: Callable[[List[CoinSpend]], G2Element] = lambda coin_spends: G2Element(),
+        progress: Optional[Callable[[MigrationProgress], None]] = None,
+        max_in_flight: int = 4,
+        usage: Optional[TypeUsage] = None,
+    ) -> None:
+        self.migration = (
+            migration
+            if usage is None
+            else dataclasses.replace(migration, type_additions=order_additions(migration.type_additions, usage))
+        )
+        self.inner_solution = inner_solution
+        self.executor = executor
+        self.batch_size = batch_size
+        self.max_cost = max_cost
+        self.solve = solve
+        self.sign = sign
+        self.progress = progress
+        self.max_in_flight = max_in_flight
+        # coin id -> error for spends that did not pass a mempool check
+        self.failures: Dict[bytes32, str] = {}
+
+    def spend(self, tracked: TrackedVMP) -> VMPSpend:
+        return VMPSpend(
+            tracked.coin,
+            tracked.puzzle,
+            lineage_proof=tracked.lineage_proof,
+            type_proofs=self.migration.type_proofs,
+            type_additions=self.migration.type_additions,
+            type_removals=self.migration.type_removals if len(self.migration.type_removals) > 0 else None,
+        )
+
+    def _batches(
+        self, coins: Sequence[TrackedVMP], state: MigrationState
+    ) -> Iterator[Tuple[List[VMPSpend], int]]:
+        # yields each batch with the number of coins skipped while filling it
+        batch: List[VMPSpend] = []
+        skipped: int = 0
+        for tracked in coins:
+            if tracked.coin.name() in state.completed or not self.migration.applies_to(tracked.puzzle):
+                skipped += 1
+                continue
+            batch.append(self.spend(tracked))
+            if len(batch) == self.batch_size:
+                yield batch, skipped
+                batch, skipped = [], 0
+        if len(batch) > 0 or skipped > 0:
+            yield batch, skipped
+
+    def _submit(self, batch: List[VMPSpend]) -> "Future[List[Tuple[bytes, int, Optional[str]]]]":
+        encoded: bytes = encode_spends(batch)
+        if self.executor is not None:
+            return self.executor.submit(build_batch, encoded, self.inner_solution, self.solve)
+        future: "Future[List[Tuple[bytes, int, Optional[str]]]]" = Future()
+        future.set_result(build_batch(encoded, self.inner_solution, self.solve))
+        return future
+
+    def _bundle(self, coin_spends: List[CoinSpend], cost: int) -> MigrationBundle:
+        return MigrationBundle(SpendBundle(coin_spends, self.sign(coin_spends)), cost)
+
+    def plan(
+        self, coins: Sequence[TrackedVMP], state: Optional[MigrationState] = None
+    ) -> Iterator[MigrationBundle]:
+        """
+        Yield bundles as soon as they fill up. At most `max_in_flight` batches are
+        queued on the executor so memory stays bounded however many coins are migrated.
+        """
+        state = MigrationState() if state is None else state
+        in_flight: Deque[Tuple["Future[List[Tuple[bytes, int, Optional[str]]]]", int]] = deque()
+        built: int = 0
+        skipped: int = 0
+        failed: int = 0
+        coin_spends: List[CoinSpend] = []
+        cost: int = 0
+
+        def collect() -> Iterator[MigrationBundle]:
+            nonlocal built, skipped, failed, coin_spends, cost
+            future, batch_skipped = in_flight.popleft()
+            skipped += batch_skipped
+            # spends that have to end up in the same bundle, with their total cost
+            groups: List[Tuple[List[CoinSpend], int]] = []
+            errors: Dict[bytes32, str] = {}
+            for serialized, spend_cost, error in future.result():
+                coin_spend = CoinSpend.from_bytes(serialized)
+                if error is None:
+                    groups.append(([coin_spend], spend_cost))
+                else:
+                    errors[coin_spend.coin.name()] = error
+            if self.solve is not None and len(errors) > 0:
+                # the rest of a solved batch refers to the spends that failed, so none of it can be pushed
+                batch_error: str = "solved together with failing spends " + ", ".join(
+                    coin_id.hex() for coin_id in errors
+                )
+                for group, _ in groups:
+                    for coin_spend in group:
+                        errors[coin_spend.coin.name()] = batch_error
+                groups = []
+            self.failures.update(errors)
+            failed += len(errors)
+            built += len(groups)
+            if self.solve is not None and len(groups) > 0:
+                groups = [
+                    (
+                        [coin_spend for group, _ in groups for coin_spend in group],
+                        sum(group_cost for _, group_cost in groups),
+                    )
+                ]
+            for group, group_cost in groups:
+                if group_cost > self.max_cost:
+                    raise ValueError(f"{len(group)} spends that must be bundled together cost {group_cost}")
+                if cost + group_cost > self.max_cost and len(coin_spends) > 0:
+                    yield self._bundle(coin_spends, cost)
+                    coin_spends, cost = [], 0
+                coin_spends.extend(group)
+                cost += group_cost
+            if self.progress is not None:
+                self.progress(MigrationProgress(len(coins), built, skipped, failed))
+
+        for batch, batch_skipped in self._batches(coins, state):
+            in_flight.append((self._submit(batch), batch_skipped))
+            while len(in_flight) >= self.max_in_flight:
+                yield from collect()
+        while len(in_flight) > 0:
+            yield from collect()
+        if len(coin_spends) > 0:
+            yield self._bundle(coin_spends, cost)
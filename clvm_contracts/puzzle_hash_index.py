@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.validating_meta_puzzle import AssetType, vmp_puzzle_hash
+
+
+def types_hash(types: List[AssetType]) -> bytes32:
+    return Program.to([t.as_program() for t in types]).get_tree_hash()
+
+
+class VMPPuzzleHashIndex:
+    """
+    Maps VMP puzzle hashes back to the (inner_puzzle_hash, types) that produce them.
+
+    Every combination of a known inner puzzle hash and a known type list is hashed
+    once when either side is added, so recognizing a coin is a single dict lookup.
+    """
+
+    def __init__(self) -> None:
+        self.inner_puzzle_hashes: Set[bytes32] = set()
+        self.type_lists: Dict[bytes32, List[AssetType]] = {}
+        self.index: Dict[bytes32, Tuple[bytes32, List[AssetType]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, puzzle_hash: bytes32) -> bool:
+        return puzzle_hash in self.index
+
+    def add_inner_puzzle_hash(self, inner_puzzle_hash: bytes32) -> None:
+        if inner_puzzle_hash in self.inner_puzzle_hashes:
+            return
+        self.inner_puzzle_hashes.add(inner_puzzle_hash)
+        for hash_of_types, types in self.type_lists.items():
+            self.index[vmp_puzzle_hash(inner_puzzle_hash, hash_of_types)] = (inner_puzzle_hash, types)
+
+    def add_types(self, types: List[AssetType]) -> None:
+        hash_of_types: bytes32 = types_hash(types)
+        if hash_of_types in self.type_lists:
+            return
+        self.type_lists[hash_of_types] = types
+        for inner_puzzle_hash in self.inner_puzzle_hashes:
+            self.index[vmp_puzzle_hash(inner_puzzle_hash, hash_of_types)] = (inner_puzzle_hash, types)
+
+    def lookup(self, puzzle_hash: bytes32) -> Optional[Tuple[bytes32, List[AssetType]]]:
+        return self.index.get(puzzle_hash)
+
+    def match(self, coins: Iterable[Coin]) -> List[Tuple[Coin, bytes32, List[AssetType]]]:
+        # Pick out the VMP coins from something like a block's additions
+        matches: List[Tuple[Coin, bytes32, List[AssetType]]] = []
+        for coin in coins:
+            entry = self.index.get(coin.puzzle_hash)
+            if entry is not None:
+                matches.append((coin, *entry))
+        return matches
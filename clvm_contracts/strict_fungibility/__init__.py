@@ -1,11 +1,23 @@
-from typing import Callable, List
+from typing import Callable, Dict, List, Optional
 
-from chia.types.blockchain_format.coin import Coin, coin_as_list
+from chia.types.blockchain_format.coin import Coin
 from chia.types.blockchain_format.sized_bytes import bytes32
-from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.program import Program, SerializedProgram
 
+from clvm_contracts.curried_template import NIL_HASH, CurriedTemplate, atom_hash, tree_hash
+from clvm_contracts.instrumentation import instrumented
 from clvm_contracts.load_clvm import load_clvm
-from clvm_contracts.validating_meta_puzzle import AssetType, TypeChange, VMPSpend, VMP_MOD_HASH
+from clvm_contracts.validating_meta_puzzle import (
+    AssetType,
+    BundleContext,
+    LineageProof,
+    TypeChange,
+    VMPSpend,
+    VMP_MOD_HASH,
+    type_key,
+    type_keys,
+    vmp_puzzle_hash,
+)
 
 PRE_VALIDATOR = load_clvm(
     "pre_validator.clsp", package_or_requirement="clvm_contracts.strict_fungibility"
@@ -18,16 +30,22 @@ NFT_VALIDATOR = load_clvm(
     "nft_validator.clsp",
     package_or_requirement="clvm_contracts.strict_fungibility",
 )
-CAT_PRE_VALIDATOR = PRE_VALIDATOR.curry(CAT_VALIDATOR.get_tree_hash())
-NFT_PRE_VALIDATOR = PRE_VALIDATOR.curry(NFT_VALIDATOR.get_tree_hash())
+PRE_VALIDATOR_TEMPLATE = CurriedTemplate(PRE_VALIDATOR)
+CAT_PRE_VALIDATOR = PRE_VALIDATOR_TEMPLATE.curry(CAT_VALIDATOR.get_tree_hash())
+NFT_PRE_VALIDATOR = PRE_VALIDATOR_TEMPLATE.curry(NFT_VALIDATOR.get_tree_hash())
+NFT_PRE_VALIDATOR_HASH = PRE_VALIDATOR_TEMPLATE.puzzle_hash(NFT_VALIDATOR.get_tree_hash())
 SINGLETON_LAUNCHER = load_clvm(
     "singleton_launcher.clsp",
     package_or_requirement="clvm_contracts.strict_fungibility",
 )
+SINGLETON_LAUNCHER_TEMPLATE = CurriedTemplate(SINGLETON_LAUNCHER)
 P2_SINGLETON = load_clvm(
     "p2_singleton.clsp",
     package_or_requirement="clvm_contracts.strict_fungibility",
 )
+P2_SINGLETON_TEMPLATE = CurriedTemplate(P2_SINGLETON)
+# the arguments every p2_singleton shares
+P2_SINGLETON_FIXED_ARGUMENT_HASHES = (atom_hash(VMP_MOD_HASH), atom_hash(NFT_PRE_VALIDATOR_HASH))
 
 
 def previous_index(i: int, length: int) -> int:
@@ -41,64 +59,76 @@ def next_index(i: int, length: int) -> int:
         return i + 1
 
 
-def get_unique_fungible_types(spend: VMPSpend, pre_validator: Program, validator: Program) -> List[AssetType]:
-    fungible_types: List[AssetType] = []
-    launchers: List[bytes32] = []
-    for typ in spend.types:
-        if (
-            typ.pre_validator == pre_validator
-            and typ.validator == validator
-            and typ.launcher_hash not in launchers
-        ):
-            fungible_types.append(typ)
-            launchers.append(typ.launcher_hash)
-    return fungible_types
+def get_unique_fungible_types(
+    spend: VMPSpend, pre_validator: Program, validator: Program, context: Optional[BundleContext] = None
+) -> List[AssetType]:
+    # types are told apart by their hashes, comparing the programs themselves is far slower
+    pre_validator_hash: bytes32 = tree_hash(pre_validator)
+    validator_hash: bytes32 = tree_hash(validator)
+    keys = type_keys(spend.types) if context is None else context.type_keys[context.row(spend)]
+    return [
+        typ
+        for (_, typ_pre_validator_hash, typ_validator_hash), typ in keys.items()
+        if typ_pre_validator_hash == pre_validator_hash and typ_validator_hash == validator_hash
+    ]
+
 
+@instrumented("solve_fungible_type")
 def solve_fungible_type(
     spends: List[VMPSpend],
     subtotal_func: Callable[[Program], int],
+    coin_value: Callable[[Coin], int],
     pre_validator: Program,
     validator: Program,
+    context: Optional[BundleContext] = None,
 ) -> List[VMPSpend]:
+    # Subtotals are computed from the conditions of the inner solution, so set it before solving
+    if context is None:
+        context = BundleContext(spends)
     subtotal_dict: Dict[bytes32, int] = {}
-    morphed_vmps: List[VMPSpend] = []
     for i, spend in enumerate(spends):
-        for typ in get_unique_fungible_types(spend, pre_validator, validator):
+        fungible_types: List[AssetType] = get_unique_fungible_types(spend, pre_validator, validator, context)
+        if len(fungible_types) == 0:
+            continue
+        row: int = context.row(spend)
+        # the inner puzzle is run once for all of the types
+        conditions: Program = spend.puzzle.inner_puzzle.run(spend.inner_solution)
+        created: List[Program] = [
+            condition for condition in conditions.as_iter() if condition.first() == Program.to(51)
+        ]
+        for typ in fungible_types:
+            key = type_key(typ)
             prev_sibling_index = previous_index(i, len(spends))
-            previous_spend = spends[prev_sibling_index]
-            while not previous_spend.is_type(
-                typ, ignores=["environment", "remover_hash"]
-            ):
+            while key not in context.type_keys[context.row(spends[prev_sibling_index])]:
                 prev_sibling_index = previous_index(prev_sibling_index, len(spends))
-                previous_spend = spends[prev_sibling_index]
+            previous_row: int = context.row(spends[prev_sibling_index])
             next_sibling_index = next_index(i, len(spends))
-            next_spend = spends[next_sibling_index]
-            while not next_spend.is_type(
-                typ, ignores=["environment", "remover_hash"]
-            ):
+            while key not in context.type_keys[context.row(spends[next_sibling_index])]:
                 next_sibling_index = next_index(next_sibling_index, len(spends))
-                next_spend = spends[next_sibling_index]
+            next_row: int = context.row(spends[next_sibling_index])
 
             subtotal_dict.setdefault(typ.launcher_hash, 0)
             prev_subtotal = subtotal_dict[typ.launcher_hash]
+            for condition in created:
+                subtotal_dict[typ.launcher_hash] += subtotal_func(condition)
+            subtotal_dict[typ.launcher_hash] -= coin_value(spend.coin)
 
-            conditions: Program = spend.puzzle.inner_puzzle.run(
-                spend.inner_solution
+            # kept serialized until the spend is built
+            spend.set_unsafe_solution(
+                context.type_indexes[row][typ.get_tree_hash()],
+                SerializedProgram.from_program(
+                    Program.to(
+                        [
+                            context.coin_ids[previous_row],
+                            context.coin_list(row),
+                            context.coin_list(next_row),
+                            prev_subtotal,
+                            subtotal_dict[typ.launcher_hash],
+                        ]
+                    )
+                ),
             )
-            for condition in conditions.as_iter():
-                if condition.first() == Program.to(51):
-                    subtotal_dict[typ.launcher_hash] += subtotal_func(condition)
-
-            spend.unsafe_solutions[spend.index_of(typ)] = Program.to(
-                [
-                    previous_spend.coin.name(),
-                    coin_as_list(spend.coin),
-                    coin_as_list(next_spend.coin),
-                    prev_subtotal,
-                    subtotal_dict[typ.launcher_hash],
-                ]
-            )
-            spend.type_proofs.append(next_spend.puzzle.get_type_proof([]))
+            spend.add_type_proof(context.empty_type_proof(next_row))
 
     return spends
 
@@ -133,12 +163,14 @@ class CATType:
         )
 
     @staticmethod
-    def solve(spends: List[VMPSpend]) -> List[VMPSpend]:
+    def solve(spends: List[VMPSpend], context: Optional[BundleContext] = None) -> List[VMPSpend]:
         return solve_fungible_type(
             spends,
             lambda c: c.at("rrf").as_int(),
+            lambda coin: coin.amount,
             CAT_PRE_VALIDATOR,
             CAT_VALIDATOR,
+            context,
         )
 
 
@@ -174,12 +206,14 @@ class NFTType:
         )
 
     @staticmethod
-    def solve(spends: List[VMPSpend]) -> List[VMPSpend]:
+    def solve(spends: List[VMPSpend], context: Optional[BundleContext] = None) -> List[VMPSpend]:
         return solve_fungible_type(
             spends,
             lambda c: 1,
+            lambda coin: 1,
             NFT_PRE_VALIDATOR,
             NFT_VALIDATOR,
+            context,
         )
 
 
@@ -191,18 +225,58 @@ class SingletonType:
         enivronment: Program,
     ) -> AssetType:
         return AssetType(
-            SINGLETON_LAUNCHER.curry(coin_id).get_tree_hash(),
+            SINGLETON_LAUNCHER_TEMPLATE.puzzle_hash(coin_id),
             enivronment,
             NFT_PRE_VALIDATOR,
             NFT_VALIDATOR,
             remover_hash,
         )
 
+    @staticmethod
+    def batch_coins(
+        parent_id: bytes32, inner_puzzle_hash: bytes32, count: int, base_amount: int = 1
+    ) -> List[Coin]:
+        """
+        A helper for batching the parent spends of singletons, not a batch launcher: one parent
+        spend creates `count` empty VMP coins, and each of them still launches its singleton
+        with `launch` in its own spend.
+        """
+        # Siblings can only share a puzzle hash if their amounts differ, so the index offsets the amount
+        puzzle_hash: bytes32 = vmp_puzzle_hash(inner_puzzle_hash, NIL_HASH)
+        return [Coin(parent_id, puzzle_hash, base_amount + index) for index in range(count)]
+
+    @staticmethod
+    def new_batch(
+        parent_id: bytes32,
+        inner_puzzle_hash: bytes32,
+        count: int,
+        remover_hash: bytes32,
+        environment: Program,
+        base_amount: int = 1,
+    ) -> List[AssetType]:
+        """
+        The singleton types of the `batch_coins` of one parent spend, one per coin. This only
+        batches the parent spend: every type is still launched by a separate spend of its coin.
+        """
+        return [
+            SingletonType.new(coin.name(), remover_hash, environment)
+            for coin in SingletonType.batch_coins(parent_id, inner_puzzle_hash, count, base_amount)
+        ]
+
+    @staticmethod
+    def batch_conditions(inner_puzzle_hash: bytes32, count: int, base_amount: int = 1) -> List[Program]:
+        """
+        The CREATE_COINs with which a parent that is not itself a VMP makes `batch_coins`. Nothing
+        is launched by them; each coin launches its singleton in a spend of its own.
+        """
+        puzzle_hash: bytes32 = vmp_puzzle_hash(inner_puzzle_hash, NIL_HASH)
+        return [Program.to([51, puzzle_hash, base_amount + index]) for index in range(count)]
+
     @staticmethod
     def launch(typ: AssetType, **kwargs) -> TypeChange:
         return TypeChange(
             typ,
-            SINGLETON_LAUNCHER.curry(kwargs["coin_id"]),
+            SINGLETON_LAUNCHER_TEMPLATE.curry(kwargs["coin_id"]),
             Program.to([typ.as_program().rest(), kwargs["conditions"]]),
         )
 
@@ -215,32 +289,49 @@ class SingletonType:
         )
 
     @staticmethod
-    def solve(spends: List[VMPSpend]) -> List[VMPSpend]:
+    def solve(spends: List[VMPSpend], context: Optional[BundleContext] = None) -> List[VMPSpend]:
         return solve_fungible_type(
             spends,
             lambda c: 1,
+            lambda coin: 1,
             NFT_PRE_VALIDATOR,
             NFT_VALIDATOR,
+            context,
         )
 
     @staticmethod
     def p2(**kwargs) -> Program:
-        return P2_SINGLETON.curry(
+        return P2_SINGLETON_TEMPLATE.curry(
             VMP_MOD_HASH,
-            NFT_PRE_VALIDATOR.get_tree_hash(),
+            NFT_PRE_VALIDATOR_HASH,
             kwargs["launcher_hash"],
         )
 
+    @staticmethod
+    def p2_puzzle_hash(**kwargs) -> bytes32:
+        return P2_SINGLETON_TEMPLATE.puzzle_hash_of_hashes(
+            *P2_SINGLETON_FIXED_ARGUMENT_HASHES,
+            atom_hash(kwargs["launcher_hash"]),
+        )
+
     @staticmethod
     def solve_p2(**kwargs) -> Program:
+        # `context` is the BundleContext of the bundle the singleton is spent in, if there is one
+        vmp_spend: VMPSpend = kwargs["vmp_spend"]
+        context: Optional[BundleContext] = kwargs.get("context")
+        lineage_proof: LineageProof = (
+            LineageProof(
+                vmp_spend.coin.parent_coin_info,
+                vmp_spend.puzzle.get_types_hash(),
+                tree_hash(vmp_spend.puzzle.inner_puzzle),
+                vmp_spend.coin.amount,
+            )
+            if context is None
+            else context.child_lineage_proof(context.row(vmp_spend))
+        )
         return Program.to(
             [
-                [
-                    kwargs["vmp_spend"].coin.parent_coin_info,
-                    kwargs["vmp_spend"].puzzle.get_types_hash(),
-                    kwargs["vmp_spend"].puzzle.inner_puzzle.get_tree_hash(),
-                    kwargs["vmp_spend"].coin.amount,
-                ],
+                lineage_proof.as_program(),
                 kwargs["coin"].name(),
                 kwargs["puzzle"],
                 kwargs["solution"],
@@ -0,0 +1,162 @@
+"""
+Chooses the order of a VMP's types so that the type proofs other spends make of it
+stay small.
+
+`VMP.get_type_proof` reveals every type up to the last one being proved and collapses
+the rest into a single hash, so types that are proved often belong at the front.
+Where types sit makes no difference to removals or to running the validators.
+New types are always prepended, so an order is applied through the order of the
+additions that create it.
+"""
+
+import dataclasses
+
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.validating_meta_puzzle import AssetType, TypeChange
+
+# a revealed type hash and its cons box in the proof
+REVEALED_TYPE_BYTES = 34
+# hashing it into the types hash, measured by benchmarks/type_ordering.py
+REVEALED_TYPE_EXECUTION_COST = 1915
+REVEALED_TYPE_COST = REVEALED_TYPE_BYTES * DEFAULT_CONSTANTS.COST_PER_BYTE + REVEALED_TYPE_EXECUTION_COST
+# a proof that reveals every type ends in () instead of the hash of the rest
+NO_TRAILING_HASH_SAVING = 32 * DEFAULT_CONSTANTS.COST_PER_BYTE
+# beyond this many types the order is found greedily
+EXACT_LIMIT = 12
+
+
+@dataclasses.dataclass(frozen=True)
+class TypeUsage:
+    # (hashes of the types proved together, how often) for the proofs made of a coin
+    proofs: Sequence[Tuple[FrozenSet[bytes32], float]] = ()
+    # type hash -> the chance that the type has already been removed when a proof is made
+    removal_rates: Dict[bytes32, float] = dataclasses.field(default_factory=dict)
+
+    def presence(self, type_hash: bytes32) -> float:
+        return 1 - self.removal_rates.get(type_hash, 0)
+
+
+def expected_proof_cost(types: Sequence[AssetType], usage: TypeUsage) -> float:
+    # over a proof that reveals no types
+    positions: Dict[bytes32, int] = {}
+    for i, typ in enumerate(types):
+        positions.setdefault(typ.get_tree_hash(), i)
+    # prefix[i] is the expected number of types left in the first i positions
+    prefix: List[float] = [0.0]
+    for typ in types:
+        prefix.append(prefix[-1] + usage.presence(typ.get_tree_hash()))
+    cost: float = 0.0
+    for proved, weight in usage.proofs:
+        if len(proved) > 0:
+            last: int = max(positions[type_hash] for type_hash in proved)
+            cost += weight * prefix[last + 1] * REVEALED_TYPE_COST
+            if last == len(types) - 1:
+                cost -= weight * NO_TRAILING_HASH_SAVING
+    return cost
+
+
+def _masks(hashes: List[bytes32], usage: TypeUsage) -> List[Tuple[int, float]]:
+    # each proof as a bitmask of the types it proves, ignoring types that aren't in the list
+    bits: Dict[bytes32, int] = {type_hash: 1 << i for i, type_hash in enumerate(hashes)}
+    masks: List[Tuple[int, float]] = []
+    for proved, weight in usage.proofs:
+        mask: int = 0
+        for type_hash in proved:
+            mask |= bits.get(type_hash, 0)
+        if mask != 0 and weight > 0:
+            masks.append((mask, weight))
+    return masks
+
+
+def _exact_order(
+    hashes: List[bytes32], presences: List[float], masks: List[Tuple[int, float]], last_saving: float
+) -> List[int]:
+    # Over the sets of types placed first: a type placed next is revealed by every proof
+    # that needs a type that hasn't been placed yet, and if it is the last of the list
+    # those proofs save the trailing hash
+    count: int = len(hashes)
+    full: int = (1 << count) - 1
+    uncovered: List[float] = [
+        sum(weight for mask, weight in masks if mask & ~placed) for placed in range(full + 1)
+    ]
+    best: List[float] = [float("inf")] * (full + 1)
+    choice: List[int] = [-1] * (full + 1)
+    best[0] = 0.0
+    for placed in range(full + 1):
+        if best[placed] == float("inf"):
+            continue
+        for i in range(count):
+            if placed & (1 << i):
+                continue
+            cost: float = best[placed] + presences[i] * uncovered[placed]
+            if placed | (1 << i) == full:
+                cost -= last_saving * uncovered[placed]
+            if cost < best[placed | (1 << i)]:
+                best[placed | (1 << i)] = cost
+                choice[placed | (1 << i)] = i
+    order: List[int] = []
+    placed = full
+    while placed != 0:
+        order.append(choice[placed])
+        placed &= ~(1 << choice[placed])
+    order.reverse()
+    return order
+
+
+def _greedy_order(hashes: List[bytes32], presences: List[float], masks: List[Tuple[int, float]]) -> List[int]:
+    # Place next whichever type completes the most proof weight for what it costs to reveal,
+    # then whichever is needed by the most of the proofs still open
+    order: List[int] = []
+    placed: int = 0
+    remaining: List[int] = list(range(len(hashes)))
+    while len(remaining) > 0:
+        def gain(i: int) -> Tuple[float, float]:
+            covered: int = placed | (1 << i)
+            completed = sum(weight for mask, weight in masks if mask & ~placed and not mask & ~covered)
+            needed = sum(weight for mask, weight in masks if mask & (1 << i) and mask & ~placed)
+            return completed / max(presences[i], 1e-9), needed
+
+        i = max(remaining, key=gain)
+        order.append(i)
+        remaining.remove(i)
+        placed |= 1 << i
+    return order
+
+
+def optimal_order(types: Sequence[AssetType], usage: TypeUsage) -> List[AssetType]:
+    """
+    The order of `types` with the fewest revealed types expected across `usage.proofs`.
+    Types that are never proved keep their relative order at the end.
+    """
+    hashes: List[bytes32] = [typ.get_tree_hash() for typ in types]
+    masks = _masks(hashes, usage)
+    proved: List[int] = [i for i in range(len(types)) if any(mask & (1 << i) for mask, _ in masks)]
+    never_proved: List[int] = [i for i in range(len(types)) if i not in proved]
+    proved_hashes: List[bytes32] = [hashes[i] for i in proved]
+    presences: List[float] = [usage.presence(type_hash) for type_hash in proved_hashes]
+    proved_masks = _masks(proved_hashes, usage)
+    if len(proved) <= EXACT_LIMIT:
+        # in units of revealed types
+        last_saving: float = NO_TRAILING_HASH_SAVING / REVEALED_TYPE_COST if len(never_proved) == 0 else 0
+        order = _exact_order(proved_hashes, presences, proved_masks, last_saving)
+    else:
+        order = _greedy_order(proved_hashes, presences, proved_masks)
+    return [types[proved[i]] for i in order] + [types[i] for i in never_proved]
+
+
+def order_additions(additions: Sequence[TypeChange], usage: TypeUsage) -> List[TypeChange]:
+    """
+    Reorder `additions` so the new types end up in their best order. Each addition is
+    prepended, so the last one ends up first, and the types a coin already has stay
+    behind them in the same order whatever order the new ones take.
+    """
+    by_type: Dict[bytes32, List[TypeChange]] = {}
+    for addition in additions:
+        by_type.setdefault(addition.type.get_tree_hash(), []).append(addition)
+    ordered: List[AssetType] = optimal_order([addition.type for addition in additions], usage)
+    return [by_type[typ.get_tree_hash()].pop() for typ in reversed(ordered)]
+
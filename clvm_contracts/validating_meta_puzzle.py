@@ -1,14 +1,18 @@
 import dataclasses
-import hashlib
 
-from typing import Any, List, Optional, Tuple
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from clvm.EvalError import EvalError
 
 from chia.types.blockchain_format.coin import Coin
-from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.program import Program, SerializedProgram
 from chia.types.blockchain_format.sized_bytes import bytes32
 from chia.types.coin_spend import CoinSpend
 from chia.util.ints import uint64
 
+from clvm_contracts.curried_template import CurriedTemplate, NIL_HASH, TWO, atom_hash, sha256, tree_hash
+from clvm_contracts.instrumentation import instrumented
 from clvm_contracts.load_clvm import load_clvm
 
 
@@ -16,35 +20,100 @@ VMP_MOD = load_clvm(
     "validating_meta_puzzle.clsp", package_or_requirement="clvm_contracts"
 )
 VMP_MOD_HASH = VMP_MOD.get_tree_hash()
+# secured_information ends with the puzzle that expands the per type lists
+PASS_THROUGH_EXPANDER = Program.to(2)
+SPARSE_EXPANDER = load_clvm("sparse_expander.clsp", package_or_requirement="clvm_contracts")
+# wraps the pre-validators of types that only commit to the hash of their environment
+ENVIRONMENT_HASH_PRE_VALIDATOR = load_clvm(
+    "environment_hash.clsp", package_or_requirement="clvm_contracts"
+)
+NIL = Program.to(None)
+REMARK = 1
+REMARK_OPCODE = bytes([REMARK])
 NAMESPACE_PREFIX = b"namespaces"
 INNER_PUZZLE_PREFIX = bytes([0]*32)
 
 
-def sha256(*args: bytes) -> bytes32:
-    return bytes32(hashlib.sha256(b"".join(args)).digest())
+VMP_TEMPLATE = CurriedTemplate(VMP_MOD)
+ENVIRONMENT_HASH_TEMPLATE = CurriedTemplate(ENVIRONMENT_HASH_PRE_VALIDATOR)
+VMP_MOD_HASH_HASH = atom_hash(VMP_MOD_HASH)
+
+
+def vmp_puzzle_hash(inner_puzzle_hash: bytes32, types_hash: bytes32) -> bytes32:
+    return VMP_TEMPLATE.puzzle_hash_of_hashes(VMP_MOD_HASH_HASH, types_hash, inner_puzzle_hash)
+
+
+def as_program(program: Union[Program, SerializedProgram, None]) -> Program:
+    # Solutions may be kept serialized until a spend is actually built
+    if isinstance(program, SerializedProgram):
+        return program.to_program()
+    return Program.to(program)
+
+
+# The driver objects below are slotted and store hashes as plain bytes so that large
+# numbers of pending spends stay cheap to hold in memory
+def _raw_bytes(obj: Any, *names: str) -> None:
+    for name in names:
+        object.__setattr__(obj, name, bytes(getattr(obj, name)))
+
+
+def _reduce_slots(obj: Any) -> Tuple[Any, Tuple[Any, ...]]:
+    # frozen dataclasses without a __dict__ can't be unpickled through setattr
+    return obj.__class__, tuple(getattr(obj, f.name) for f in dataclasses.fields(obj))
 
 
 @dataclasses.dataclass(frozen=True)
 class AssetType:
+    __slots__ = ("launcher_hash", "environment", "pre_validator", "validator", "remover_hash")
     launcher_hash: bytes32
     environment: Program
     pre_validator: Program
     validator: Program
     remover_hash: bytes32
 
+    def __post_init__(self) -> None:
+        _raw_bytes(self, "launcher_hash", "remover_hash")
+
+    __reduce__ = _reduce_slots
+
     def as_program(self) -> Program:
         return Program.to(
             [
                 self.launcher_hash,
                 self.environment,
-                self.pre_validator.get_tree_hash(),
-                self.validator.get_tree_hash(),
+                tree_hash(self.pre_validator),
+                tree_hash(self.validator),
                 self.remover_hash,
             ]
         )
 
     def get_tree_hash(self) -> bytes32:
-        return self.as_program().get_tree_hash()
+        return tree_hash(self)
+
+    def reveals_environment(self) -> bool:
+        # whether the pre-validator is wrapped by commit_environment_hash(reveal=True)
+        pre_validator: Program = self.pre_validator
+        return (
+            pre_validator.listp()
+            and pre_validator.rest().listp()
+            and pre_validator.rest().first().listp()
+            and pre_validator.rest().first().rest() == ENVIRONMENT_HASH_PRE_VALIDATOR
+        )
+
+    def commit_environment_hash(self, reveal: bool = False) -> "AssetType":
+        """
+        Return this type with only the tree hash of its environment curried into TYPES.
+        Pre-validators that pass the environment through as their state work as they are.
+        Ones that read it need `reveal=True` and the environment passed to
+        `VMPSpend.reveal_environment` in every spend.
+        """
+        return AssetType(
+            self.launcher_hash,
+            Program.to(tree_hash(self.environment)),
+            ENVIRONMENT_HASH_TEMPLATE.curry(self.pre_validator) if reveal else self.pre_validator,
+            self.validator,
+            self.remover_hash,
+        )
 
 
 def is_type(cls: Any, possible_type: AssetType, ignores: List[str]=[]) -> bool:
@@ -58,6 +127,18 @@ def is_type(cls: Any, possible_type: AssetType, ignores: List[str]=[]) -> bool:
     return False
 
 
+def type_key(typ: AssetType) -> Tuple[bytes32, bytes32, bytes32]:
+    # what is_type compares when the environment and remover are ignored
+    return typ.launcher_hash, tree_hash(typ.pre_validator), tree_hash(typ.validator)
+
+
+def type_keys(types: List[AssetType]) -> Dict[Tuple[bytes32, bytes32, bytes32], AssetType]:
+    keys: Dict[Tuple[bytes32, bytes32, bytes32], AssetType] = {}
+    for typ in types:
+        keys.setdefault(type_key(typ), typ)
+    return keys
+
+
 def index_of(cls: Any, type_to_find: AssetType) -> int:
     for i, typ in enumerate(cls.types):
         if typ == type_to_find:
@@ -66,11 +147,18 @@ def index_of(cls: Any, type_to_find: AssetType) -> int:
 
 @dataclasses.dataclass(frozen=True)
 class LineageProof:
+    __slots__ = ("parent_id", "types_hash", "inner_puzzle_hash", "amount")
     parent_id: bytes32
     types_hash: bytes32
     inner_puzzle_hash: bytes32
     amount: uint64
 
+    def __post_init__(self) -> None:
+        _raw_bytes(self, "parent_id", "types_hash", "inner_puzzle_hash")
+        object.__setattr__(self, "amount", int(self.amount))
+
+    __reduce__ = _reduce_slots
+
     def as_program(self) -> Program:
         return Program.to(
             [self.parent_id, self.types_hash, self.inner_puzzle_hash, self.amount]
@@ -79,9 +167,15 @@ class LineageProof:
 
 @dataclasses.dataclass(frozen=True)
 class TypeProof:
+    __slots__ = ("puzzle_hash", "inner_hash", "type_hashes")
     puzzle_hash: bytes32
     inner_hash: bytes32
-    type_hashes: List[bytes32]
+    type_hashes: Program  # the revealed type hashes followed by the hash of the rest of the list
+
+    def __post_init__(self) -> None:
+        _raw_bytes(self, "puzzle_hash", "inner_hash")
+
+    __reduce__ = _reduce_slots
 
     def as_program(self) -> Program:
         return Program.to([self.puzzle_hash, self.inner_hash, self.type_hashes])
@@ -89,47 +183,48 @@ class TypeProof:
 
 @dataclasses.dataclass(frozen=True)
 class TypeChange:
+    __slots__ = ("type", "puzzle", "solution")
     type: AssetType
     puzzle: Program
     solution: Program
 
+    __reduce__ = _reduce_slots
+
     def as_program(self) -> Program:
         return Program.to((self.puzzle, self.solution))
 
 
 @dataclasses.dataclass(frozen=True)
 class VMP:
+    __slots__ = ("inner_puzzle", "types")
     inner_puzzle: Program
     types: List[AssetType]
 
+    __reduce__ = _reduce_slots
+
+    @instrumented("VMP.construct")
     def construct(self) -> Program:
-        return VMP_MOD.curry(
-            VMP_MOD.get_tree_hash(),
+        return VMP_TEMPLATE.curry(
+            VMP_MOD_HASH,
             [t.as_program() for t in self.types],
             self.inner_puzzle,
         )
 
+    @instrumented("VMP.get_tree_hash")
     def get_tree_hash(self) -> bytes32:
-        return self.construct().get_tree_hash()
+        return vmp_puzzle_hash(tree_hash(self.inner_puzzle), self.get_types_hash())
 
     def get_types_hash(self) -> bytes32:
-        return Program.to([t.as_program() for t in self.types]).get_tree_hash()
+        # the tree hash of the list of types, built from the cached hash of each type
+        types_hash: bytes32 = NIL_HASH
+        for typ in reversed(self.types):
+            types_hash = sha256(TWO, typ.get_tree_hash(), types_hash)
+        return types_hash
 
+    @instrumented("VMP.get_type_proof")
     def get_type_proof(self, types_to_prove: List[AssetType]) -> TypeProof:
-        type_list = self.types
-        trailing_hash = None
-        while len(type_list) > 0 and type_list[-1] not in types_to_prove:
-            if trailing_hash is None:
-                trailing_hash = Program.to(None).get_tree_hash()
-            trailing_hash = sha256(
-                bytes([2]), type_list[-1].get_tree_hash(), trailing_hash
-            )
-            type_list = type_list[:-1]
-        proof = Program.to(trailing_hash)
-        while len(type_list) > 0:
-            proof = Program.to(type_list[-1].get_tree_hash()).cons(proof)
-            type_list = type_list[:-1]
-        return TypeProof(self.get_tree_hash(), self.inner_puzzle.get_tree_hash(), proof)
+        return build_type_proof(self.types, types_to_prove, self.get_tree_hash(), tree_hash(self.inner_puzzle))
+
     def is_type(self, possible_type: AssetType, ignores: List[str]=[]) -> bool:
         return is_type(self, possible_type, ignores)
 
@@ -137,28 +232,142 @@ class VMP:
         return index_of(self, type_to_find)
 
 
+def build_type_proof(
+    types: List[AssetType], types_to_prove: List[AssetType], puzzle_hash: bytes32, inner_puzzle_hash: bytes32
+) -> TypeProof:
+    type_list = types
+    trailing_hash = None
+    while len(type_list) > 0 and type_list[-1] not in types_to_prove:
+        if trailing_hash is None:
+            trailing_hash = NIL_HASH
+        trailing_hash = sha256(
+            bytes([2]), type_list[-1].get_tree_hash(), trailing_hash
+        )
+        type_list = type_list[:-1]
+    proof = Program.to(trailing_hash)
+    while len(type_list) > 0:
+        proof = Program.to(type_list[-1].get_tree_hash()).cons(proof)
+        type_list = type_list[:-1]
+    return TypeProof(puzzle_hash, inner_puzzle_hash, proof)
+
+
 class VMPSpend:
+    __slots__ = (
+        "coin",
+        "puzzle",
+        "inner_solution",
+        "lineage_proof",
+        "type_proofs",
+        "type_additions",
+        "type_removals",
+        "unsafe_solutions",
+        "secure_solutions",
+        "sparse",
+        "environments",
+        "remark_index",
+        "_cache",
+        "_finalized",
+    )
+
+    # Mutating any of these invalidates the cached types, security hash and puzzle reveal
+    CACHE_DEPENDENCIES = ("puzzle", "type_additions", "type_removals", "secure_solutions", "sparse")
+
     def __init__(
         self,
         coin: Coin,
         puzzle: VMP,
         inner_solution: Program = Program.to(None),
         lineage_proof: Optional[LineageProof] = None,
-        type_proofs: List[TypeProof] = [],
-        unsafe_solutions: Optional[List[Program]] = None,
-        type_additions: List[TypeChange] = [],
-        type_removals: Optional[List[TypeChange]] = None,
-        secure_solutions: Optional[List[Program]] = None,
+        type_proofs: Sequence[TypeProof] = (),
+        unsafe_solutions: Optional[Sequence[Union[Program, SerializedProgram]]] = None,
+        type_additions: Sequence[TypeChange] = (),
+        type_removals: Optional[Sequence[TypeChange]] = None,
+        secure_solutions: Optional[Sequence[Union[Program, SerializedProgram]]] = None,
+        sparse: bool = False,
+        environments: Optional[Dict[bytes32, Program]] = None,
+        remark_index: Optional[int] = None,
     ) -> None:
+        self._finalized = False
+        self._cache: Dict[str, Any] = {}
         self.coin = coin
         self.puzzle = puzzle
         self.inner_solution = inner_solution
         self.lineage_proof = lineage_proof
-        self.type_proofs = type_proofs
-        self.type_additions = type_additions
-        self.type_removals = type_removals
-        self.unsafe_solutions = [None] * len(self) if unsafe_solutions is None else unsafe_solutions
-        self.secure_solutions = [None] * len(self) if secure_solutions is None else secure_solutions
+        self.type_proofs: Tuple[TypeProof, ...] = tuple(type_proofs)
+        self.type_additions: Tuple[TypeChange, ...] = tuple(type_additions)
+        self.type_removals: Optional[Tuple[TypeChange, ...]] = (
+            None if type_removals is None else tuple(type_removals)
+        )
+        # None stands for a () solution to every type
+        self.unsafe_solutions: Optional[Tuple[Union[Program, SerializedProgram], ...]] = (
+            None if unsafe_solutions is None else tuple(unsafe_solutions)
+        )
+        self.secure_solutions: Optional[Tuple[Union[Program, SerializedProgram], ...]] = (
+            None if secure_solutions is None else tuple(secure_solutions)
+        )
+        # Key the removals and solutions by position so that () entries can be left out
+        self.sparse = sparse
+        # type hash -> environment to reveal to a type from AssetType.commit_environment_hash(reveal=True)
+        self.environments: Dict[bytes32, Program] = {} if environments is None else environments
+        # How many conditions the inner puzzle returns before the REMARK of security_hash()
+        # None finds it by running the inner puzzle with inner_solution
+        self.remark_index = remark_index
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_finalized", False):
+            raise AttributeError("Cannot modify a finalized VMPSpend")
+        object.__setattr__(self, name, value)
+        if name in self.CACHE_DEPENDENCIES:
+            self._cache.clear()
+
+    def _cached(self, key: str, func: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
+    def _per_type_list(self, items: List[Program]) -> List[Program]:
+        if not self.sparse:
+            return items
+        return [Program.to((i + 1, item)) for i, item in enumerate(items) if item != NIL]
+
+    def _solution_list(
+        self, solutions: Optional[Tuple[Union[Program, SerializedProgram, None], ...]]
+    ) -> List[Program]:
+        if solutions is None:
+            return self._per_type_list([NIL] * len(self))
+        return self._per_type_list([as_program(solution) for solution in solutions])
+
+    def set_unsafe_solution(self, index: int, solution: Union[Program, SerializedProgram]) -> None:
+        solutions: List[Union[Program, SerializedProgram, None]] = (
+            [None] * len(self) if self.unsafe_solutions is None else list(self.unsafe_solutions)
+        )
+        solutions[index] = solution
+        self.unsafe_solutions = tuple(solutions)
+
+    def reveal_environment(self, typ: AssetType, environment: Program) -> None:
+        self.environments = {**self.environments, typ.get_tree_hash(): environment}
+
+    def unsafe_solution_list(self) -> List[Program]:
+        revealing: List[int] = [i for i, typ in enumerate(self.types) if typ.reveals_environment()]
+        if len(revealing) == 0:
+            return self._solution_list(self.unsafe_solutions)
+        solutions: List[Program] = (
+            [NIL] * len(self)
+            if self.unsafe_solutions is None
+            else [as_program(solution) for solution in self.unsafe_solutions]
+        )
+        for i in revealing:
+            environment: Optional[Program] = self.environments.get(self.types[i].get_tree_hash())
+            if environment is None:
+                raise ValueError(
+                    f"Type {self.types[i].get_tree_hash().hex()} of coin {self.coin.name().hex()} needs its "
+                    "environment revealed with reveal_environment"
+                )
+            solutions[i] = Program.to((environment, solutions[i]))
+        return self._per_type_list(solutions)
+
+    def add_type_proof(self, type_proof: TypeProof) -> None:
+        self.type_proofs = (*self.type_proofs, type_proof)
 
     def name(self) -> None:
         return self.coin.name()
@@ -184,12 +393,15 @@ class VMPSpend:
                     type_removals_dict[type_hash].as_program()
                 )
             else:
-                type_removals_solution.append(Program.to(None))
+                type_removals_solution.append(NIL)
 
-        return type_removals_solution
+        return self._per_type_list(type_removals_solution)
 
     @property
     def types(self) -> List[AssetType]:
+        return self._cached("types", self._types)
+
+    def _types(self) -> List[AssetType]:
         all_types: List[AssetType] = self._types_after_additions()
         removed_types: List[AssetType] = (
             []
@@ -201,34 +413,176 @@ class VMPSpend:
     def __len__(self) -> int:
         return len(self.types)
 
-    def _secured_information(self) -> Program:
+    def secured_information(self) -> Program:
+        # not cached, it only repeats what the spend already holds and only its hash is reused
         return Program.to(
-            [
+            (
                 [add.as_program() for add in self.type_additions],
-                self._align_type_removals(),
-                self.secure_solutions,
-            ]
+                (
+                    self._align_type_removals(),
+                    (
+                        self._solution_list(self.secure_solutions),
+                        SPARSE_EXPANDER if self.sparse else PASS_THROUGH_EXPANDER,
+                    ),
+                ),
+            )
         )
 
+    @instrumented("VMPSpend.security_hash")
     def security_hash(self) -> bytes32:
-        return self._secured_information().get_tree_hash()
-
-    def to_coin_spend(self) -> CoinSpend:
-        solution = Program.to(
+        return self._cached("security_hash", lambda: self.secured_information().get_tree_hash())
+
+    def puzzle_reveal(self) -> Program:
+        return self._cached("puzzle_reveal", self.puzzle.construct)
+
+    def remark(self) -> Program:
+        # the condition the inner puzzle has to return at remark_index
+        return Program.to([REMARK, self.security_hash()])
+
+    def get_remark_index(self) -> int:
+        return self.find_remark_index() if self.remark_index is None else self.remark_index
+
+    def find_remark_index(self) -> int:
+        try:
+            index: Optional[int] = self.remark_index_in(self.puzzle.inner_puzzle.run(self.inner_solution))
+        except (ValueError, EvalError) as e:
+            raise ValueError(
+                f"Cannot find the REMARK of coin {self.coin.name().hex()}: the inner puzzle failed ({e}), "
+                "set remark_index to build the spend anyway"
+            ) from e
+        if index is None:
+            raise ValueError(
+                f"The inner solution of coin {self.coin.name().hex()} returns no REMARK of the security hash, "
+                "set remark_index to build the spend anyway"
+            )
+        return index
+
+    def remark_index_in(self, conditions: Program) -> Optional[int]:
+        # where the REMARK of security_hash() is in conditions the inner puzzle returns
+        security_hash: bytes32 = self.security_hash()
+        for index, condition in enumerate(conditions.as_iter()):
+            if (
+                condition.listp()
+                and condition.first().as_atom() == REMARK_OPCODE
+                and condition.rest().listp()
+                and condition.rest().first().as_atom() == security_hash
+            ):
+                return index
+        return None
+
+    def finalize(self) -> bytes:
+        # Build the coin spend one last time and freeze the spend so it can be reused as is
+        if not self._finalized:
+            coin_spend: CoinSpend = self.to_coin_spend()
+            self._cache["coin_spend"] = coin_spend
+            self._cache["coin_spend_bytes"] = bytes(coin_spend)
+            self._finalized = True
+        return self._cache["coin_spend_bytes"]
+
+    def __bytes__(self) -> bytes:
+        if self._finalized:
+            return self._cache["coin_spend_bytes"]
+        return bytes(self.to_coin_spend())
+
+    def solution(self) -> Program:
+        return Program.to(
             [
                 self.inner_solution,
                 None if self.lineage_proof is None else self.lineage_proof.as_program(),
                 [proof.as_program() for proof in self.type_proofs],
                 [typ.pre_validator for typ in self.types],
                 [typ.validator for typ in self.types],
-                self.unsafe_solutions,
-                self._secured_information(),
+                self.unsafe_solution_list(),
+                self.secured_information(),
+                self.get_remark_index(),
             ]
         )
-        return CoinSpend(self.coin, self.puzzle.construct(), solution)
+
+    @instrumented("VMPSpend.to_coin_spend")
+    def to_coin_spend(self) -> CoinSpend:
+        if self._finalized:
+            return self._cache["coin_spend"]
+        return CoinSpend(self.coin, self.puzzle_reveal(), self.solution())
 
     def is_type(self, possible_type: AssetType, ignores: List[str]=[]) -> bool:
         return is_type(self, possible_type, ignores)
 
     def index_of(self, type_to_find: AssetType) -> int:
         return index_of(self, type_to_find)
+
+
+class BundleContext:
+    """
+    What the solvers and builders read about every coin in a bundle, computed once per
+    spend instead of once per spend and type. Row i describes `spends[i]`, so the coins,
+    puzzles and types of the spends must not change while the context is in use.
+
+    `VMPSpend.to_coin_spend` takes no context: the puzzle reveal is cached on the spend and
+    the solution is made of the spend's own fields, none of which are columns here.
+    """
+
+    @instrumented("BundleContext")
+    def __init__(self, spends: Sequence[VMPSpend]) -> None:
+        # Rows are found by identity, so the spends are held to keep their ids from being reused
+        self.spends: Tuple[VMPSpend, ...] = tuple(spends)
+        self.rows: Dict[int, int] = {id(spend): row for row, spend in enumerate(self.spends)}
+        self.parent_ids: List[bytes32] = [spend.coin.parent_coin_info for spend in spends]
+        self.puzzle_hashes: List[bytes32] = [spend.coin.puzzle_hash for spend in spends]
+        self.amounts = array("Q", [spend.coin.amount for spend in spends])
+        self.coin_ids: List[bytes32] = [spend.coin.name() for spend in spends]
+        self.inner_puzzle_hashes: List[bytes32] = [tree_hash(spend.puzzle.inner_puzzle) for spend in spends]
+        self.types_hashes: List[bytes32] = [spend.puzzle.get_types_hash() for spend in spends]
+        self.vmp_puzzle_hashes: List[bytes32] = [
+            vmp_puzzle_hash(inner_puzzle_hash, types_hash)
+            for inner_puzzle_hash, types_hash in zip(self.inner_puzzle_hashes, self.types_hashes)
+        ]
+        # Of the types each spend leaves its coin with:
+        # type hash -> index of the first with that hash
+        self.type_indexes: List[Dict[bytes32, int]] = []
+        # type_key -> the first with that key
+        self.type_keys: List[Dict[Tuple[bytes32, bytes32, bytes32], AssetType]] = []
+        for spend in spends:
+            indexes: Dict[bytes32, int] = {}
+            for i, typ in enumerate(spend.types):
+                indexes.setdefault(typ.get_tree_hash(), i)
+            self.type_indexes.append(indexes)
+            self.type_keys.append(type_keys(spend.types))
+
+    def __len__(self) -> int:
+        return len(self.coin_ids)
+
+    def row(self, spend: VMPSpend) -> int:
+        row: Optional[int] = self.rows.get(id(spend))
+        if row is None:
+            raise ValueError(
+                f"Spend of coin {spend.coin.name().hex()} is not in this BundleContext, "
+                "make the context from the same spend objects the solver is given"
+            )
+        return row
+
+    def coin_list(self, row: int) -> List[Any]:
+        # what coin_as_list returns for the coin
+        return [self.parent_ids[row], self.puzzle_hashes[row], self.amounts[row]]
+
+    def child_lineage_proof(self, row: int) -> LineageProof:
+        # the lineage proof of a child of the coin that kept its inner puzzle
+        return LineageProof(
+            self.parent_ids[row], self.types_hashes[row], self.inner_puzzle_hashes[row], self.amounts[row]
+        )
+
+    def empty_type_proof(self, row: int) -> TypeProof:
+        # what `VMP.get_type_proof([])` returns for the puzzle of the coin
+        return TypeProof(
+            self.vmp_puzzle_hashes[row],
+            self.inner_puzzle_hashes[row],
+            NIL if self.types_hashes[row] == NIL_HASH else Program.to(self.types_hashes[row]),
+        )
+
+    def type_proof(self, row: int, types_to_prove: List[AssetType]) -> TypeProof:
+        # what `VMP.get_type_proof(types_to_prove)` returns for the puzzle of the coin
+        return build_type_proof(
+            self.spends[row].puzzle.types,
+            types_to_prove,
+            self.vmp_puzzle_hashes[row],
+            self.inner_puzzle_hashes[row],
+        )
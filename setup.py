@@ -19,7 +19,7 @@ dev_dependencies = [
 
 setup(
     name="contract_patterns",
-    packages=find_packages(exclude=("tests",)),
+    packages=find_packages(exclude=("tests", "benchmarks")),
     author="Quexington",
     entry_points={},
     package_data={
@@ -1,5 +1,7 @@
 import json
 
+from typing import Optional
+
 from chia.types.blockchain_format.program import INFINITE_COST
 from chia.types.spend_bundle import SpendBundle
 from chia.types.generator_types import BlockGenerator
@@ -14,12 +16,15 @@ class CostLogger:
         self.cost_dict = {}
         self.cost_dict_no_puzs = {}
 
-    def add_cost(self, descriptor: str, spend_bundle: SpendBundle):
-        program: BlockGenerator = simple_solution_generator(spend_bundle)
+    def add_cost(self, descriptor: str, spend_bundle: SpendBundle, generator: Optional[BlockGenerator] = None):
+        program: BlockGenerator = simple_solution_generator(spend_bundle) if generator is None else generator
         npc_result: NPCResult = get_name_puzzle_conditions(
             program, INFINITE_COST, cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE, mempool_mode=True
         )
         self.cost_dict[descriptor] = npc_result.cost
+        if generator is not None:
+            # puzzle reveals are not stored verbatim in a compressed generator
+            return
         cost_to_subtract: int = 0
         for cs in spend_bundle.coin_spends:
             cost_to_subtract += len(bytes(cs.puzzle_reveal)) * DEFAULT_CONSTANTS.COST_PER_BYTE
@@ -0,0 +1,60 @@
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_spend import CoinSpend
+
+from clvm_contracts.announcement_checker import AnnouncementChecker, check_announcements
+from clvm_contracts.validating_meta_puzzle import NAMESPACE_PREFIX, VMP, VMPSpend
+
+from benchmarks.announcement_checker import announcement_ring
+from benchmarks.scenarios import ACS, ACS_PH, cat_ring
+
+
+def test_announcement_checker():
+    spends = cat_ring(5)
+    assert check_announcements(spends).ok
+
+    # Leaving a coin out of the ring breaks the announcements on both sides of it
+    report = check_announcements(spends[1:])
+    assert not report.ok
+    assert len(report.missing) > 0
+    assert len(report.unasserted) > 0
+    assert report.failures == {}
+
+    # An inner puzzle announcing into a type's namespace is pinned down
+    empty_vmp = VMP(ACS, [])
+    spend = VMPSpend(Coin(bytes32([0] * 32), empty_vmp.get_tree_hash(), 1), empty_vmp)
+    spend.inner_solution = Program.to([[60, NAMESPACE_PREFIX + bytes32([1] * 32)]])
+    report = check_announcements([spend])
+    assert list(report.failures.keys()) == [spend.coin.name()]
+    assert len(report.namespace_violations) == 1
+    assert report.namespace_violations[0].namespace() == bytes32([1] * 32)
+
+
+def test_announcement_checker_ring():
+    spends = announcement_ring(50)
+    report = check_announcements(spends)
+    assert report.ok
+    assert report.unasserted == []
+
+    report = check_announcements(spends[:-1])
+    assert len(report.missing) == 1
+    assert len(report.unasserted) == 1
+
+
+def test_namespaces_of_passing_spends():
+    # Spends that run are checked too: only a VMP may announce into a namespace
+    namespaced = NAMESPACE_PREFIX + bytes32([1] * 32)
+    coin = Coin(bytes32([0] * 32), ACS_PH, 1)
+    report = check_announcements([CoinSpend(coin, ACS, Program.to([[60, namespaced], [62, b"plain"]]))])
+    assert report.failures == {}
+    assert [a.namespace() for a in report.namespace_violations] == [bytes32([1] * 32)]
+    assert not report.ok
+
+    # A VMP's fungible types announce in their own namespaces, as VMPSpends or as coin spends
+    spends = cat_ring(3)
+    for bundle in (spends, [spend.to_coin_spend() for spend in spends]):
+        checker = AnnouncementChecker()
+        checker.add_spends(bundle)
+        assert any(a.namespace() is not None for a in checker.created.values())
+        assert checker.report().ok
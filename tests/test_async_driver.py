@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from clvm_contracts.async_driver import AsyncDriver
+from clvm_contracts.load_clvm import load_clvm
+from clvm_contracts.strict_fungibility import CATType
+
+from benchmarks.driver_scaling import cat_types, unsolved_ring
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.running = 0
+        self.most = 0
+        self.started = 0
+
+    def work(self, seconds: float) -> float:
+        with self.lock:
+            self.started += 1
+            self.running += 1
+            self.most = max(self.most, self.running)
+        time.sleep(seconds)
+        with self.lock:
+            self.running -= 1
+        return seconds
+
+
+@pytest.mark.asyncio
+async def test_async_driver():
+    with ThreadPoolExecutor(4) as executor:
+        driver = AsyncDriver(executor, chunk_size=3, max_concurrency=2)
+        spends = await driver.solve(unsolved_ring(10, cat_types(1)), CATType.solve)
+        expected = [spend.to_coin_spend() for spend in CATType.solve(unsolved_ring(10, cat_types(1)))]
+        assert [spend.to_coin_spend() for spend in spends] == expected
+
+        # The loop runs other tasks between the chunks a ring is encoded and decoded in
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+
+        ticker = asyncio.ensure_future(tick())
+        await asyncio.sleep(0)
+        encoded = await driver.encode_in_chunks(spends)
+        encoded_ticks = len(ticks)
+        decoded = await driver.decode_in_chunks(encoded)
+        ticker.cancel()
+        assert encoded_ticks >= 4 and len(ticks) >= encoded_ticks + 4
+        assert [spend.to_coin_spend() for spend in decoded] == expected
+
+        # Chunks are keyed by their first index and can finish in any order
+        starts = [start async for start, _ in driver.coin_spends(spends)]
+        assert sorted(starts) == [0, 3, 6, 9]
+        assert await driver.to_coin_spends(spends) == expected
+        vmps = [spend.puzzle for spend in spends]
+        assert await driver.get_tree_hashes(vmps) == [vmp.get_tree_hash() for vmp in vmps]
+        rings = [unsolved_ring(2, cat_types(1)), unsolved_ring(3, cat_types(1))]
+        assert sorted([index async for index, _ in driver.solve_rings(rings, CATType.solve)]) == [0, 1]
+        assert await driver.load_clvm("cat_validator.clsp", "clvm_contracts.strict_fungibility") == load_clvm(
+            "cat_validator.clsp", "clvm_contracts.strict_fungibility"
+        )
+
+        # Concurrency is bounded across streams, and closing a stream cancels what hasn't started
+        counter = Counter()
+        streams = [driver.stream((i, counter.work, (0.05,)) for i in range(4)) for _ in range(2)]
+
+        async def drain(stream):
+            return [key async for key, _ in stream]
+
+        assert [sorted(keys) for keys in await asyncio.gather(*(drain(s) for s in streams))] == [[0, 1, 2, 3]] * 2
+        assert counter.most == 2
+        counter = Counter()
+        stream = driver.stream((i, counter.work, (0.05,)) for i in range(100))
+        async for _ in stream:
+            break
+        await stream.aclose()
+        await asyncio.sleep(0.2)
+        assert counter.started <= 3
+
+
+@pytest.mark.asyncio
+async def test_async_driver_process_pool():
+    with ProcessPoolExecutor(2) as executor:
+        driver = AsyncDriver(executor, chunk_size=2)
+        spends = await driver.solve(unsolved_ring(4, cat_types(2)), CATType.solve)
+        expected = [spend.to_coin_spend() for spend in CATType.solve(unsolved_ring(4, cat_types(2)))]
+        assert await driver.to_coin_spends(spends) == expected
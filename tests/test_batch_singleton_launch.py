@@ -0,0 +1,74 @@
+import pytest
+
+from blspy import G2Element
+
+from chia.clvm.spend_sim import SimClient, SpendSim
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.coin_spend import CoinSpend
+from chia.types.mempool_inclusion_status import MempoolInclusionStatus
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.strict_fungibility import SingletonType
+from clvm_contracts.validating_meta_puzzle import VMP, VMPSpend
+
+from benchmarks.batch_singleton_launch import launch_spend, run
+from benchmarks.scenarios import ACS, ACS_PH
+
+
+@pytest.mark.asyncio
+async def test_batch_launch():
+    sim = await SpendSim.create()
+    try:
+        sim_client = SimClient(sim)
+        await sim.farm_block(ACS_PH)
+        parent: Coin = (await sim_client.get_coin_records_by_puzzle_hash(ACS_PH, include_spent_coins=False))[0].coin
+
+        basic_type = BasicType.new()
+        types = SingletonType.new_batch(
+            parent.name(), ACS_PH, 3, basic_type.remover_hash, environment=basic_type.environment
+        )
+        children = SingletonType.batch_coins(parent.name(), ACS_PH, 3)
+        assert len({typ.launcher_hash for typ in types}) == 3
+
+        conditions = SingletonType.batch_conditions(ACS_PH, 3) + [Program.to([51, ACS_PH, parent.amount - 6])]
+        bundle = SpendBundle(
+            [CoinSpend(parent, ACS, Program.to(conditions))]
+            + [launch_spend(child).to_coin_spend() for child in children],
+            G2Element(),
+        )
+        result = await sim_client.push_tx(bundle)
+        assert result == (MempoolInclusionStatus.SUCCESS, None)
+        await sim.farm_block()
+
+        for typ in types:
+            records = await sim_client.get_coin_records_by_puzzle_hash(
+                VMP(ACS, [typ]).get_tree_hash(), include_spent_coins=False
+            )
+            assert len(records) == 1
+
+        # A second coin can't launch a singleton that has already been launched
+        await sim.farm_block(VMP(ACS, []).get_tree_hash())
+        impostor: Coin = (
+            await sim_client.get_coin_records_by_puzzle_hash(VMP(ACS, []).get_tree_hash(), include_spent_coins=False)
+        )[0].coin
+        spend = VMPSpend(
+            impostor,
+            VMP(ACS, []),
+            type_additions=[SingletonType.launch(types[0], conditions=Program.to(None), coin_id=children[0].name())],
+        )
+        spend.inner_solution = Program.to([[51, ACS_PH, impostor.amount], [1, spend.security_hash()]])
+        status, error = await sim_client.push_tx(
+            SpendBundle([SingletonType.solve([spend])[0].to_coin_spend()], G2Element())
+        )
+        assert status == MempoolInclusionStatus.FAILED
+    finally:
+        await sim.close()
+
+
+def test_batch_savings():
+    results = run([4])["4 singletons"]
+    for generator in ("plain", "compressed"):
+        assert results[generator]["batch"]["cost"] < results[generator]["individual"]["cost"]
+        assert results[generator]["bytes_saved"] > 0
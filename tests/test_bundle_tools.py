@@ -0,0 +1,116 @@
+import io
+import tracemalloc
+
+from typing import Iterator
+
+import pytest
+
+from blspy import G2Element
+
+from chia.consensus.cost_calculator import NPCResult
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.generator_types import BlockGenerator
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.bundle_tools import (
+    compressed_solution_generator,
+    stream_spend_bundle,
+    vmp_shared_programs,
+)
+from clvm_contracts.validating_meta_puzzle import VMP, VMPSpend
+
+from benchmarks.scenarios import ACS, ACS_PH, cat_ring
+from tests.cost_logger import CostLogger
+
+
+def run_generator(generator: BlockGenerator) -> NPCResult:
+    return get_name_puzzle_conditions(
+        generator, INFINITE_COST, cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE, mempool_mode=True
+    )
+
+
+def test_compressed_generator():
+    logger = CostLogger()
+    for size in (1, 5, 25, 100):
+        spends = cat_ring(size)
+        bundle = SpendBundle([spend.to_coin_spend() for spend in spends], G2Element())
+        simple_generator = simple_solution_generator(bundle)
+        compressed_generator = compressed_solution_generator(bundle, vmp_shared_programs(spends))
+
+        # The compressed generator must produce exactly the same spends and conditions
+        simple_result = run_generator(simple_generator)
+        compressed_result = run_generator(compressed_generator)
+        assert simple_result.error is None
+        assert compressed_result.error is None
+        assert compressed_result.conds.spends == simple_result.conds.spends
+
+        simple_size = len(bytes(simple_generator.program))
+        compressed_size = len(bytes(compressed_generator.program))
+        if size > 1:
+            assert compressed_size < simple_size
+            assert compressed_result.cost < simple_result.cost
+        logger.add_cost(f"CAT ring of {size} ({simple_size} bytes)", bundle)
+        logger.add_cost(
+            f"CAT ring of {size} compressed ({compressed_size} bytes)", bundle, compressed_generator
+        )
+
+    logger.log_cost_statistics()
+
+
+def basic_additions(count: int) -> Iterator[VMPSpend]:
+    empty_vmp = VMP(ACS, [])
+    basic_type = BasicType.new()
+    for i in range(count):
+        spend = VMPSpend(
+            Coin(bytes32(i.to_bytes(32, "big")), empty_vmp.get_tree_hash(), 1),
+            empty_vmp,
+            type_additions=[BasicType.launch(basic_type, conditions=Program.to(None))],
+        )
+        spend.inner_solution = Program.to([[51, ACS_PH, 1], [1, spend.security_hash()]])
+        yield spend
+
+
+class NullWriter:
+    def write(self, blob: bytes) -> int:
+        return len(blob)
+
+
+def test_stream_spend_bundle():
+    out = io.BytesIO()
+    name = stream_spend_bundle(basic_additions(10), 10, G2Element(), out)
+    bundle = SpendBundle([spend.to_coin_spend() for spend in basic_additions(10)], G2Element())
+    assert out.getvalue() == bytes(bundle)
+    assert name == bundle.name()
+    assert SpendBundle.from_bytes(out.getvalue()) == bundle
+
+    with pytest.raises(ValueError):
+        stream_spend_bundle(basic_additions(3), 4, G2Element(), NullWriter())
+
+    # Extra spends are not written, and only the first of them is read
+    read = []
+
+    def counted(spends: Iterator[VMPSpend]) -> Iterator[VMPSpend]:
+        for spend in spends:
+            read.append(spend)
+            yield spend
+
+    out = io.BytesIO()
+    with pytest.raises(ValueError, match="more were given"):
+        stream_spend_bundle(counted(iter(basic_additions(10))), 2, G2Element(), out)
+    assert len(read) == 3
+    assert len(out.getvalue()) == 4 + sum(len(bytes(spend)) for spend in read[:2])
+
+    # Peak memory does not grow with the number of spends
+    peaks = []
+    for count in (20, 200):
+        tracemalloc.start()
+        stream_spend_bundle(basic_additions(count), count, G2Element(), NullWriter())
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < 2 * peaks[0]
@@ -0,0 +1,48 @@
+from chia.types.blockchain_format.program import Program
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.codec import VMPReader, VMPWriter, decode_spends, encode_spends
+from clvm_contracts.validating_meta_puzzle import LineageProof, VMP
+
+from benchmarks.scenarios import ACS, ACS_PH, cat_ring
+
+
+def test_codec_round_trip():
+    spends = cat_ring(5)
+    spends[0].sparse = True
+    # the security hash changed with it
+    spends[0].inner_solution = Program.to([[51, ACS_PH, spends[0].coin.amount], spends[0].remark()])
+    spends[1].reveal_environment(spends[1].types[0], Program.to([1, 2]))
+    encoded = encode_spends(spends)
+    decoded = decode_spends(memoryview(encoded))
+    assert len(decoded) == len(spends)
+    for spend, decoded_spend in zip(spends, decoded):
+        assert decoded_spend.puzzle == spend.puzzle
+        assert decoded_spend.lineage_proof == spend.lineage_proof
+        assert decoded_spend.type_proofs == spend.type_proofs
+        assert decoded_spend.sparse == spend.sparse
+        assert decoded_spend.environments == spend.environments
+        assert bytes(decoded_spend) == bytes(spend)
+
+    # Every shared program is only written once per stream
+    writer = VMPWriter()
+    writer.write_spend(spends[0])
+    first_size = len(writer.buffer)
+    writer.write_spend(spends[1])
+    assert len(writer.buffer) - first_size < first_size / 2
+
+    # Individual objects can be written and read in any order
+    basic_type = BasicType.new()
+    addition = BasicType.launch(basic_type, conditions=Program.to([[1, 2]]))
+    lineage_proof = LineageProof(ACS_PH, ACS_PH, ACS_PH, 7)
+    writer = VMPWriter()
+    writer.write_asset_type(basic_type)
+    writer.write_vmp(VMP(ACS, [basic_type, basic_type]))
+    writer.write_type_change(addition)
+    writer.write_lineage_proof(lineage_proof)
+    reader = VMPReader(writer.getvalue())
+    assert reader.read_asset_type() == basic_type
+    assert reader.read_vmp() == VMP(ACS, [basic_type, basic_type])
+    assert reader.read_type_change() == addition
+    assert reader.read_lineage_proof() == lineage_proof
+    assert reader.at_end()
@@ -0,0 +1,149 @@
+from typing import List
+
+import pytest
+
+from blspy import G2Element
+
+from chia.clvm.spend_sim import SpendSim, SimClient
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.coin_record import CoinRecord
+from chia.types.mempool_inclusion_status import MempoolInclusionStatus
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.coin_tracker import VMPCoinTracker
+from clvm_contracts.validating_meta_puzzle import BundleContext, VMP, VMPSpend
+
+ACS = Program.to(1)
+ACS_PH = ACS.get_tree_hash()
+
+
+@pytest.mark.asyncio
+async def test_coin_tracker():
+    sim = await SpendSim.create()
+    try:
+        sim_client = SimClient(sim)
+        tracker = VMPCoinTracker(sim_client)
+        await sim.farm_block()
+
+        empty_vmp = VMP(ACS, [])
+        await sim.farm_block(empty_vmp.get_tree_hash())
+        vmp_coin: Coin = (
+            await sim_client.get_coin_records_by_puzzle_hash(
+                empty_vmp.get_tree_hash(), include_spent_coins=False
+            )
+        )[0].coin
+        tracker.track(vmp_coin, empty_vmp)
+
+        # Add a type and let the tracker find the child
+        basic_type = BasicType.new()
+        basic_spend = tracker.spend(
+            vmp_coin.name(),
+            type_additions=[BasicType.launch(basic_type, conditions=Program.to(None))],
+        )
+        basic_spend.inner_solution = Program.to(
+            [
+                [51, ACS_PH, vmp_coin.amount],
+                [1, basic_spend.security_hash()],
+            ]
+        )
+        assert tracker.follow(basic_spend, [ACS]) == [VMP(ACS, [basic_type]).get_tree_hash()]
+        assert await tracker.sync() == []
+        result = await sim_client.push_tx(SpendBundle([basic_spend.to_coin_spend()], G2Element()))
+        await sim.farm_block()
+        assert result == (MempoolInclusionStatus.SUCCESS, None)
+
+        found = await tracker.sync()
+        assert len(found) == 1
+        assert found[0].coin.parent_coin_info == vmp_coin.name()
+        assert found[0].puzzle == VMP(ACS, [basic_type])
+        assert tracker.pending == {}
+
+        # Spend the child using only the tracker's cached state
+        remover_spend = tracker.spend(
+            found[0].coin.name(),
+            type_removals=[BasicType.remove(basic_type, conditions=Program.to(None))],
+        )
+        remover_spend.inner_solution = Program.to(
+            [
+                [51, ACS_PH, found[0].coin.amount],
+                [1, remover_spend.security_hash()],
+            ]
+        )
+        assert tracker.follow(remover_spend, [ACS]) == []
+        result = await sim_client.push_tx(SpendBundle([remover_spend.to_coin_spend()], G2Element()))
+        await sim.farm_block()
+        assert result == (MempoolInclusionStatus.SUCCESS, None)
+
+    finally:
+        await sim.close()
+
+
+def test_coin_tracker_lru():
+    tracker = VMPCoinTracker(None, max_cached=2)
+    empty_vmp = VMP(ACS, [])
+    coins = [Coin(bytes32([i] * 32), empty_vmp.get_tree_hash(), 1) for i in range(3)]
+    for coin in coins[:2]:
+        tracker.track(coin, empty_vmp)
+    # Touching the oldest entry makes the second one the least recently used
+    assert tracker.get(coins[0].name()) is not None
+    tracker.track(coins[2], empty_vmp)
+    assert tracker.get(coins[1].name()) is None
+    assert tracker.get(coins[0].name()) is not None
+    with pytest.raises(KeyError):
+        tracker.spend(coins[1].name())
+
+
+def test_follow_with_context():
+    basic_type = BasicType.new()
+    vmp = VMP(ACS, [basic_type])
+    spend = VMPSpend(Coin(bytes32([1] * 32), vmp.get_tree_hash(), 1), vmp)
+    tracker = VMPCoinTracker(None)
+    context_tracker = VMPCoinTracker(None)
+    assert context_tracker.follow(spend, [ACS], BundleContext([spend])) == tracker.follow(spend, [ACS])
+    assert context_tracker.pending == tracker.pending
+
+
+class RecordSource:
+    def __init__(self) -> None:
+        self.records: List[CoinRecord] = []
+        self.queries: List[List[bytes32]] = []
+
+    async def get_coin_records_by_puzzle_hashes(
+        self, puzzle_hashes: List[bytes32], include_spent_coins: bool = True
+    ) -> List[CoinRecord]:
+        self.queries.append(puzzle_hashes)
+        return [
+            record
+            for record in self.records
+            if record.coin.puzzle_hash in puzzle_hashes and (include_spent_coins or not record.spent)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_pending_children_are_dropped():
+    basic_type = BasicType.new()
+    vmp = VMP(ACS, [basic_type])
+    source = RecordSource()
+    tracker = VMPCoinTracker(source, max_pending_syncs=3)
+
+    # A child spent before the sync finds it is not tracked and not asked for again
+    spend = VMPSpend(Coin(bytes32([1] * 32), vmp.get_tree_hash(), 1), vmp)
+    (puzzle_hash,) = tracker.follow(spend, [ACS])
+    source.records.append(CoinRecord(Coin(spend.coin.name(), puzzle_hash, 1), 1, 2, False, 0))
+    assert await tracker.sync() == []
+    assert tracker.pending == {}
+    assert tracker.get(source.records[0].coin.name()) is None
+
+    # A child that never shows up is given up on after max_pending_syncs syncs
+    other = VMPSpend(Coin(bytes32([2] * 32), vmp.get_tree_hash(), 1), vmp)
+    tracker.follow(other, [ACS])
+    for _ in range(3):
+        assert tracker.pending != {}
+        assert await tracker.sync() == []
+    assert tracker.pending == {}
+    queries = len(source.queries)
+    assert await tracker.sync() == []
+    assert len(source.queries) == queries
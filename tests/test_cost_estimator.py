@@ -0,0 +1,76 @@
+from blspy import G2Element
+
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.cost_estimator import DEFAULT_COST_MODEL, spend_length
+from clvm_contracts.validating_meta_puzzle import VMP, VMPSpend
+
+from benchmarks.scenarios import ACS_PH, basic_spend, cat_ring, nft_ring, run_generator, wide_spend
+
+# predictions have to stay this close to the cost of actually running the spends
+MAX_ERROR = 0.01
+
+
+def test_cost_estimator(monkeypatch):
+    # estimates never run the inner puzzle, the REMARK is looked up in the conditions
+    def find_remark_index(spend):
+        raise AssertionError("the inner puzzle was run")
+
+    remark_last = basic_spend(2, payments=3)
+    remark_last.inner_solution = Program.to([[51, ACS_PH, 6], remark_last.remark()])
+    remark_last.remark_index = None
+
+    # none of these shapes were used for calibration
+    for spends in (
+        [basic_spend(5, 1, 2, 2)],
+        [basic_spend(12)],
+        [basic_spend(3, 3, 0, 4), basic_spend(2, index=1)],
+        [wide_spend(6, True)],
+        cat_ring(3),
+        nft_ring(5),
+        # type proofs apart from the fungible types that add them
+        [basic_spend(2, proofs=3)],
+        [basic_spend(6, 1, 0, 2, proofs=4)],
+        cat_ring(3, cat_types=2, basic_types=1, proofs=1),
+        nft_ring(2, nft_types=3, proofs=2),
+        [remark_last],
+    ):
+        coin_spends = [spend.to_coin_spend() for spend in spends]
+        monkeypatch.setattr(VMPSpend, "find_remark_index", find_remark_index)
+        for spend, coin_spend in zip(spends, coin_spends):
+            entry = Program.to(
+                [
+                    coin_spend.coin.parent_coin_info,
+                    coin_spend.puzzle_reveal.to_program(),
+                    coin_spend.coin.amount,
+                    coin_spend.solution.to_program(),
+                ]
+            )
+            assert spend_length(spend) == len(bytes(entry))
+        cost = run_generator(simple_solution_generator(SpendBundle(coin_spends, G2Element()))).cost
+        predicted = DEFAULT_COST_MODEL.estimate_bundle(spends)
+        monkeypatch.undo()
+        assert abs(predicted - cost) / cost < MAX_ERROR
+
+
+def test_inner_puzzle():
+    # an inner puzzle that adds a payment to the conditions in its solution
+    inner_puzzle = Program.to([4, (1, [51, ACS_PH, 1]), 1])
+    spend = basic_spend(2)
+    spend.puzzle = VMP(inner_puzzle, spend.puzzle.types)
+    spend.coin = Coin(spend.coin.parent_coin_info, spend.puzzle.get_tree_hash(), spend.coin.amount)
+    spend.inner_solution = Program.to([spend.remark()])
+    spend.remark_index = None
+    inner_cost, inner_conditions = inner_puzzle.run_with_cost(INFINITE_COST, spend.inner_solution)
+
+    spends = [spend, basic_spend(3, index=1)]
+    cost = run_generator(
+        simple_solution_generator(SpendBundle([s.to_coin_spend() for s in spends], G2Element()))
+    ).cost
+    # taking the solution for the conditions misses the payment
+    assert abs(DEFAULT_COST_MODEL.estimate_bundle(spends) - cost) / cost > MAX_ERROR
+    predicted = DEFAULT_COST_MODEL.estimate_bundle(spends, [inner_conditions, None], [inner_cost, 0])
+    assert abs(predicted - cost) / cost < MAX_ERROR
@@ -0,0 +1,53 @@
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.curried_template import CurriedTemplate, TreeHashCache, atom_hash
+from clvm_contracts.strict_fungibility import (
+    NFT_PRE_VALIDATOR,
+    NFT_PRE_VALIDATOR_HASH,
+    SINGLETON_LAUNCHER,
+    SingletonType,
+)
+from clvm_contracts.validating_meta_puzzle import VMP, VMP_MOD
+
+
+def test_curried_template():
+    template = CurriedTemplate(VMP_MOD)
+    for args in ([], [1], [bytes32([3] * 32), Program.to([1, (2, 3)]), None]):
+        assert template.puzzle_hash(*args) == VMP_MOD.curry(*args).get_tree_hash()
+        assert template.puzzle_hash_of_hashes(
+            *(Program.to(arg).get_tree_hash() for arg in args)
+        ) == template.curry(*args).get_tree_hash()
+    assert atom_hash(b"abc") == Program.to(b"abc").get_tree_hash()
+
+    assert NFT_PRE_VALIDATOR_HASH == NFT_PRE_VALIDATOR.get_tree_hash()
+    for i in range(3):
+        launcher_hash = bytes32([i] * 32)
+        assert SingletonType.p2_puzzle_hash(launcher_hash=launcher_hash) == (
+            SingletonType.p2(launcher_hash=launcher_hash).get_tree_hash()
+        )
+        assert SingletonType.new(launcher_hash, launcher_hash, Program.to(None)).launcher_hash == (
+            SINGLETON_LAUNCHER.curry(launcher_hash).get_tree_hash()
+        )
+
+
+def test_tree_hash_cache():
+    cache = TreeHashCache(max_size=2)
+    programs = [Program.to([i, i]) for i in range(3)]
+    basic_type = BasicType.new()
+    assert cache.get(programs[0]) == programs[0].get_tree_hash()
+    assert cache.get(programs[0]) == programs[0].get_tree_hash()
+    assert cache.get(basic_type) == basic_type.as_program().get_tree_hash()
+    assert (cache.hits, cache.misses) == (1, 2)
+    # the least recently used entry is dropped
+    cache.get(programs[1])
+    assert len(cache.entries) == 2
+    cache.get(programs[0])
+    assert cache.misses == 4
+
+    # types hashes built from the cached type hashes match hashing the whole list
+    types = [basic_type, BasicType.new()]
+    assert VMP(Program.to(1), types).get_types_hash() == (
+        Program.to([typ.as_program() for typ in types]).get_tree_hash()
+    )
@@ -0,0 +1,15 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.differential_fuzzer import PROPERTY_NAMES, fuzz, main
+
+
+def test_differential_fuzzer():
+    report = fuzz(40, seed=7, chunk_size=10)
+    assert report.cases == 40
+    assert report.failures == []
+
+    with ProcessPoolExecutor(2) as executor:
+        assert fuzz(len(PROPERTY_NAMES) * 2, seed=8, executor=executor, chunk_size=1).failures == []
+
+    # a single case can be replayed
+    assert main(["--seed", "7", "--case", "3"]) == 0
@@ -0,0 +1,118 @@
+import pickle
+
+import pytest
+
+from chia.types.blockchain_format.coin import Coin, coin_as_list
+from chia.types.blockchain_format.program import Program, SerializedProgram
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.validating_meta_puzzle import BundleContext, LineageProof, VMP, VMPSpend
+
+from benchmarks.scenarios import basic_spend
+
+ACS = Program.to(1)
+ACS_PH = ACS.get_tree_hash()
+
+
+def test_slotted_driver_objects():
+    basic_type = BasicType.new()
+    basic_vmp = VMP(ACS, [basic_type])
+    lineage_proof = LineageProof(bytes32([1] * 32), basic_vmp.get_types_hash(), ACS_PH, 1)
+    addition = BasicType.launch(basic_type, conditions=Program.to(None))
+    spend = VMPSpend(
+        Coin(bytes32([2] * 32), basic_vmp.get_tree_hash(), 1),
+        basic_vmp,
+        lineage_proof=lineage_proof,
+        type_proofs=[basic_vmp.get_type_proof([])],
+        remark_index=0,
+    )
+
+    for obj in (basic_type, basic_vmp, lineage_proof, spend.type_proofs[0], addition, spend):
+        assert not hasattr(obj, "__dict__")
+    assert pickle.loads(pickle.dumps(lineage_proof)) == lineage_proof
+    assert type(lineage_proof.parent_id) is bytes
+    assert type(basic_type.launcher_hash) is bytes
+
+    # Unset solutions are padded out to the number of types when the spend is built
+    assert spend.unsafe_solutions is None
+    solution = spend.to_coin_spend().solution.to_program()
+    assert solution.at("rrrrrf") == Program.to([None])
+    spend.set_unsafe_solution(0, SerializedProgram.from_program(Program.to([1, 2])))
+    solution = spend.to_coin_spend().solution.to_program()
+    assert solution.at("rrrrrf") == Program.to([[1, 2]])
+
+    # Mutable defaults are not shared between spends
+    other_spend = VMPSpend(spend.coin, basic_vmp)
+    other_spend.add_type_proof(basic_vmp.get_type_proof([]))
+    assert VMPSpend(spend.coin, basic_vmp).type_proofs == ()
+
+
+def test_vmp_spend_caching():
+    basic_type = BasicType.new()
+    empty_vmp = VMP(ACS, [])
+    spend = VMPSpend(
+        Coin(bytes32([2] * 32), empty_vmp.get_tree_hash(), 1),
+        empty_vmp,
+        type_additions=[BasicType.launch(basic_type, conditions=Program.to(None))],
+    )
+    security_hash = spend.security_hash()
+    assert spend.security_hash() is security_hash
+    assert spend.puzzle_reveal() is spend.puzzle_reveal()
+
+    # Setting the inner solution keeps the cache, changing what it was derived from drops it
+    spend.inner_solution = Program.to([[51, ACS_PH, 1], [1, security_hash]])
+    assert spend.security_hash() is security_hash
+    spend.secure_solutions = [Program.to(1)]
+    assert spend.security_hash() != security_hash
+    spend.secure_solutions = None
+    assert spend.security_hash() == security_hash
+    spend.type_additions = []
+    assert spend.types == []
+    assert spend.security_hash() != security_hash
+    spend.type_additions = [BasicType.launch(basic_type, conditions=Program.to(None))]
+    assert spend.types == [basic_type]
+
+    coin_spend = spend.to_coin_spend()
+    serialized = spend.finalize()
+    assert serialized == bytes(coin_spend) == bytes(spend)
+    assert spend.to_coin_spend() is spend.to_coin_spend()
+    with pytest.raises(AttributeError):
+        spend.inner_solution = Program.to(None)
+
+
+def test_child_type_order():
+    # Children of a coin with several types keep them in the order the driver expects
+    for type_count, additions, removals in ((2, 0, 0), (3, 1, 1)):
+        spend = basic_spend(type_count, additions, removals)
+        coin_spend = spend.to_coin_spend()
+        conditions = coin_spend.puzzle_reveal.to_program().run(coin_spend.solution.to_program())
+        create_coins = [c for c in conditions.as_iter() if c.first() == Program.to(51)]
+        assert len(spend.types) > 1
+        assert [c.at("rf").as_atom() for c in create_coins] == [VMP(ACS, spend.types).get_tree_hash()]
+
+
+def test_bundle_context():
+    basic_type = BasicType.new()
+    spends = [
+        VMPSpend(Coin(bytes32([i] * 32), vmp.get_tree_hash(), i), vmp)
+        for i, vmp in enumerate([VMP(ACS, []), VMP(ACS, [basic_type]), VMP(ACS, [basic_type, basic_type])])
+    ]
+    context = BundleContext(spends)
+    assert len(context) == 3
+    for spend in spends:
+        row = context.row(spend)
+        assert context.coin_ids[row] == spend.coin.name()
+        assert context.coin_list(row) == coin_as_list(spend.coin)
+        assert context.vmp_puzzle_hashes[row] == spend.coin.puzzle_hash
+        assert context.empty_type_proof(row) == spend.puzzle.get_type_proof([])
+        assert context.child_lineage_proof(row) == LineageProof(
+            spend.coin.parent_coin_info, spend.puzzle.get_types_hash(), ACS_PH, spend.coin.amount
+        )
+        assert [context.type_indexes[row][typ.get_tree_hash()] for typ in spend.types] == [0] * len(spend.types)
+        assert context.type_proof(row, spend.types[:1]) == spend.puzzle.get_type_proof(spend.types[:1])
+
+    # A spend the context wasn't made from, even an equal one, has no row
+    stranger = VMPSpend(spends[0].coin, spends[0].puzzle)
+    with pytest.raises(ValueError, match="not in this BundleContext"):
+        context.row(stranger)
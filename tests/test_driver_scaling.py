@@ -0,0 +1,38 @@
+import copy
+import json
+
+from benchmarks.driver_scaling import BASELINE, compare, main, scaling_exponent, sweeps
+
+
+def test_driver_scaling(tmp_path):
+    output = str(tmp_path / "results.json")
+    assert main(["--max-types", "10", "--max-spends", "10", "--min-seconds", "0", "--output", output, "--no-baseline"]) == 0
+    with open(output) as f:
+        results = json.load(f)
+    assert set(results["results"]["VMP.construct"]["seconds"].keys()) == {"1", "10"}
+    assert compare(results, results) == []
+
+    assert abs(scaling_exponent({1: 1.0, 10: 10.0, 100: 100.0}) - 1) < 1e-9
+    assert abs(scaling_exponent({1: 1.0, 10: 100.0}) - 2) < 1e-9
+
+    # A uniform slowdown is flagged per size, a worse exponent as an asymptotic regression
+    slower = copy.deepcopy(results)
+    operation = slower["results"]["CATType.solve"]
+    operation["seconds"] = {size: seconds * 3 for size, seconds in operation["seconds"].items()}
+    assert len(compare(slower, results)) == 2
+    operation["seconds"]["10"] *= 100
+    assert any("scales as" in regression for regression in compare(slower, results))
+
+    # A sweep cut short is compared over the sizes it has
+    full = copy.deepcopy(results)
+    full["results"]["CATType.solve"]["seconds"]["100"] = results["results"]["CATType.solve"]["seconds"]["10"]
+    assert compare(results, full) == []
+
+
+def test_driver_scaling_baseline():
+    # The committed baseline covers every operation and size of the full sweep
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    for name, sizes, _ in sweeps():
+        assert set(baseline["results"][name]["seconds"].keys()) == {str(size) for size in sizes}
+    assert compare(baseline, baseline) == []
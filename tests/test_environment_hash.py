@@ -0,0 +1,121 @@
+import pytest
+
+from blspy import G2Element
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.validating_meta_puzzle import AssetType, LineageProof, VMP, VMPSpend
+
+from tests.cost_logger import CostLogger
+
+ACS = Program.to(1)
+ACS_PH = ACS.get_tree_hash()
+
+
+def spend_type(typ: AssetType, environment: Program = None) -> VMPSpend:
+    vmp = VMP(ACS, [typ])
+    parent = Coin(bytes32([0] * 32), vmp.get_tree_hash(), 1)
+    spend = VMPSpend(
+        Coin(parent.name(), vmp.get_tree_hash(), 1),
+        vmp,
+        lineage_proof=LineageProof(parent.parent_coin_info, vmp.get_types_hash(), ACS_PH, 1),
+    )
+    if environment is not None:
+        spend.reveal_environment(typ, environment)
+    spend.inner_solution = Program.to([[51, ACS_PH, 1], [1, spend.security_hash()]])
+    return spend
+
+
+def test_environment_hash():
+    logger = CostLogger()
+    basic_type = BasicType.new()
+    costs_by_size = {}
+    for size in (1, 10, 100):
+        environment = Program.to([bytes([i % 256] * 32) for i in range(size)])
+        full_type = AssetType(
+            basic_type.launcher_hash,
+            environment,
+            basic_type.pre_validator,
+            basic_type.validator,
+            basic_type.remover_hash,
+        )
+        hashed_type = full_type.commit_environment_hash()
+        revealed_type = full_type.commit_environment_hash(reveal=True)
+        costs = {}
+        for name, spend in (
+            ("full", spend_type(full_type)),
+            ("hashed", spend_type(hashed_type)),
+            ("hashed and revealed", spend_type(revealed_type, environment)),
+        ):
+            bundle = SpendBundle([spend.to_coin_spend()], G2Element())
+            result = get_name_puzzle_conditions(
+                simple_solution_generator(bundle),
+                INFINITE_COST,
+                cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE,
+                mempool_mode=True,
+            )
+            assert result.error is None
+            # the environment is passed through so the child keeps the same type
+            assert result.conds.spends[0].create_coin[0][0] == spend.puzzle.get_tree_hash()
+            costs[name] = result.cost
+            logger.add_cost(f"{name} environment of {size} hashes", bundle)
+
+        # Pass-through pre-validators only ever carry the hash
+        assert costs["hashed"] <= costs["full"]
+        assert costs["hashed"] == costs_by_size.get(1, costs)["hashed"]
+        costs_by_size[size] = costs
+    assert costs_by_size[100]["hashed"] < costs_by_size[100]["full"]
+
+    # A revealed environment has to match the committed hash
+    bad_spend = spend_type(revealed_type, Program.to([1]))
+    with pytest.raises(ValueError, match="clvm raise"):
+        bad_spend.to_coin_spend().puzzle_reveal.to_program().run(
+            bad_spend.to_coin_spend().solution.to_program()
+        )
+
+    # A revealing type can't be spent without its environment
+    with pytest.raises(ValueError, match="reveal_environment"):
+        spend_type(revealed_type).to_coin_spend()
+
+    logger.log_cost_statistics()
+
+
+def test_stripped_environment():
+    # A pre-validator that reads its environment into the new state: (c (c (q . 7) environment) (q))
+    basic_type = BasicType.new()
+    environment = Program.to([b"environment"])
+    typ = AssetType(
+        basic_type.launcher_hash,
+        environment,
+        Program.to([4, [4, (1, 7), [5, [6, [5, 1]]]], (1, None)]),
+        basic_type.validator,
+        basic_type.remover_hash,
+    ).commit_environment_hash(reveal=True)
+    coin_spend = spend_type(typ, environment).to_coin_spend()
+    puzzle = coin_spend.puzzle_reveal.to_program()
+    solution = coin_spend.solution.to_program()
+    # The child commits to the hash of the new state
+    child_type = AssetType(
+        typ.launcher_hash,
+        Program.to(Program.to((7, environment)).get_tree_hash()),
+        typ.pre_validator,
+        typ.validator,
+        typ.remover_hash,
+    )
+    create_coins = [c for c in puzzle.run(solution).as_iter() if c.first() == Program.to(51)]
+    assert create_coins[0].at("rf").as_atom() == VMP(ACS, [child_type]).get_tree_hash()
+
+    # Unsafe solutions can be changed by anyone relaying the spend, but stripping the reveal fails it
+    items = list(solution.as_iter())
+    unsafe_solution: Program = items[5].first()
+    for stripped in (Program.to((None, unsafe_solution.rest())), unsafe_solution.rest()):
+        items[5] = Program.to([stripped])
+        with pytest.raises(ValueError):
+            puzzle.run(Program.to(items))
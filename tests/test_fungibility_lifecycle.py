@@ -10,6 +10,7 @@ from chia.types.coin_spend import CoinSpend
 from chia.types.mempool_inclusion_status import MempoolInclusionStatus
 from chia.types.spend_bundle import SpendBundle
 
+from clvm_contracts.announcement_checker import check_announcements
 from clvm_contracts.boilerplate.basic import BasicType
 from clvm_contracts.strict_fungibility import CATType, NFTType, SingletonType
 from clvm_contracts.validating_meta_puzzle import (
@@ -22,6 +23,7 @@ from clvm_contracts.validating_meta_puzzle import (
     VMPSpend,
 )
 
+from benchmarks.scenarios import cat_ring
 from tests.cost_logger import CostLogger
 
 ACS = Program.to(1)
@@ -58,13 +60,13 @@ async def test_cat_lifecycle():
             empty_vmp,
             type_additions=[BasicType.launch(cat_type, conditions=Program.to(None))],
         )
-        solved_add_cat_type_spend = CATType.solve([add_cat_type_spend])[0]
-        solved_add_cat_type_spend.inner_solution = Program.to(
+        add_cat_type_spend.inner_solution = Program.to(
             [
                 [51, ACS_PH, vmp_coin.amount],
-                [1, solved_add_cat_type_spend.security_hash()],
+                [1, add_cat_type_spend.security_hash()],
             ]
         )
+        solved_add_cat_type_spend = CATType.solve([add_cat_type_spend])[0]
         add_cat_type_bundle = SpendBundle(
             [solved_add_cat_type_spend.to_coin_spend()],
             G2Element(),
@@ -109,13 +111,13 @@ async def test_nft_lifecycle():
             empty_vmp,
             type_additions=[BasicType.launch(nft_type, conditions=Program.to(None))],
         )
-        solved_add_nft_type_spend = NFTType.solve([add_nft_type_spend])[0]
-        solved_add_nft_type_spend.inner_solution = Program.to(
+        add_nft_type_spend.inner_solution = Program.to(
             [
                 [51, ACS_PH, vmp_coin.amount],
-                [1, solved_add_nft_type_spend.security_hash()],
+                [1, add_nft_type_spend.security_hash()],
             ]
         )
+        solved_add_nft_type_spend = NFTType.solve([add_nft_type_spend])[0]
         add_nft_type_bundle = SpendBundle(
             [solved_add_nft_type_spend.to_coin_spend()],
             G2Element(),
@@ -164,15 +166,15 @@ async def test_singleton_lifecycle():
                 )
             ],
         )
-        solved_add_singleton_type_spend = SingletonType.solve(
-            [add_singleton_type_spend]
-        )[0]
-        solved_add_singleton_type_spend.inner_solution = Program.to(
+        add_singleton_type_spend.inner_solution = Program.to(
             [
                 [51, ACS_PH, vmp_coin.amount],
-                [1, solved_add_singleton_type_spend.security_hash()],
+                [1, add_singleton_type_spend.security_hash()],
             ]
         )
+        solved_add_singleton_type_spend = SingletonType.solve(
+            [add_singleton_type_spend]
+        )[0]
         add_singleton_type_bundle = SpendBundle(
             [solved_add_singleton_type_spend.to_coin_spend()],
             G2Element(),
@@ -209,13 +211,10 @@ async def test_singleton_lifecycle():
             singleton_vmp,
             lineage_proof=lineage_proof,
         )
-        solved_p2_singleton_claim_spend = SingletonType.solve(
-            [p2_singleton_claim_spend]
-        )[0]
-        solved_p2_singleton_claim_spend.inner_solution = Program.to(
+        p2_singleton_claim_spend.inner_solution = Program.to(
             [
                 [51, ACS_PH, vmp_coin.amount],
-                [1, solved_p2_singleton_claim_spend.security_hash()],
+                [1, p2_singleton_claim_spend.security_hash()],
                 [
                     60,
                     NAMESPACE_PREFIX
@@ -224,6 +223,9 @@ async def test_singleton_lifecycle():
                 ],
             ]
         )
+        solved_p2_singleton_claim_spend = SingletonType.solve(
+            [p2_singleton_claim_spend]
+        )[0]
         UNIQUE_AMOUNT = 12345
         p2_singleton_spend = CoinSpend(
             p2_singleton_coin,
@@ -258,3 +260,22 @@ async def test_singleton_lifecycle():
 
     finally:
         await sim.close()
+
+
+def test_cat_ring_balances():
+    # Each coin's own amount is subtracted from its subtotal, so a ring of coins with value balances
+    for moved in (0, 5):
+        spends = cat_ring(3)
+        for spend, delta in zip(spends, (moved, -moved, 0)):
+            spend.inner_solution = Program.to(
+                [[51, ACS_PH, spend.coin.amount + delta], [1, spend.security_hash()]]
+            )
+        solved = CATType.solve(spends)
+        assert all(spend.coin.amount > 0 for spend in solved)
+        assert check_announcements(solved).ok
+
+    # Value can't be created
+    spends = cat_ring(2)
+    for spend in spends:
+        spend.inner_solution = Program.to([[51, ACS_PH, spend.coin.amount + 1], [1, spend.security_hash()]])
+    assert not check_announcements(CATType.solve(spends)).ok
@@ -0,0 +1,46 @@
+import tracemalloc
+
+from clvm_contracts.instrumentation import INSTRUMENTATION
+
+from benchmarks.scenarios import cat_ring
+
+
+def test_instrumentation():
+    INSTRUMENTATION.reset()
+    cat_ring(2)
+    assert INSTRUMENTATION.snapshot() == {}
+
+    INSTRUMENTATION.enable(track_memory=True)
+    try:
+        spends = cat_ring(3)
+        for spend in spends:
+            spend.to_coin_spend()
+    finally:
+        INSTRUMENTATION.disable()
+    assert not tracemalloc.is_tracing()
+    snapshot = INSTRUMENTATION.snapshot()
+    assert snapshot["solve_fungible_type"]["count"] == 1
+    assert snapshot["VMPSpend.to_coin_spend"]["count"] == 3
+    assert snapshot["VMPSpend.to_coin_spend"]["retained_bytes"] > 0
+    assert snapshot["BundleContext"]["count"] == 1
+    stats = snapshot["VMP.construct"]
+    assert stats["count"] == 3
+    assert 0 < stats["p50_seconds"] <= stats["p99_seconds"] <= stats["total_seconds"]
+
+    text = INSTRUMENTATION.prometheus_text()
+    assert "# TYPE vmp_driver_latency_seconds summary" in text
+    assert 'vmp_driver_latency_seconds_count{operation="VMPSpend.to_coin_spend"} 3' in text
+    assert 'vmp_driver_latency_seconds{operation="VMP.construct",quantile="0.99"}' in text
+    assert "# TYPE vmp_driver_retained_bytes_total counter" in text
+    INSTRUMENTATION.reset()
+
+
+def test_tracing_left_running():
+    # tracing that was started elsewhere keeps going
+    tracemalloc.start()
+    try:
+        INSTRUMENTATION.enable(track_memory=True)
+        INSTRUMENTATION.disable()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.load_generator import generate_load
+
+
+@pytest.mark.asyncio
+async def test_load_generator():
+    report = await generate_load({"cat": 1, "nft": 2, "singleton": 1}, 2, block_interval=0.01)
+    assert report.failures == 0
+    assert report.transactions == {"cat": 2, "nft": 4, "singleton": 2}
+    assert report.blocks >= 2
+    assert report.max_block_cost > 0
+    assert report.latency_seconds["p50"] <= report.latency_seconds["p99"]
+
+
+@pytest.mark.asyncio
+async def test_load_generator_timeout():
+    # Nothing is farmed before the timeout, so every wallet gives up on its first transaction
+    report = await generate_load({"cat": 1, "nft": 1, "singleton": 0}, 2, block_interval=1.0, timeout=0.05)
+    assert report.failures == 2
+    assert report.transactions == {"cat": 0, "nft": 0, "singleton": 0}
@@ -0,0 +1,172 @@
+import threading
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.full_node.mempool_check_conditions import get_name_puzzle_conditions
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import INFINITE_COST, Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.announcement_checker import check_announcements
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.coin_tracker import TrackedVMP
+from clvm_contracts.migration import MigrationPlanner, MigrationProgress, MigrationState, TypeMigration
+from clvm_contracts.strict_fungibility import CATType
+from clvm_contracts.validating_meta_puzzle import AssetType, LineageProof, VMP, VMPSpend
+
+ACS = Program.to(1)
+ACS_PH = ACS.get_tree_hash()
+
+
+def pay_to_self(spend: VMPSpend) -> Program:
+    return Program.to([[51, ACS_PH, spend.coin.amount], [1, spend.security_hash()]])
+
+
+def basic_coins(typ: AssetType, count: int) -> List[TrackedVMP]:
+    vmp = VMP(ACS, [typ])
+    coins: List[TrackedVMP] = []
+    for i in range(count):
+        parent = Coin(bytes32(i.to_bytes(32, "big")), vmp.get_tree_hash(), 1)
+        coins.append(
+            TrackedVMP(
+                Coin(parent.name(), vmp.get_tree_hash(), 1),
+                vmp,
+                LineageProof(parent.parent_coin_info, vmp.get_types_hash(), ACS_PH, 1),
+            )
+        )
+    return coins
+
+
+def test_migration(tmp_path):
+    old_type = BasicType.new()
+    new_type = AssetType(
+        old_type.launcher_hash,
+        Program.to("upgraded"),
+        old_type.pre_validator,
+        old_type.validator,
+        old_type.remover_hash,
+    )
+    migration = TypeMigration(
+        type_additions=[BasicType.launch(new_type, conditions=Program.to(None))],
+        type_removals=[BasicType.remove(old_type, conditions=Program.to(None))],
+    )
+    coins = basic_coins(old_type, 12)
+    # coins that were already migrated are left alone
+    coins += basic_coins(new_type, 2)
+
+    progress: List[MigrationProgress] = []
+    planner = MigrationPlanner(
+        migration,
+        pay_to_self,
+        batch_size=5,
+        # about three spends fit in a bundle
+        max_cost=250_000_000,
+        progress=progress.append,
+    )
+    state = MigrationState()
+    bundles = []
+    for bundle in planner.plan(coins, state):
+        result = get_name_puzzle_conditions(
+            simple_solution_generator(bundle.spend_bundle),
+            INFINITE_COST,
+            cost_per_byte=DEFAULT_CONSTANTS.COST_PER_BYTE,
+            mempool_mode=True,
+        )
+        assert result.error is None
+        assert result.cost <= bundle.cost <= planner.max_cost
+        expected_child = VMP(ACS, [new_type]).get_tree_hash()
+        assert all(spend.create_coin[0][0] == expected_child for spend in result.conds.spends)
+        bundles.append(bundle)
+        state.record(bundle)
+        if len(bundles) == 2:
+            # stop partway through as if the process was interrupted
+            break
+    assert len(bundles[0].spend_bundle.coin_spends) > 1
+    assert progress[-1].total == 14
+    state_file = str(tmp_path / "migration_state")
+    state.save(state_file)
+
+    # Resume on a worker pool with the saved state
+    resumed = MigrationState.load(state_file)
+    assert resumed.completed == state.completed
+    with ProcessPoolExecutor(1) as executor:
+        planner = MigrationPlanner(migration, pay_to_self, executor=executor, batch_size=5)
+        remaining = list(planner.plan(coins, resumed))
+    assert planner.failures == {}
+    migrated = {coin_id for bundle in remaining for coin_id in bundle.coin_ids()}
+    assert migrated.isdisjoint(state.completed)
+    assert len(migrated) + len(state.completed) == 12
+
+
+def cat_coins(count: int) -> List[TrackedVMP]:
+    basic_type = BasicType.new()
+    cat_type = CATType.new(basic_type.launcher_hash, basic_type.remover_hash, basic_type.environment)
+    vmp = VMP(ACS, [cat_type])
+    coins: List[TrackedVMP] = []
+    for i in range(count):
+        parent = Coin(bytes32(i.to_bytes(32, "big")), vmp.get_tree_hash(), 100 + i)
+        coins.append(
+            TrackedVMP(
+                Coin(parent.name(), vmp.get_tree_hash(), parent.amount),
+                vmp,
+                LineageProof(parent.parent_coin_info, vmp.get_types_hash(), ACS_PH, parent.amount),
+            )
+        )
+    return coins
+
+
+def test_solved_migration():
+    coins = cat_coins(6)
+    planner = MigrationPlanner(TypeMigration(), pay_to_self, batch_size=3, solve=CATType.solve)
+    bundles = list(planner.plan(coins))
+    assert planner.failures == {}
+    # every solved batch stays in one bundle, and each bundle passes as a whole
+    assert [len(bundle.coin_ids()) for bundle in bundles] == [6]
+    assert check_announcements(bundles[0].spend_bundle.coin_spends).ok
+
+    # One bad spend fails the whole ring it was solved with
+    bad_coin: bytes32 = coins[1].coin.name()
+
+    def inner_solution(spend: VMPSpend) -> Program:
+        if spend.coin.name() == bad_coin:
+            return Program.to([[51, ACS_PH, spend.coin.amount]])
+        return pay_to_self(spend)
+
+    progress: List[MigrationProgress] = []
+    planner = MigrationPlanner(
+        TypeMigration(), inner_solution, batch_size=3, solve=CATType.solve, progress=progress.append
+    )
+    bundles = list(planner.plan(coins))
+    assert set(planner.failures) == {tracked.coin.name() for tracked in coins[:3]}
+    assert "clvm" not in planner.failures[coins[0].coin.name()]
+    assert bad_coin.hex() in planner.failures[coins[0].coin.name()]
+    assert [set(bundle.coin_ids()) for bundle in bundles] == [{tracked.coin.name() for tracked in coins[3:]}]
+    assert check_announcements(bundles[0].spend_bundle.coin_spends).ok
+    assert progress[-1] == MigrationProgress(6, 3, 0, 3)
+
+    # Inner solutions and the solve run once per spend, on the executor
+    threads: List[int] = []
+
+    def counted_solution(spend: VMPSpend) -> Program:
+        threads.append(threading.get_ident())
+        return pay_to_self(spend)
+
+    with ThreadPoolExecutor(1) as executor:
+        planner = MigrationPlanner(
+            TypeMigration(), counted_solution, executor=executor, batch_size=3, solve=CATType.solve
+        )
+        assert len(list(planner.plan(coins))) == 1
+    assert len(threads) == 6
+    assert threading.get_ident() not in threads
+
+    # and a process pool works the same
+    with ProcessPoolExecutor(1) as executor:
+        planner = MigrationPlanner(
+            TypeMigration(), pay_to_self, executor=executor, batch_size=3, solve=CATType.solve
+        )
+        bundles = list(planner.plan(coins))
+    assert planner.failures == {}
+    assert check_announcements(bundles[0].spend_bundle.coin_spends).ok
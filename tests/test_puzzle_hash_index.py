@@ -0,0 +1,51 @@
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.sized_bytes import bytes32
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.puzzle_hash_index import VMPPuzzleHashIndex
+from clvm_contracts.strict_fungibility import CATType, SingletonType
+from clvm_contracts.validating_meta_puzzle import VMP
+
+ACS = Program.to(1)
+ACS_PH = ACS.get_tree_hash()
+OTHER_INNER = Program.to([1, 2])
+
+
+def test_puzzle_hash_index():
+    basic_type = BasicType.new()
+    cat_type = CATType.new(basic_type.launcher_hash, basic_type.remover_hash, basic_type.environment)
+    singleton_type = SingletonType.new(bytes32([1] * 32), basic_type.remover_hash, basic_type.environment)
+
+    index = VMPPuzzleHashIndex()
+    index.add_types([])
+    index.add_types([cat_type])
+    assert len(index) == 0
+    index.add_inner_puzzle_hash(ACS_PH)
+    assert len(index) == 2
+
+    # The hash-only calculation must agree with the fully curried puzzle
+    for types in ([], [cat_type]):
+        puzzle_hash = VMP(ACS, types).construct().get_tree_hash()
+        assert VMP(ACS, types).get_tree_hash() == puzzle_hash
+        assert index.lookup(puzzle_hash) == (ACS_PH, types)
+
+    # Both sides can grow incrementally
+    index.add_inner_puzzle_hash(OTHER_INNER.get_tree_hash())
+    index.add_types([singleton_type, cat_type])
+    index.add_types([cat_type])
+    assert len(index) == 6
+    assert index.lookup(VMP(OTHER_INNER, [singleton_type, cat_type]).construct().get_tree_hash()) == (
+        OTHER_INNER.get_tree_hash(),
+        [singleton_type, cat_type],
+    )
+
+    coins = [
+        Coin(bytes32([0] * 32), VMP(ACS, [cat_type]).get_tree_hash(), 1),
+        Coin(bytes32([0] * 32), ACS_PH, 2),
+        Coin(bytes32([0] * 32), VMP(OTHER_INNER, []).get_tree_hash(), 3),
+    ]
+    assert index.match(coins) == [
+        (coins[0], ACS_PH, [cat_type]),
+        (coins[2], OTHER_INNER.get_tree_hash(), []),
+    ]
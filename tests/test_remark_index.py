@@ -0,0 +1,65 @@
+import pytest
+
+from blspy import G2Element
+
+from chia.types.blockchain_format.program import Program
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.codec import decode_spends, encode_spends
+from clvm_contracts.validating_meta_puzzle import VMPSpend
+
+from benchmarks.scenarios import ACS_PH, basic_spend
+from tests.cost_logger import CostLogger
+
+
+def payment_spend(payments: int, remark_first: bool) -> VMPSpend:
+    spend = basic_spend(1, payments=payments)
+    spend.remark_index = None
+    conditions = [[51, ACS_PH, i + 1] for i in range(payments)]
+    spend.inner_solution = Program.to(
+        [spend.remark()] + conditions if remark_first else conditions + [spend.remark()]
+    )
+    return spend
+
+
+def test_remark_index():
+    logger = CostLogger()
+    for payments in (1, 100):
+        costs = {}
+        for remark_first in (True, False):
+            spend = payment_spend(payments, remark_first)
+            assert spend.get_remark_index() == (0 if remark_first else payments)
+            bundle = SpendBundle([spend.to_coin_spend()], G2Element())
+            descriptor = f"{payments} payments, REMARK {'first' if remark_first else 'last'}"
+            logger.add_cost(descriptor, bundle)
+            costs[remark_first] = logger.cost_dict_no_puzs[descriptor]
+
+            # An index given by the driver is used as is and kept by the codec
+            spend.remark_index = spend.get_remark_index()
+            assert decode_spends(encode_spends([spend]))[0].remark_index == spend.remark_index
+            assert spend.to_coin_spend() == bundle.coin_spends[0]
+        # The puzzle only walks as far as the REMARK
+        assert costs[True] < costs[False]
+
+    # The condition at the index has to be the REMARK of the secured information
+    spend = payment_spend(2, remark_first=False)
+    for wrong_index in (0, 1, 3):
+        spend.remark_index = wrong_index
+        coin_spend = spend.to_coin_spend()
+        with pytest.raises(ValueError):
+            coin_spend.puzzle_reveal.run_with_cost(11000000000, coin_spend.solution)
+    spend.remark_index = None
+    spend.inner_solution = Program.to([[51, ACS_PH, 3], [1, b"not the security hash"]])
+    # Without the REMARK there is no index to find
+    with pytest.raises(ValueError, match="no REMARK"):
+        spend.to_coin_spend()
+    spend.inner_solution = Program.to((1, 2))
+    with pytest.raises(ValueError, match="inner puzzle failed"):
+        spend.to_coin_spend()
+    spend.inner_solution = Program.to([[51, ACS_PH, 3], [1, b"not the security hash"]])
+    spend.remark_index = 1
+    coin_spend = spend.to_coin_spend()
+    with pytest.raises(ValueError):
+        coin_spend.puzzle_reveal.run_with_cost(11000000000, coin_spend.solution)
+
+    logger.log_cost_statistics()
@@ -0,0 +1,43 @@
+from blspy import G2Element
+
+from chia.full_node.bundle_tools import simple_solution_generator
+from chia.types.spend_bundle import SpendBundle
+
+from clvm_contracts.bundle_tools import compressed_solution_generator, vmp_shared_programs
+
+from benchmarks.scenarios import run_generator, wide_spend
+from tests.cost_logger import CostLogger
+
+
+def test_sparse_solutions():
+    logger = CostLogger()
+    for type_count in (2, 20, 100):
+        results = {}
+        for sparse in (False, True):
+            spend = wide_spend(type_count, sparse)
+            bundle = SpendBundle([spend.to_coin_spend()], G2Element())
+            results[sparse] = run_generator(simple_solution_generator(bundle))
+            size = len(bytes(bundle))
+            logger.add_cost(f"{type_count} types {'sparse' if sparse else 'dense'} ({size} bytes)", bundle)
+
+        # Both encodings create the same child
+        assert results[True].conds.spends[0].create_coin == results[False].conds.spends[0].create_coin
+    # Sparse spends have to reveal the expander so they only pay off for very wide type lists
+    assert results[True].cost < results[False].cost
+
+    # Unless the expander is shared between the spends of a block
+    costs = {}
+    for sparse in (False, True):
+        spends = [wide_spend(50, sparse, i) for i in range(10)]
+        bundle = SpendBundle([spend.to_coin_spend() for spend in spends], G2Element())
+        generator = compressed_solution_generator(bundle, vmp_shared_programs(spends))
+        costs[sparse] = run_generator(generator).cost
+        logger.add_cost(
+            f"10 spends of 50 types {'sparse' if sparse else 'dense'} compressed "
+            f"({len(bytes(generator.program))} bytes)",
+            bundle,
+            generator,
+        )
+    assert costs[True] < costs[False]
+
+    logger.log_cost_statistics()
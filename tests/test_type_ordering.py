@@ -0,0 +1,46 @@
+import itertools
+
+from chia.types.blockchain_format.program import Program
+
+from clvm_contracts.boilerplate.basic import BasicType
+from clvm_contracts.migration import MigrationPlanner, TypeMigration
+from clvm_contracts.type_ordering import TypeUsage, expected_proof_cost, optimal_order, order_additions
+from clvm_contracts.validating_meta_puzzle import VMP, VMPSpend
+
+from benchmarks.driver_scaling import basic_types
+from benchmarks.scenarios import ACS
+from benchmarks.type_ordering import measured_proof_cost, skewed_usage
+
+
+def test_optimal_order():
+    types = basic_types(5)
+    hashes = [typ.get_tree_hash() for typ in types]
+    usage = TypeUsage([(frozenset([hashes[3]]), 5), (frozenset([hashes[1]]), 2), (frozenset([hashes[4]]), 2)])
+    assert optimal_order(types, usage)[:3] == [types[3], types[1], types[4]]
+    # a type that is usually gone by the time it is proved is cheaper to reveal
+    usage = TypeUsage(usage.proofs, {hashes[4]: 0.5})
+    assert optimal_order(types, usage)[:3] == [types[3], types[4], types[1]]
+
+    # Exact against every permutation, and the model against real proofs
+    usage = skewed_usage(types, seed=3)
+    best = min(expected_proof_cost(order, usage) for order in itertools.permutations(types))
+    ordered = optimal_order(types, usage)
+    assert abs(expected_proof_cost(ordered, usage) - best) < 1e-6
+    assert abs(measured_proof_cost(ordered, usage) - best) / best < 0.001
+
+    # Past the exact limit the order is found greedily
+    many = basic_types(16)
+    usage = skewed_usage(many)
+    assert expected_proof_cost(optimal_order(many, usage), usage) < expected_proof_cost(many, usage)
+
+
+def test_order_additions():
+    types = basic_types(4)
+    usage = skewed_usage(types)
+    existing = basic_types(6)[4:]
+    additions = [BasicType.launch(typ, conditions=Program.to(None)) for typ in types]
+    spend = VMPSpend(None, VMP(ACS, existing), type_additions=order_additions(additions, usage))
+    assert spend.types == optimal_order(types, usage) + existing
+
+    planner = MigrationPlanner(TypeMigration(additions), lambda spend: Program.to(None), usage=usage)
+    assert list(planner.migration.type_additions) == order_additions(additions, usage)